@@ -21,8 +21,25 @@ class Config:
     fmp_base_url: str = "https://financialmodelingprep.com/api/v3"
     quote_staleness_seconds: int = 60
     quote_flush_interval: int = 30
+    quote_flush_min_interval: int = 5
+    quote_flush_max_interval: int = 120
+    quote_redis_format: str = "hash"
+    tick_history_enabled: bool = True
+    tick_stream_maxlen: int = 50000
+    tick_history_retention_seconds: int = 14400
+    tick_rollover_interval: int = 60
+    tick_minute_retention_days: int = 30
+    intraday_bar_retention_days: int = 60
+    bar_store_enabled: bool = True
+    bar_store_dir: str = "var/bar_store"
+    bar_warming_enabled: bool = True
+    bar_warm_lookback_days: int = 400
+    bar_warm_retry_seconds: int = 900
     strategy_poll_interval: int = 30
     strategy_executor_enabled: int = 1
+    backtest_sweep_workers: int = 0
+    backtest_job_workers: int = 2
+    backtest_jobs_per_user: int = 2
     market_data_transport: str = "ws"
     log_level: str = "INFO"
     allow_symbol_seed_endpoint: bool = False
@@ -2,7 +2,10 @@ from app.db.models import (
     AccountMember,
     Company,
     DailyBar,
+    DailyBarRollup,
     Holding,
+    IntradayBar,
+    IntradayBarCoverage,
     KalshiAccount,
     KalshiBotState,
     KalshiFill,
@@ -15,6 +18,7 @@ from app.db.models import (
     Strategy,
     StrategyRun,
     Symbol,
+    TickMinute,
     TradingAccount,
     Transaction,
     WatchlistItem,
@@ -26,7 +30,10 @@ __all__ = [
     "Base",
     "Company",
     "DailyBar",
+    "DailyBarRollup",
     "Holding",
+    "IntradayBar",
+    "IntradayBarCoverage",
     "KalshiAccount",
     "KalshiBotState",
     "KalshiFill",
@@ -39,6 +46,7 @@ __all__ = [
     "Strategy",
     "StrategyRun",
     "Symbol",
+    "TickMinute",
     "TradingAccount",
     "Transaction",
     "WatchlistItem",
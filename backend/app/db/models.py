@@ -5,7 +5,7 @@ Postgres enums are created by drizzle-kit push; SQLAlchemy references them
 by name so it reads/writes the correct enum values.
 """
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from decimal import Decimal
 
 from sqlalchemy import (
@@ -13,6 +13,7 @@ from sqlalchemy import (
     Boolean,
     CheckConstraint,
     Date,
+    DateTime,
     Enum,
     Float,
     ForeignKey,
@@ -298,6 +299,92 @@ class DailyBar(Base):
     symbol: Mapped["Symbol"] = relationship(back_populates="daily_bars")
 
 
+class DailyBarRollup(Base):
+    """daily_bar aggregated per week/month/quarter/half-year/year.
+
+    Maintained by `app.services.bar_rollups` whenever daily bars are inserted;
+    only the periods the new bars fall in are recomputed.
+    """
+
+    __tablename__ = "daily_bar_rollup"
+
+    ticker: Mapped[str] = mapped_column(
+        String, ForeignKey("symbol.ticker", ondelete="CASCADE"), primary_key=True
+    )
+    timeframe: Mapped[str] = mapped_column(String, primary_key=True)
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    open: Mapped[float] = mapped_column(Float)
+    high: Mapped[float] = mapped_column(Float)
+    low: Mapped[float] = mapped_column(Float)
+    close: Mapped[float] = mapped_column(Float)
+    volume: Mapped[float] = mapped_column(Float)
+    trade_count: Mapped[int | None] = mapped_column(Integer, default=None)
+    vwap: Mapped[float | None] = mapped_column(Float, default=None)
+
+
+class IntradayBar(Base):
+    """Closed intraday bars cached from Alpaca, keyed by timeframe."""
+
+    __tablename__ = "intraday_bar"
+    __table_args__ = (Index("intraday_bar_time_idx", "time"),)
+
+    ticker: Mapped[str] = mapped_column(
+        String, ForeignKey("symbol.ticker", ondelete="CASCADE"), primary_key=True
+    )
+    timeframe: Mapped[str] = mapped_column(String, primary_key=True)
+    time: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    open: Mapped[float] = mapped_column(Float)
+    high: Mapped[float] = mapped_column(Float)
+    low: Mapped[float] = mapped_column(Float)
+    close: Mapped[float] = mapped_column(Float)
+    volume: Mapped[float] = mapped_column(Float)
+    trade_count: Mapped[int | None] = mapped_column(Integer, default=None)
+    vwap: Mapped[float | None] = mapped_column(Float, default=None)
+
+
+class IntradayBarCoverage(Base):
+    """[range_start, range_end) windows already fetched into `intraday_bar`.
+
+    Bars alone can't tell a gap from a quiet minute or a closed market, so
+    the cache records what it asked Alpaca for. Overlapping or touching
+    windows are merged on write.
+    """
+
+    __tablename__ = "intraday_bar_coverage"
+    __table_args__ = (
+        Index("intraday_bar_coverage_ticker_timeframe_idx", "ticker", "timeframe"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    ticker: Mapped[str] = mapped_column(
+        String, ForeignKey("symbol.ticker", ondelete="CASCADE")
+    )
+    timeframe: Mapped[str] = mapped_column(String)
+    range_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    range_end: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class TickMinute(Base):
+    """Minute bars rolled over from the per-ticker Redis tick streams.
+
+    Range-partitioned by day on `minute` in Postgres (see migration 0013);
+    `app.tasks.tick_rollover` creates partitions ahead of use and drops
+    expired ones. There is deliberately no FK to `symbol`: Postgres would have
+    to check it on every partition attach/detach and the rows are disposable.
+    """
+
+    __tablename__ = "tick_minute"
+
+    ticker: Mapped[str] = mapped_column(String, primary_key=True)
+    minute: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    open: Mapped[float] = mapped_column(Float)
+    high: Mapped[float] = mapped_column(Float)
+    low: Mapped[float] = mapped_column(Float)
+    close: Mapped[float] = mapped_column(Float)
+    volume: Mapped[float] = mapped_column(Float, default=0)
+    tick_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
 class AccountMember(Base):
     __tablename__ = "account_member"
     __table_args__ = (
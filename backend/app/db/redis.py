@@ -1,7 +1,8 @@
 """Async Redis client for the quote hot-cache and pub/sub fan-out."""
 
 import logging
-from typing import Protocol, cast
+from collections.abc import AsyncIterator
+from typing import Any, Protocol, cast
 
 from redis.asyncio import from_url
 
@@ -34,14 +35,53 @@ class RedisClient(Protocol):
 
     async def spop(self, name: str) -> str | None: ...
 
+    async def delete(self, *names: str) -> int: ...
+
     async def zincrby(self, name: str, amount: float, value: str) -> float: ...
 
     async def zrevrange(self, name: str, start: int, end: int) -> list[str]: ...
 
+    async def xadd(
+        self,
+        name: str,
+        fields: dict[str, str],
+        maxlen: int | None = None,
+        approximate: bool = True,
+    ) -> str: ...
+
+    async def xrange(
+        self, name: str, min: str = "-", max: str = "+", count: int | None = None
+    ) -> list[tuple[str, dict[str, str]]]: ...
+
+    async def xtrim(
+        self,
+        name: str,
+        maxlen: int | None = None,
+        approximate: bool = True,
+        minid: str | int | None = None,
+    ) -> int: ...
+
+    def scan_iter(
+        self, match: str | None = None, count: int | None = None
+    ) -> AsyncIterator[str]: ...
+
+    async def close(self) -> None: ...
+
+
+class BinaryRedisClient(Protocol):
+    """Client for values that aren't UTF-8 text (packed quotes)."""
+
+    async def get(self, name: str) -> bytes | None: ...
+
+    async def set(self, name: str, value: bytes, ex: int | None = None) -> bool | None: ...
+
+    def register_script(self, script: str) -> Any: ...
+
     async def close(self) -> None: ...
 
 
 _pool: RedisClient | None = None
+_binary_pool: BinaryRedisClient | None = None
 
 
 async def get_redis() -> RedisClient:
@@ -55,10 +95,29 @@ async def get_redis() -> RedisClient:
     return _pool
 
 
+async def get_binary_redis() -> BinaryRedisClient:
+    """Return a second pool with `decode_responses` off, for binary values.
+
+    The main pool decodes every reply as UTF-8, which a packed quote value
+    would fail. Created lazily, so deployments on the hash quote format never
+    open it.
+    """
+    global _binary_pool
+    if _binary_pool is None:
+        config = get_config()
+        _binary_pool = cast(
+            BinaryRedisClient, from_url(config.redis_url, decode_responses=False)
+        )
+    return _binary_pool
+
+
 async def close_redis() -> None:
-    """Shutdown the Redis connection pool. Called on app shutdown."""
-    global _pool
+    """Shutdown the Redis connection pools. Called on app shutdown."""
+    global _pool, _binary_pool
     if _pool is not None:
         await _pool.close()
         _pool = None
         logger.info("Redis connection pool closed")
+    if _binary_pool is not None:
+        await _binary_pool.close()
+        _binary_pool = None
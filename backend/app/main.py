@@ -28,9 +28,14 @@ from app.routers import (
     transactions,
     watchlist,
 )
+from app.services.backtest_jobs import shutdown_backtest_jobs
+from app.services.backtest_sweep import shutdown_sweep_pool
+from app.services.quote_cache import migrate_hash_quotes, packed_quotes_enabled
+from app.tasks.bar_warming import run_bar_warming_loop
 from app.tasks.order_executor import run_order_executor
 from app.tasks.strategy_executor import run_strategy_executor
 from app.tasks.get_news import run_news_loop
+from app.tasks.tick_rollover import run_tick_rollover_loop
 from app.ws.feeds.alpaca import AlpacaFeed
 from app.ws.feeds.base import BaseFeed
 from app.ws.feeds.mock import MockFeed
@@ -190,6 +195,11 @@ else:
 async def lifespan(app: FastAPI):
     await get_redis()
     logger.info("Redis connected")
+    if packed_quotes_enabled():
+        try:
+            await migrate_hash_quotes()
+        except Exception:
+            logger.exception("Redis quote hash migration failed")
 
     set_manager(manager)
     if feed is None:
@@ -210,6 +220,9 @@ async def lifespan(app: FastAPI):
     flush_task = asyncio.create_task(flush_quotes_loop())
     logger.info("Quote flush task started")
 
+    tick_rollover_task = asyncio.create_task(run_tick_rollover_loop())
+    bar_warming_task = asyncio.create_task(run_bar_warming_loop())
+
     executor_task = asyncio.create_task(run_order_executor())
     strategy_task = asyncio.create_task(run_strategy_executor())
     news_task = asyncio.create_task(run_news_loop())
@@ -242,6 +255,8 @@ async def lifespan(app: FastAPI):
         await feed.stop()
     symbol_sync_task.cancel()
     flush_task.cancel()
+    tick_rollover_task.cancel()
+    bar_warming_task.cancel()
     executor_task.cancel()
     strategy_task.cancel()
     news_task.cancel()
@@ -259,6 +274,14 @@ async def lifespan(app: FastAPI):
         await flush_task
     except asyncio.CancelledError:
         pass
+    try:
+        await tick_rollover_task
+    except asyncio.CancelledError:
+        pass
+    try:
+        await bar_warming_task
+    except asyncio.CancelledError:
+        pass
     try:
         await executor_task
     except asyncio.CancelledError:
@@ -268,6 +291,8 @@ async def lifespan(app: FastAPI):
         await news_task
     except asyncio.CancelledError:
         pass
+    shutdown_backtest_jobs()
+    shutdown_sweep_pool()
     await close_redis()
     logger.info("Shutdown complete")
 
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 
 from app.auth import get_current_user
+from app.ws.flush import get_flush_stats
 
 router = APIRouter()
 
@@ -10,6 +11,12 @@ def health():
     return {"status": "ok"}
 
 
+@router.get("/health/quote-flush")
+def quote_flush_stats(user: dict = Depends(get_current_user)):
+    """Rows written vs skipped by the change-aware quote flusher."""
+    return get_flush_stats().as_dict()
+
+
 @router.get("/me")
 def me(user: dict = Depends(get_current_user)):
     return user
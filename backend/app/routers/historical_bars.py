@@ -1,32 +1,99 @@
 """Historical bars endpoint: GET with routing by timeframe.
 
-Intraday (< 1Day) -> Alpaca REST on demand, not stored.
+Intraday (< 1Day) -> intraday_bar cache + Alpaca for uncovered windows and
+                     the still-open tail.
 Daily (1Day)      -> daily_bar table + Alpaca backfill for gaps.
-Aggregated        -> SQL aggregation over daily_bar (1Week, 1Month, 3Month).
+Aggregated        -> daily_bar_rollup, kept current by the daily backfill
+                     (1Week, 1Month, 3Month, 6Month, 1Year).
+
+Daily and aggregated responses only change when a new daily bar lands, so
+they carry a strong ETag built from the ticker, timeframe, requested dates
+and the latest stored bar date (plus the bar count, so a backfilled gap
+also changes it), and a per-timeframe Cache-Control. The version is read
+first: a matching If-None-Match gets a bodiless 304 before any backfill or
+bar load, unless a closed session newer than the stored bars may still be
+downloaded (see `daily_bars_current`).
+
+`max_points` bounds the number of bars returned for any timeframe by
+downsampling server-side (see app/services/downsample.py).
+
+`format=columnar` returns the bars as parallel t/o/h/l/c/v arrays instead of
+one object per bar, encoded straight to JSON without FastAPI's per-value
+`jsonable_encoder` pass. Daily and aggregated bars that aren't downsampled
+are read into those arrays straight from the column tuples.
 """
 
+import hashlib
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.auth import get_current_user
 from app.db import get_db
+from app.services.downsample import DOWNSAMPLE_METHODS, downsample_bars
 from app.services.bars import (
     AGGREGATED_TIMEFRAMES,
     DAILY_TIMEFRAME,
     INTRADAY_TIMEFRAMES,
+    daily_bar_version,
+    daily_bars_current,
     fetch_aggregated_bars,
+    fetch_aggregated_columns,
     fetch_daily_bars,
+    fetch_daily_columns,
     fetch_intraday_bars,
     parse_iso_utc,
+    to_columnar,
 )
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 ALL_TIMEFRAMES = INTRADAY_TIMEFRAMES | {DAILY_TIMEFRAME} | AGGREGATED_TIMEFRAMES
+RESPONSE_FORMATS = ("rows", "columnar")
+
+# Seconds a client may reuse a daily/aggregated response before revalidating.
+# Ranges that ended before the last few sessions can no longer change.
+DAILY_MAX_AGE = 300
+AGGREGATED_MAX_AGE = 1800
+HISTORICAL_MAX_AGE = 86400
+HISTORICAL_AFTER_DAYS = 5
+
+
+def _bars_etag(
+    ticker: str,
+    timeframe: str,
+    start: date,
+    end: date,
+    version: tuple[date | None, int],
+    variant: str = "",
+) -> str:
+    latest, count = version
+    key = f"{ticker}|{timeframe}|{start}|{end}|{latest}|{count}|{variant}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so a W/ prefix still matches.
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
+def _cache_control(timeframe: str, end: date, today: date) -> str:
+    if end < today - timedelta(days=HISTORICAL_AFTER_DAYS):
+        max_age = HISTORICAL_MAX_AGE
+    elif timeframe == DAILY_TIMEFRAME:
+        max_age = DAILY_MAX_AGE
+    else:
+        max_age = AGGREGATED_MAX_AGE
+    return f"private, max-age={max_age}"
 
 
 @router.get("/historical-bars")
@@ -35,6 +102,12 @@ async def get_historical_bars(
     timeframe: str = Query(...),
     start: str = Query(...),
     end: str = Query(None),
+    max_points: int | None = Query(None, ge=2, le=10000),
+    downsample: str = Query("ohlc"),
+    response_format: str = Query("rows", alias="format"),
+    *,
+    request: Request,
+    response: Response,
     user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -66,21 +139,72 @@ async def get_historical_bars(
     if start_dt >= end_dt:
         raise HTTPException(status_code=400, detail="start must be before end")
 
+    if downsample not in DOWNSAMPLE_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"downsample must be one of: {', '.join(DOWNSAMPLE_METHODS)}",
+        )
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(RESPONSE_FORMATS)}",
+        )
+    variant = response_format
+    if max_points:
+        variant += f":{downsample}:{max_points}"
+
+    headers: dict[str, str] = {}
+    # Filled instead of `bars` when the arrays can be read straight from the DB.
+    columns: dict[str, list] | None = None
+    read_columns = response_format == "columnar" and not max_points
     try:
         if timeframe in INTRADAY_TIMEFRAMES:
-            # intraday: fetch from Alpaca REST, never stored
-            bars = await fetch_intraday_bars(ticker, timeframe, start, end)
-            source = "alpaca"
-
-        elif timeframe == DAILY_TIMEFRAME:
-            # daily: DB + Alpaca backfill for gaps
-            bars = await fetch_daily_bars(db, ticker, start, end)
-            source = "daily_bar"
+            # intraday: cached closed bars + Alpaca for gaps and the open tail
+            bars = await fetch_intraday_bars(ticker, timeframe, start, end, db=db)
+            source = "intraday_bar"
 
         else:
-            # weekly / monthly / quarterly: aggregate from daily_bar
-            bars = await fetch_aggregated_bars(db, ticker, timeframe, start, end)
-            source = "aggregated"
+            start_date, end_date = start_dt.date(), end_dt.date()
+            cache_control = _cache_control(
+                timeframe, end_date, datetime.now(timezone.utc).date()
+            )
+            version = daily_bar_version(db, ticker, start_date, end_date)
+            etag = _bars_etag(ticker, timeframe, start_date, end_date, version, variant)
+            if daily_bars_current(
+                ticker, version[0], start_date, end_date
+            ) and _etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(
+                    status_code=304,
+                    headers={"ETag": etag, "Cache-Control": cache_control},
+                )
+
+            if timeframe == DAILY_TIMEFRAME:
+                # daily: DB + Alpaca backfill for gaps
+                if read_columns:
+                    columns = await fetch_daily_columns(db, ticker, start, end)
+                else:
+                    bars = await fetch_daily_bars(db, ticker, start, end)
+                source = "daily_bar"
+            else:
+                # weekly / monthly / quarterly / ...: pre-aggregated rollups
+                if read_columns:
+                    columns = await fetch_aggregated_columns(
+                        db, ticker, timeframe, start, end
+                    )
+                else:
+                    bars = await fetch_aggregated_bars(
+                        db, ticker, timeframe, start, end
+                    )
+                source = "daily_bar_rollup"
+
+            # The backfill may have added bars; tag what is actually returned.
+            version = daily_bar_version(db, ticker, start_date, end_date)
+            headers = {
+                "ETag": _bars_etag(
+                    ticker, timeframe, start_date, end_date, version, variant
+                ),
+                "Cache-Control": cache_control,
+            }
 
     except Exception as exc:
         logger.exception("Failed to fetch bars for %s: %s", ticker, exc)
@@ -88,6 +212,26 @@ async def get_historical_bars(
             status_code=503, detail=f"Failed to fetch historical bars: {exc}"
         )
 
+    if headers:
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    if max_points:
+        bars = downsample_bars(bars, max_points, downsample)
+
+    if response_format == "columnar":
+        return JSONResponse(
+            {
+                "ticker": ticker,
+                "timeframe": timeframe,
+                "source": source,
+                "format": "columnar",
+                "bars": columns if columns is not None else to_columnar(bars),
+            },
+            headers=headers,
+        )
+
     return {
         "ticker": ticker,
         "timeframe": timeframe,
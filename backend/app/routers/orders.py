@@ -1,6 +1,5 @@
 """Order endpoints: place, list, get, and cancel orders."""
 
-import asyncio
 import logging
 import time
 from datetime import datetime, timezone
@@ -15,7 +14,7 @@ from sqlalchemy.orm import Session
 from app.auth import get_current_user
 from app.config import get_config
 from app.db import Order, get_db
-from app.db.models import DailyBar, Holding, TradingAccount, Transaction
+from app.db.models import Holding, TradingAccount, Transaction
 from app.dependencies import assert_owns_order, get_trading_account
 from app.rate_limit import get_order_cancel_limiter, get_order_placement_limiter
 from app.schemas import (
@@ -25,6 +24,7 @@ from app.schemas import (
     OrderTransactionResponse,
 )
 from app.services.atr import compute_atr
+from app.services.bar_stats import get_latest_volume
 from app.services.market_calendar import ET, is_stock_market_open
 from app.services.quote_cache import resolve_quote_or_400
 from app.services.trading import (
@@ -177,22 +177,19 @@ async def place_order(
         )
 
     # Compute ATR before acquiring the trading_account row lock. compute_atr
-    # can fall through to a synchronous httpx call to Alpaca with a 10s
-    # timeout when the DB has fewer than ATR_PERIODS+1 daily bars cached for
-    # the ticker — and that call has no dependency on the locked row state.
-    # Holding FOR UPDATE through a 10s network call would freeze every other
-    # writer on the same trading account. The thread hop also keeps the
-    # blocking httpx.Client off the asyncio loop so REST handlers, the WS
-    # broadcast, and the quote-flush task aren't frozen for the duration.
-    # DailyBar reads stay inline below; quote resolution goes through the
-    # shared cache (Redis-first).
+    # can fall through to an Alpaca backfill when the DB has fewer than
+    # ATR_PERIODS+1 daily bars cached for the ticker — and that fetch has no
+    # dependency on the locked row state. Holding FOR UPDATE through a
+    # network round trip would freeze every other writer on the same trading
+    # account. The fetch is async, so the loop keeps serving REST handlers,
+    # the WS broadcast, and the quote-flush task while it runs. The daily
+    # volume read below and quote resolution both go through shared caches
+    # (Redis-first).
     needs_atr = payload.side == "buy" and (
         payload.order_type == "stop" or deferred_market
     )
     pre_atr: Decimal | None = (
-        await asyncio.to_thread(compute_atr, payload.ticker, db)
-        if needs_atr
-        else None
+        await compute_atr(payload.ticker, db) if needs_atr else None
     )
 
     # Lock the account row first, then run validation (which may acquire the
@@ -303,17 +300,7 @@ async def place_order(
         # the check uses the actual fill cost — not just the raw quoted price.
         # a user with exactly enough balance at the quote would otherwise pass
         # validation but then fail the pre-fill check inside execute_fill.
-        latest_bar = (
-            db.query(DailyBar)
-            .filter(DailyBar.ticker == payload.ticker)
-            .order_by(DailyBar.date.desc())
-            .first()
-        )
-        daily_volume = (
-            Decimal(str(latest_bar.volume))
-            if latest_bar and latest_bar.volume
-            else None
-        )
+        daily_volume = await get_latest_volume(db, payload.ticker)
         fill_price = compute_market_fill_price(market_price, payload.side, quantity, daily_volume)
 
         # buying power check against the slippage-adjusted fill price
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import json
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal, InvalidOperation
 
 import httpx
@@ -22,7 +22,9 @@ from app.db import Holding, Order, Strategy, StrategyRun, Symbol, get_db
 from app.db.session import get_session_factory
 from app.dependencies import get_trading_account
 from app.schemas import (
+    StrategyBacktestJobResponse,
     StrategyBacktestResponse,
+    StrategyBacktestSweepResponse,
     StrategyCatalogResponse,
     StrategyListResponse,
     StrategyResponse,
@@ -30,16 +32,51 @@ from app.schemas import (
     StrategyRunsPageResponse,
     StrategyRunResponse,
     StrategyTemplateResponse,
+    StrategyWalkForwardResponse,
 )
+from app.services.backtest_cache import (
+    backtest_cache_key,
+    data_stamps,
+    get_cached_backtest,
+    store_backtest,
+)
+from app.services.backtest_jobs import (
+    BacktestJob,
+    BacktestJobError,
+    BacktestJobLimitError,
+    get_backtest_job_manager,
+)
+from app.services.backtest_sweep import (
+    MAX_SWEEP_COMBINATIONS,
+    SIMULATION_PRECISIONS,
+    SWEEP_METRICS,
+    SweepGridError,
+    SweepReconciliation,
+    SweepResult,
+    expand_param_grid,
+    reconcile_sweep_result,
+    run_param_sweep,
+    sweep_history_start,
+)
+from app.services.bar_store import refresh_bar_store
 from app.services.strategy_engine import (
     COMMON_DEFAULT_RISK,
     STRATEGY_TEMPLATES,
+    BacktestBars,
+    BacktestTrade,
+    backtest_history_start,
     catalog_payload,
     get_strategy_template,
+    load_backtest_bars,
     run_backtest,
 )
 from app.services.strategy_signals import bars_required_for_signal
-from app.services.bars import fetch_daily_bars
+from app.services.walk_forward import (
+    MAX_WALK_FORWARD_RUNS,
+    run_walk_forward,
+    walk_forward_windows,
+)
+from app.services.bars import backfill_daily_bars, daily_bars_current
 from app.rate_limit import get_alpaca_limiter
 from app.tasks.strategy_executor import run_strategy_once
 
@@ -117,6 +154,26 @@ class BacktestRequest(BaseModel):
     end: str
 
 
+class BacktestSweepRequest(BacktestRequest):
+    # param key -> list of values, or {"start", "stop", "step"} (inclusive).
+    param_grid: dict[str, list | dict] = Field(default_factory=dict)
+    metric: str = "ending_equity"
+    limit: int = Field(default=20, ge=1, le=MAX_SWEEP_COMBINATIONS)
+    # "float64" sweeps faster; the top result is then re-run in Decimal and
+    # reported under `reconciliation`, leaving the ranked results as swept.
+    precision: str = "decimal"
+
+
+class BacktestWalkForwardRequest(BacktestRequest):
+    param_grid: dict[str, list | dict] = Field(default_factory=dict)
+    metric: str = "ending_equity"
+    # Calendar days per in-sample / out-of-sample span.
+    in_sample_days: int = Field(default=365, ge=30, le=3650)
+    out_of_sample_days: int = Field(default=90, ge=5, le=3650)
+    # "float64" runs the in-sample sweeps faster; winners are re-run in Decimal.
+    precision: str = "decimal"
+
+
 class StrategyControlRequest(BaseModel):
     trading_account_id: int
     action: str = Field(pattern="^(pause_all|resume_all|disable_all)$")
@@ -388,8 +445,9 @@ async def _ensure_backtest_symbols_and_history(
     )
     end_value = end.replace(hour=23, minute=59, second=59, microsecond=0)
 
-    for ticker in symbols:
-        await fetch_daily_bars(db, ticker, history_start.isoformat(), end_value.isoformat())
+    await backfill_daily_bars(
+        db, symbols, history_start.isoformat(), end_value.isoformat()
+    )
     return symbol_rows
 
 
@@ -399,6 +457,34 @@ def _coerce_utc_datetime(value: datetime) -> datetime:
     return value.astimezone(timezone.utc)
 
 
+def _parse_backtest_request(
+    payload: BacktestRequest,
+) -> tuple[list[str], Decimal, datetime, datetime]:
+    """Validated (symbols, capital_allocation, start, end) of a backtest."""
+    if payload.strategy_type not in ALLOWED_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported strategy_type")
+    if payload.timeframe not in ALLOWED_TIMEFRAMES:
+        raise HTTPException(status_code=400, detail="Unsupported timeframe")
+
+    _, symbols = _normalize_symbols(payload.ticker, payload.symbols_json)
+    try:
+        capital_allocation = Decimal(payload.capital_allocation)
+    except InvalidOperation:
+        raise HTTPException(status_code=400, detail="Invalid capital_allocation")
+    if capital_allocation <= 0:
+        raise HTTPException(status_code=400, detail="capital_allocation must be > 0")
+
+    try:
+        start = datetime.fromisoformat(payload.start.replace("Z", "+00:00"))
+        end = datetime.fromisoformat(payload.end.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start or end")
+
+    start = _coerce_utc_datetime(start)
+    end = _coerce_utc_datetime(end)
+    return symbols, capital_allocation, start, end
+
+
 @router.get("/strategies", response_model=StrategyListResponse)
 def list_strategies(
     trading_account_id: int,
@@ -784,6 +870,25 @@ async def strategy_stream(
     )
 
 
+def _point_payload(point: dict) -> dict:
+    return {
+        "time": point["time"],
+        "equity": str(point["equity"]),
+        "drawdown": str(point["drawdown"]),
+    }
+
+
+def _trade_payload(trade: BacktestTrade) -> dict:
+    return {
+        "ticker": trade.ticker,
+        "side": trade.side,
+        "quantity": str(trade.quantity),
+        "price": str(trade.price),
+        "timestamp": trade.timestamp.isoformat(),
+        "profit": str(trade.profit) if trade.profit is not None else None,
+    }
+
+
 @router.post("/strategies/backtest", response_model=StrategyBacktestResponse)
 async def backtest_strategy(
     payload: BacktestRequest,
@@ -792,31 +897,53 @@ async def backtest_strategy(
 ):
     _ensure_strategy_schema_ready(db)
     _ = user
+    return await _execute_backtest(db, payload)
 
-    if payload.strategy_type not in ALLOWED_TYPES:
-        raise HTTPException(status_code=400, detail="Unsupported strategy_type")
-    if payload.timeframe not in ALLOWED_TIMEFRAMES:
-        raise HTTPException(status_code=400, detail="Unsupported timeframe")
-
-    _, symbols = _normalize_symbols(payload.ticker, payload.symbols_json)
-    try:
-        capital_allocation = Decimal(payload.capital_allocation)
-    except InvalidOperation:
-        raise HTTPException(status_code=400, detail="Invalid capital_allocation")
-    if capital_allocation <= 0:
-        raise HTTPException(status_code=400, detail="capital_allocation must be > 0")
-
-    try:
-        start = datetime.fromisoformat(payload.start.replace("Z", "+00:00"))
-        end = datetime.fromisoformat(payload.end.replace("Z", "+00:00"))
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid start or end")
 
-    start = _coerce_utc_datetime(start)
-    end = _coerce_utc_datetime(end)
+async def _execute_backtest(
+    db: Session, payload: BacktestRequest, job: BacktestJob | None = None
+) -> StrategyBacktestResponse:
+    """Run one backtest request, or serve it from the result cache.
 
+    For a `job`, the simulation runs in a worker thread and reports every
+    day to the job, which may cancel it.
+    """
+    symbols, capital_allocation, start, end = _parse_backtest_request(payload)
     normalized_params = _normalize_params(payload.strategy_type, payload.params_json)
     normalized_risk = _normalize_risk(payload.risk_json)
+
+    # Identical requests over unchanged bars are served from the cache; the
+    # per-symbol data stamps make new or backfilled bars a different key. The
+    # stamps only describe what is stored, so a hit before the history check
+    # is only trusted when no closed session past them is still missing.
+    cache_request = {
+        "strategy_type": payload.strategy_type,
+        "symbols": symbols,
+        "timeframe": payload.timeframe,
+        "params": normalized_params,
+        "risk": normalized_risk,
+        "capital_allocation": str(capital_allocation),
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+    }
+    history_start = backtest_history_start(
+        payload.strategy_type, normalized_params, normalized_risk, start.date()
+    )
+    stamps = data_stamps(db, symbols, history_start, end.date())
+    current = all(
+        daily_bars_current(
+            ticker,
+            date.fromisoformat(stamps[ticker][0]) if ticker in stamps else None,
+            history_start,
+            end.date(),
+        )
+        for ticker in symbols
+    )
+    if current:
+        cached = await get_cached_backtest(backtest_cache_key(cache_request, stamps))
+        if cached is not None:
+            return StrategyBacktestResponse.model_validate_json(cached)
+
     await _ensure_backtest_symbols_and_history(
         db,
         symbols=symbols,
@@ -827,7 +954,16 @@ async def backtest_strategy(
         end=end,
     )
 
-    result = run_backtest(
+    # Stamped after the history check, which may have backfilled bars.
+    cache_key = backtest_cache_key(
+        cache_request, data_stamps(db, symbols, history_start, end.date())
+    )
+    if not current:
+        cached = await get_cached_backtest(cache_key)
+        if cached is not None:
+            return StrategyBacktestResponse.model_validate_json(cached)
+
+    backtest_kwargs = dict(
         db=db,
         strategy_type=payload.strategy_type,
         symbols=symbols,
@@ -838,37 +974,363 @@ async def backtest_strategy(
         start=start,
         end=end,
     )
-    return StrategyBacktestResponse(
-        equity_curve=[
-            {
-                "time": point["time"],
-                "equity": str(point["equity"]),
-                "drawdown": str(point["drawdown"]),
-            }
-            for point in result["equity_curve"]
-        ],
-        drawdown_curve=[
-            {
-                "time": point["time"],
-                "equity": str(point["equity"]),
-                "drawdown": str(point["drawdown"]),
-            }
-            for point in result["drawdown_curve"]
-        ],
-        trades=[
+    if job is None:
+        result = run_backtest(**backtest_kwargs)
+    else:
+        job.check_cancelled()
+        result = await asyncio.to_thread(
+            run_backtest,
+            **backtest_kwargs,
+            on_day=lambda done, total, point: job.record_day(
+                done, total, _point_payload(point)
+            ),
+        )
+    response = StrategyBacktestResponse(
+        equity_curve=[_point_payload(point) for point in result["equity_curve"]],
+        drawdown_curve=[_point_payload(point) for point in result["drawdown_curve"]],
+        trades=[_trade_payload(trade) for trade in result["trades"]],
+        win_rate=result["win_rate"],
+        avg_return_per_trade=result["avg_return_per_trade"],
+        max_drawdown=result["max_drawdown"],
+        ending_equity=result["ending_equity"],
+    )
+    await store_backtest(cache_key, response.model_dump_json())
+    return response
+
+
+def _job_payload(job: BacktestJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "error": job.error,
+        "result": job.result,
+    }
+
+
+async def _backtest_job_work(payload: BacktestRequest, job: BacktestJob) -> dict:
+    # The request's session is gone by the time the job runs.
+    session = get_session_factory()()
+    try:
+        response = await _execute_backtest(session, payload, job)
+    except HTTPException as exc:
+        raise BacktestJobError(str(exc.detail))
+    finally:
+        session.close()
+    return response.model_dump()
+
+
+@router.post(
+    "/strategies/backtest/jobs",
+    response_model=StrategyBacktestJobResponse,
+    status_code=202,
+)
+async def submit_backtest_job(
+    payload: BacktestRequest,
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _ensure_strategy_schema_ready(db)
+    # Reject malformed requests now rather than as a failed job.
+    _parse_backtest_request(payload)
+    try:
+        job = get_backtest_job_manager().submit(
+            str(user.get("sub", "")),
+            lambda job: _backtest_job_work(payload, job),
+        )
+    except BacktestJobLimitError as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return _job_payload(job)
+
+
+def _get_backtest_job(job_id: str, user: dict) -> BacktestJob:
+    job = get_backtest_job_manager().get(job_id, str(user.get("sub", "")))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backtest job not found")
+    return job
+
+
+@router.get(
+    "/strategies/backtest/jobs/{job_id}", response_model=StrategyBacktestJobResponse
+)
+async def get_backtest_job(job_id: str, user: dict = Depends(get_current_user)):
+    return _job_payload(_get_backtest_job(job_id, user))
+
+
+@router.post(
+    "/strategies/backtest/jobs/{job_id}/cancel",
+    response_model=StrategyBacktestJobResponse,
+)
+async def cancel_backtest_job(job_id: str, user: dict = Depends(get_current_user)):
+    job = get_backtest_job_manager().cancel(job_id, str(user.get("sub", "")))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Backtest job not found")
+    return _job_payload(job)
+
+
+async def _stream_backtest_job(job: BacktestJob, poll_seconds: float = 0.5):
+    """`progress` events carrying the equity points added since the last one,
+    then a final event named after the job's end status with the full job."""
+    sent = 0
+    while True:
+        finished = job.finished
+        points = job.equity_curve[sent:]
+        sent += len(points)
+        if points or not finished:
+            payload = json.dumps(
+                {
+                    "status": job.status,
+                    "progress": job.progress,
+                    "equity_curve": points,
+                }
+            )
+            yield f"event: progress\ndata: {payload}\n\n"
+        if finished:
+            yield f"event: {job.status}\ndata: {json.dumps(_job_payload(job))}\n\n"
+            return
+        await asyncio.sleep(poll_seconds)
+
+
+@router.get("/strategies/backtest/jobs/{job_id}/stream")
+async def stream_backtest_job(job_id: str, user: dict = Depends(get_current_user)):
+    return StreamingResponse(
+        _stream_backtest_job(_get_backtest_job(job_id, user)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _sweep_combinations(
+    payload: BacktestSweepRequest | BacktestWalkForwardRequest,
+) -> tuple[list[dict], int]:
+    """Normalized, de-duplicated combinations of the payload's param_grid,
+    and how many grid points were dropped."""
+    if payload.metric not in SWEEP_METRICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"metric must be one of: {', '.join(SWEEP_METRICS)}",
+        )
+    if payload.precision not in SIMULATION_PRECISIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"precision must be one of: {', '.join(SIMULATION_PRECISIONS)}",
+        )
+    try:
+        candidates = expand_param_grid(payload.params_json, payload.param_grid)
+    except SweepGridError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Grids routinely cross invalid corners (fast >= slow); those are skipped.
+    combinations: dict[str, dict] = {}
+    for candidate in candidates:
+        try:
+            normalized = _normalize_params(payload.strategy_type, candidate)
+        except HTTPException:
+            continue
+        combinations.setdefault(json.dumps(normalized, sort_keys=True), normalized)
+    if not combinations:
+        raise HTTPException(
+            status_code=400, detail="param_grid has no valid parameter combinations"
+        )
+    return list(combinations.values()), len(candidates) - len(combinations)
+
+
+async def _prepare_sweep_bars(
+    db: Session,
+    *,
+    symbols: list[str],
+    strategy_type: str,
+    combinations: list[dict],
+    risk_json: dict,
+    start: datetime,
+    end: datetime,
+) -> BacktestBars | None:
+    """Make sure every combination's history is stored and shareable.
+
+    Refreshes the bar store for the sweep workers and returns None, or, with
+    the store disabled, returns the bars loaded from the database.
+    """
+    await _ensure_backtest_symbols_and_history(
+        db,
+        symbols=symbols,
+        strategy_type=strategy_type,
+        params_json=max(
+            combinations,
+            key=lambda params: bars_required_for_signal(strategy_type, params),
+        ),
+        risk_json=risk_json,
+        start=start,
+        end=end,
+    )
+    if get_config().bar_store_enabled:
+        await asyncio.to_thread(refresh_bar_store, db, symbols)
+        return None
+    history_start = sweep_history_start(
+        strategy_type, combinations, risk_json, start.date()
+    )
+    return load_backtest_bars(db, symbols, history_start, end.date())
+
+
+def _sweep_result_payload(result: SweepResult) -> dict:
+    return {
+        "params_json": result.params_json,
+        "ending_equity": str(result.ending_equity),
+        "total_return": result.total_return,
+        "win_rate": result.win_rate,
+        "avg_return_per_trade": result.avg_return_per_trade,
+        "max_drawdown": result.max_drawdown,
+        "trade_count": result.trade_count,
+    }
+
+
+def _reconciliation_payload(reconciliation: SweepReconciliation) -> dict:
+    return {
+        "approximate": _sweep_result_payload(reconciliation.approximate),
+        "exact": _sweep_result_payload(reconciliation.exact),
+        "ending_equity_divergence": str(reconciliation.ending_equity_divergence),
+        "trade_count_divergence": reconciliation.trade_count_divergence,
+        "within_tolerance": reconciliation.within_tolerance,
+    }
+
+
+@router.post(
+    "/strategies/backtest/sweep", response_model=StrategyBacktestSweepResponse
+)
+async def sweep_backtest_strategy(
+    payload: BacktestSweepRequest,
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _ensure_strategy_schema_ready(db)
+    _ = user
+
+    symbols, capital_allocation, start, end = _parse_backtest_request(payload)
+    combinations, skipped = _sweep_combinations(payload)
+    normalized_risk = _normalize_risk(payload.risk_json)
+    bars = await _prepare_sweep_bars(
+        db,
+        symbols=symbols,
+        strategy_type=payload.strategy_type,
+        combinations=combinations,
+        risk_json=normalized_risk,
+        start=start,
+        end=end,
+    )
+    sweep_kwargs = dict(
+        symbols=symbols,
+        strategy_type=payload.strategy_type,
+        risk_json=normalized_risk,
+        capital_allocation=capital_allocation,
+        start=start.date(),
+        end=end.date(),
+        bars=bars,
+    )
+    results = await asyncio.to_thread(
+        run_param_sweep,
+        combinations=combinations,
+        metric=payload.metric,
+        precision=payload.precision,
+        **sweep_kwargs,
+    )
+    reconciliation = None
+    if payload.precision != "decimal":
+        reconciliation = await asyncio.to_thread(
+            reconcile_sweep_result, results[0], **sweep_kwargs
+        )
+    return StrategyBacktestSweepResponse(
+        metric=payload.metric,
+        precision=payload.precision,
+        combinations=len(combinations),
+        skipped_combinations=skipped,
+        results=[_sweep_result_payload(result) for result in results[: payload.limit]],
+        reconciliation=(
+            _reconciliation_payload(reconciliation) if reconciliation else None
+        ),
+    )
+
+
+@router.post(
+    "/strategies/backtest/walk-forward", response_model=StrategyWalkForwardResponse
+)
+async def walk_forward_strategy(
+    payload: BacktestWalkForwardRequest,
+    user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    _ensure_strategy_schema_ready(db)
+    _ = user
+
+    symbols, capital_allocation, start, end = _parse_backtest_request(payload)
+    combinations, skipped = _sweep_combinations(payload)
+    windows = walk_forward_windows(
+        start.date(), end.date(), payload.in_sample_days, payload.out_of_sample_days
+    )
+    if not windows:
+        raise HTTPException(
+            status_code=400,
+            detail="Range is shorter than one in-sample window plus a day",
+        )
+    if len(windows) * len(combinations) > MAX_WALK_FORWARD_RUNS:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"windows x combinations must be at most {MAX_WALK_FORWARD_RUNS}"
+            ),
+        )
+    normalized_risk = _normalize_risk(payload.risk_json)
+    bars = await _prepare_sweep_bars(
+        db,
+        symbols=symbols,
+        strategy_type=payload.strategy_type,
+        combinations=combinations,
+        risk_json=normalized_risk,
+        start=start,
+        end=end,
+    )
+    result = await asyncio.to_thread(
+        run_walk_forward,
+        symbols=symbols,
+        strategy_type=payload.strategy_type,
+        combinations=combinations,
+        risk_json=normalized_risk,
+        capital_allocation=capital_allocation,
+        windows=windows,
+        metric=payload.metric,
+        bars=bars,
+        precision=payload.precision,
+    )
+    return StrategyWalkForwardResponse(
+        metric=payload.metric,
+        precision=payload.precision,
+        combinations=len(combinations),
+        skipped_combinations=skipped,
+        windows=[
             {
-                "ticker": trade.ticker,
-                "side": trade.side,
-                "quantity": str(trade.quantity),
-                "price": str(trade.price),
-                "timestamp": trade.timestamp.isoformat(),
-                "profit": str(trade.profit) if trade.profit is not None else None,
+                "in_sample_start": segment.window.in_sample_start.isoformat(),
+                "in_sample_end": segment.window.in_sample_end.isoformat(),
+                "out_of_sample_start": segment.window.out_of_sample_start.isoformat(),
+                "out_of_sample_end": segment.window.out_of_sample_end.isoformat(),
+                "in_sample": _sweep_result_payload(segment.in_sample),
+                "out_of_sample": _sweep_result_payload(segment.out_of_sample),
+                "in_sample_reconciliation": (
+                    _reconciliation_payload(segment.reconciliation)
+                    if segment.reconciliation
+                    else None
+                ),
             }
-            for trade in result["trades"]
+            for segment in result["segments"]
         ],
+        equity_curve=[_point_payload(point) for point in result["equity_curve"]],
+        trades=[_trade_payload(trade) for trade in result["trades"]],
         win_rate=result["win_rate"],
-        avg_return_per_trade=result["avg_return_per_trade"],
         max_drawdown=result["max_drawdown"],
+        total_return=result["total_return"],
         ending_equity=result["ending_equity"],
     )
 
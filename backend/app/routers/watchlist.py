@@ -22,10 +22,10 @@ from app.services.alpaca_rest import (
     AlpacaRateLimited,
     AlpacaRequestFailed,
     AlpacaTickerNotFound,
-    QuoteData,
     fetch_snapshot,
 )
-from app.services.quote_cache import persist_quote
+from app.services.quote_cache import persist_quotes, read_quote_fields
+from app.services.quote_record import QuoteRecord
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -54,7 +54,7 @@ def _ensure_user_row(db: Session, user: dict) -> str:
     return user_id
 
 
-def _quote_to_watchlist(quote: QuoteData, source: str) -> WatchlistQuoteResponse:
+def _quote_to_watchlist(quote: QuoteRecord, source: str) -> WatchlistQuoteResponse:
     return WatchlistQuoteResponse(
         price=quote.price,
         change=quote.change,
@@ -71,14 +71,15 @@ async def _fetch_alpaca_snapshots(
 ) -> dict[str, WatchlistQuoteResponse]:
     """Fetch snapshots for every ticker that missed both caches.
 
-    Runs the REST calls in parallel and persists each result to Postgres so
-    subsequent watchlist loads hit the warm cache. Errors per ticker are
-    swallowed — we'd rather render an em-dash than fail the whole endpoint.
+    Runs the REST calls in parallel and persists the results to Postgres in
+    one upsert so subsequent watchlist loads hit the warm cache. Errors per
+    ticker are swallowed — we'd rather render an em-dash than fail the whole
+    endpoint.
     """
     if not tickers:
         return {}
 
-    async def _one(ticker: str) -> tuple[str, QuoteData | None]:
+    async def _one(ticker: str) -> tuple[str, QuoteRecord | None]:
         try:
             return ticker, await fetch_snapshot(ticker)
         except (
@@ -92,23 +93,31 @@ async def _fetch_alpaca_snapshots(
 
     results = await asyncio.gather(*(_one(t) for t in tickers))
     out: dict[str, WatchlistQuoteResponse] = {}
+    fetched: list[QuoteRecord] = []
     for ticker, quote in results:
         if quote is None:
             continue
         out[ticker] = _quote_to_watchlist(quote, source="alpaca_rest")
+        fetched.append(quote)
+    if fetched:
         try:
-            persist_quote(quote, db=db)
+            persist_quotes(fetched, db=db)
         except Exception as exc:
-            logger.warning("Watchlist persist skipped for %s: %s", ticker, exc)
+            db.rollback()
+            logger.warning(
+                "Watchlist persist skipped for %s: %s",
+                ", ".join(q.ticker for q in fetched),
+                exc,
+            )
     return out
 
 
 async def _get_quote_from_redis(redis, ticker: str) -> WatchlistQuoteResponse | None:
-    data = await redis.hgetall(f"quote:{ticker}")
-    if not data:
+    fields = await read_quote_fields(ticker, redis=redis)
+    if not fields:
         return None
 
-    return WatchlistQuoteResponse.from_redis_hash(data)
+    return WatchlistQuoteResponse.from_quote_fields(fields)
 
 
 def _get_quotes_from_postgres(
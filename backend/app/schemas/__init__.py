@@ -8,8 +8,12 @@ from app.schemas.orders import (
 from app.schemas.quotes import QuoteData, QuoteResponse
 from app.schemas.transactions import TransactionResponse, TransactionsResponse
 from app.schemas.strategies import (
+    StrategyBacktestJobResponse,
     StrategyBacktestPointResponse,
+    StrategyBacktestReconciliationResponse,
     StrategyBacktestResponse,
+    StrategyBacktestSweepResponse,
+    StrategyBacktestSweepResultResponse,
     StrategyBacktestTradeResponse,
     StrategyCatalogResponse,
     StrategyListResponse,
@@ -18,6 +22,8 @@ from app.schemas.strategies import (
     StrategyTemplateResponse,
     StrategyRunResponse,
     StrategyRunsPageResponse,
+    StrategyWalkForwardResponse,
+    StrategyWalkForwardWindowResponse,
 )
 from app.schemas.watchlist import (
     WatchlistItemResponse,
@@ -38,8 +44,12 @@ __all__ = [
     "TransactionResponse",
     "TransactionsResponse",
     "StrategyListResponse",
+    "StrategyBacktestJobResponse",
     "StrategyBacktestPointResponse",
+    "StrategyBacktestReconciliationResponse",
     "StrategyBacktestResponse",
+    "StrategyBacktestSweepResponse",
+    "StrategyBacktestSweepResultResponse",
     "StrategyBacktestTradeResponse",
     "StrategyCatalogResponse",
     "StrategyResponse",
@@ -47,6 +57,8 @@ __all__ = [
     "StrategyTemplateResponse",
     "StrategyRunResponse",
     "StrategyRunsPageResponse",
+    "StrategyWalkForwardResponse",
+    "StrategyWalkForwardWindowResponse",
     "WatchlistItemResponse",
     "WatchlistMutationResponse",
     "WatchlistQuoteResponse",
@@ -131,6 +131,69 @@ class StrategyBacktestResponse(BaseModel):
     ending_equity: str
 
 
+class StrategyBacktestSweepResultResponse(BaseModel):
+    params_json: dict
+    ending_equity: str
+    total_return: float
+    win_rate: float
+    avg_return_per_trade: float
+    max_drawdown: float
+    trade_count: int
+
+
+class StrategyBacktestReconciliationResponse(BaseModel):
+    approximate: StrategyBacktestSweepResultResponse
+    exact: StrategyBacktestSweepResultResponse
+    ending_equity_divergence: str
+    trade_count_divergence: int
+    within_tolerance: bool
+
+
+class StrategyBacktestSweepResponse(BaseModel):
+    metric: str
+    precision: str = "decimal"
+    combinations: int
+    skipped_combinations: int
+    # Ranked in the sweep's `precision`; never mixed with Decimal re-runs.
+    results: list[StrategyBacktestSweepResultResponse]
+    # For float64 sweeps: the top result re-run in Decimal.
+    reconciliation: StrategyBacktestReconciliationResponse | None = None
+
+
+class StrategyWalkForwardWindowResponse(BaseModel):
+    in_sample_start: str
+    in_sample_end: str
+    out_of_sample_start: str
+    out_of_sample_end: str
+    in_sample: StrategyBacktestSweepResultResponse
+    out_of_sample: StrategyBacktestSweepResultResponse
+    in_sample_reconciliation: StrategyBacktestReconciliationResponse | None = None
+
+
+class StrategyWalkForwardResponse(BaseModel):
+    metric: str
+    precision: str = "decimal"
+    combinations: int
+    skipped_combinations: int
+    windows: list[StrategyWalkForwardWindowResponse]
+    equity_curve: list[StrategyBacktestPointResponse]
+    trades: list[StrategyBacktestTradeResponse]
+    win_rate: float
+    max_drawdown: float
+    total_return: float
+    ending_equity: str
+
+
+class StrategyBacktestJobResponse(BaseModel):
+    id: str
+    status: str
+    progress: float
+    created_at: str
+    finished_at: str | None
+    error: str | None
+    result: StrategyBacktestResponse | None
+
+
 class StrategySnapshotResponse(BaseModel):
     trading_account_id: int
     strategies: list[StrategyResponse]
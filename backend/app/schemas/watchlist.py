@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from datetime import datetime
+from typing import Any
 
 from pydantic import BaseModel
 
@@ -15,31 +17,16 @@ class WatchlistQuoteResponse(BaseModel):
     source: str | None
 
     @classmethod
-    def from_redis_hash(cls, data: dict[str, str]) -> "WatchlistQuoteResponse":
-        def to_float(value: str | None) -> float | None:
-            if value in (None, ""):
-                return None
-            try:
-                return float(value)
-            except (TypeError, ValueError):
-                return None
-
-        def to_int(value: str | None) -> int | None:
-            if value in (None, ""):
-                return None
-            try:
-                return int(float(value))
-            except (TypeError, ValueError):
-                return None
-
+    def from_quote_fields(cls, fields: Mapping[str, Any]) -> "WatchlistQuoteResponse":
+        """Build from already-typed fields (`quote_cache.read_quote_fields`)."""
         return cls(
-            price=to_float(data.get("price")),
-            change=to_float(data.get("change")),
-            change_percent=to_float(data.get("change_percent")),
-            bid_price=to_float(data.get("bid_price")),
-            ask_price=to_float(data.get("ask_price")),
-            timestamp=to_int(data.get("timestamp")),
-            source=data.get("source"),
+            price=fields.get("price"),
+            change=fields.get("change"),
+            change_percent=fields.get("change_percent"),
+            bid_price=fields.get("bid_price"),
+            ask_price=fields.get("ask_price"),
+            timestamp=fields.get("timestamp"),
+            source=fields.get("source"),
         )
 
 
@@ -11,7 +11,7 @@ from datetime import datetime, timezone
 import httpx
 
 from app.config import get_config
-from app.schemas import QuoteData
+from app.services.quote_record import QuoteRecord
 
 
 class AlpacaMissingCredentials(Exception):
@@ -30,8 +30,8 @@ class AlpacaRequestFailed(Exception):
     """Raised for any other failure talking to Alpaca."""
 
 
-async def fetch_snapshot(ticker: str) -> QuoteData:
-    """Fetch a snapshot from Alpaca REST and return a normalized QuoteData."""
+async def fetch_snapshot(ticker: str) -> QuoteRecord:
+    """Fetch a snapshot from Alpaca REST and return a normalized QuoteRecord."""
     config = get_config()
 
     if not config.alpaca_api_key or not config.alpaca_secret_key:
@@ -93,7 +93,7 @@ async def fetch_snapshot(ticker: str) -> QuoteData:
 
     now_ts = int(datetime.now(timezone.utc).timestamp())
 
-    return QuoteData(
+    return QuoteRecord(
         ticker=ticker,
         price=price,
         bid_price=float(latest_quote.get("bp", 0)),
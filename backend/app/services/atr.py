@@ -1,34 +1,56 @@
 """ATR (Average True Range) computation service.
 
-Computes the n-period ATR for a ticker using daily bars from the DB.
-Falls back to a synchronous Alpaca fetch when the DB doesn't have enough data.
+Computes the n-period ATR for a ticker using daily bars from the DB. When the
+DB is short on history, `compute_atr` backfills `daily_bar` from Alpaca
+through `backfill_daily_bars` (async, rate limited) and reads again, so a
+miss is paid once per ticker rather than on every call. Concurrent misses
+for the same ticker share one backfill. `warm_atr_bars` backfills many
+tickers at once so misses are rare; `atr_from_db` is the synchronous,
+DB-only variant for code that can't await.
+
+Results are cached per ticker and period in `app/services/bar_stats.py`
+until the next daily bar lands; `warm_bar_stats` fills that cache ahead of
+the order path. `bulk_atr` computes a whole basket in one set-based query.
 """
 
+import asyncio
 import logging
 from collections.abc import Callable
 from datetime import date, timedelta
 from decimal import Decimal
 from typing import Any
 
-import httpx
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session
 
-from app.config import get_config
 from app.db.models import DailyBar
+from app.db.session import db_session
+from app.services.bar_stats import (
+    BarStats,
+    get_local,
+    lookup_bar_stats,
+    merge_local,
+    remember_bar_stats,
+)
+from app.services.bars import backfill_daily_bars
 
 logger = logging.getLogger(__name__)
 
 ATR_PERIODS = 14  # standard 14-period ATR
 
+# ticker -> (n, the backfill currently fetching that n-period window). At
+# most one backfill per ticker talks to Alpaca at a time: callers whose
+# window fits join it, a caller needing a longer one waits for it and then
+# tops up only the older bars still missing.
+_inflight_backfills: dict[str, tuple[int, asyncio.Task[int]]] = {}
 
-def compute_atr(ticker: str, db: Session, n: int = ATR_PERIODS) -> Decimal:
-    """Return the n-period ATR for ticker.
 
-    Queries the DB first. If fewer than n+1 daily bars exist, fetches from
-    Alpaca synchronously and stores nothing (read-only fallback). Returns
-    Decimal("0") if data is unavailable — callers fall back to the percentage
-    buffer in that case.
-    """
+def _window_start(n: int, today: date) -> date:
+    # Calendar days that comfortably hold n+1 sessions around weekends/holidays.
+    return today - timedelta(days=(n + 1) * 2 + 10)
+
+
+def _recent_bars(db: Session, ticker: str, n: int) -> list[DailyBar]:
     bars = (
         db.query(DailyBar)
         .filter(DailyBar.ticker == ticker)
@@ -36,21 +58,264 @@ def compute_atr(ticker: str, db: Session, n: int = ATR_PERIODS) -> Decimal:
         .limit(n + 1)
         .all()
     )
-    bars = list(reversed(bars))  # oldest first
+    return list(reversed(bars))  # oldest first
 
-    if len(bars) >= n + 1:
-        return _atr_from_db_bars(bars, n)
 
-    # DB doesn't have enough bars — fetch from Alpaca synchronously
-    logger.debug("Not enough daily bars for %s in DB (%d), fetching from Alpaca", ticker, len(bars))
-    raw = _fetch_bars_sync(ticker, n + 5)  # extra buffer for weekends/holidays
-    if len(raw) >= n + 1:
-        return _atr_from_raw_bars(raw, n)
+def _atr_stats(db: Session, ticker: str, n: int) -> BarStats | None:
+    """The n-period ATR from stored bars, or None with fewer than n+1 bars."""
+    bars = _recent_bars(db, ticker, n)
+    if len(bars) < n + 1:
+        return None
+    return BarStats(as_of=bars[-1].date, atr={n: _atr_from_db_bars(bars, n)})
 
-    logger.warning("Insufficient bar data for ATR on %s — using 0 (percentage buffer only)", ticker)
+
+def _insufficient(ticker: str) -> Decimal:
+    logger.warning(
+        "Insufficient bar data for ATR on %s — using 0 (percentage buffer only)",
+        ticker,
+    )
     return Decimal("0")
 
 
+def atr_from_db(ticker: str, db: Session, n: int = ATR_PERIODS) -> Decimal:
+    """Return the n-period ATR from the local cache or the DB, never fetching.
+
+    Returns Decimal("0") when fewer than n+1 daily bars are stored — callers
+    fall back to the percentage buffer in that case.
+    """
+    cached = get_local(ticker)
+    if cached is not None and n in cached.atr:
+        return cached.atr[n]
+    stats = _atr_stats(db, ticker, n)
+    if stats is None:
+        return _insufficient(ticker)
+    merge_local(ticker, stats)
+    return stats.atr[n]
+
+
+async def compute_atr(ticker: str, db: Session, n: int = ATR_PERIODS) -> Decimal:
+    """Return the n-period ATR for ticker.
+
+    Served from the bar stats cache when possible, then from the DB. If fewer
+    than n+1 daily bars exist, backfills the missing sessions into
+    `daily_bar` and queries again. Returns Decimal("0") if data is still
+    unavailable — callers fall back to the percentage buffer in that case.
+    """
+    cached = await lookup_bar_stats(ticker)
+    if cached is not None and n in cached.atr:
+        return cached.atr[n]
+
+    stats = _atr_stats(db, ticker, n)
+    if stats is None:
+        logger.debug("Not enough daily bars for %s in DB, backfilling", ticker)
+        try:
+            await _backfill_history(ticker, n)
+        except Exception:
+            logger.exception("Failed to backfill daily bars for ATR on %s", ticker)
+        stats = _atr_stats(db, ticker, n)
+    if stats is None:
+        return _insufficient(ticker)
+    await remember_bar_stats(ticker, stats)
+    return stats.atr[n]
+
+
+async def _backfill_history(ticker: str, n: int) -> int:
+    """Backfill the ATR window for `ticker`, joining a backfill already running.
+
+    The backfill runs as its own task on its own session, so a caller that is
+    cancelled mid-wait doesn't abort it for the others.
+    """
+    while True:
+        window, task = _inflight_backfills.get(ticker, (0, None))
+        if task is None or task.done():
+            break
+        if window >= n:
+            return await asyncio.shield(task)
+        # Too short for this window: let it store its bars first, so the
+        # top-up below only fetches what lies before them.
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            pass
+
+    task = asyncio.create_task(_backfill_ticker(ticker, n))
+    _inflight_backfills[ticker] = (n, task)
+    task.add_done_callback(lambda done: _forget_backfill(ticker, done))
+    return await asyncio.shield(task)
+
+
+def _forget_backfill(ticker: str, task: asyncio.Task[int]) -> None:
+    # A later backfill may already have taken the ticker's slot.
+    if _inflight_backfills.get(ticker, (0, None))[1] is task:
+        del _inflight_backfills[ticker]
+
+
+async def _backfill_ticker(ticker: str, n: int) -> int:
+    today = date.today()
+    start = _window_start(n, today)
+    with db_session() as db:
+        return await backfill_daily_bars(
+            db,
+            [ticker],
+            f"{start.isoformat()}T00:00:00Z",
+            f"{today.isoformat()}T23:59:59Z",
+        )
+
+
+async def warm_atr_bars(
+    db: Session, tickers: list[str], n: int = ATR_PERIODS
+) -> int:
+    """Backfill daily bars for the tickers that can't yet compute an n-period ATR.
+
+    Tickers with fewer than n+1 recent bars are fetched together in one batched
+    Alpaca request. Returns the number of bars inserted.
+    """
+    if not tickers:
+        return 0
+    today = date.today()
+    start = _window_start(n, today)
+    counts = dict(
+        db.query(DailyBar.ticker, func.count())
+        .filter(DailyBar.ticker.in_(tickers), DailyBar.date >= start)
+        .group_by(DailyBar.ticker)
+        .all()
+    )
+    short = [ticker for ticker in tickers if counts.get(ticker, 0) < n + 1]
+    if not short:
+        return 0
+    return await backfill_daily_bars(
+        db, short, f"{start.isoformat()}T00:00:00Z", f"{today.isoformat()}T23:59:59Z"
+    )
+
+
+def _bulk_atr_query(tickers: list[str], n: int, since: date):
+    """(ticker, latest date, n-period ATR) for every ticker with n+1 bars.
+
+    Only bars from `since` on are ranked, which keeps the window sort to a
+    few weeks per ticker instead of its whole history. The inner window
+    keeps each ticker's newest n+1 of those; the outer one pairs
+    every bar with the previous close. True range is written as
+    max(high, prev_close) - min(low, prev_close), which equals the usual
+    three-way max and needs only CASE, so the query runs unchanged on
+    Postgres and SQLite.
+    """
+    recent = (
+        select(
+            DailyBar.ticker,
+            DailyBar.date,
+            DailyBar.high,
+            DailyBar.low,
+            DailyBar.close,
+            func.row_number()
+            .over(partition_by=DailyBar.ticker, order_by=DailyBar.date.desc())
+            .label("rn"),
+        )
+        .where(DailyBar.ticker.in_(tickers), DailyBar.date >= since)
+        .subquery()
+    )
+    paired = (
+        select(
+            recent.c.ticker,
+            recent.c.date,
+            recent.c.high,
+            recent.c.low,
+            func.lag(recent.c.close)
+            .over(partition_by=recent.c.ticker, order_by=recent.c.date)
+            .label("prev_close"),
+        )
+        .where(recent.c.rn <= n + 1)
+        .subquery()
+    )
+    true_range = case(
+        (paired.c.high > paired.c.prev_close, paired.c.high),
+        else_=paired.c.prev_close,
+    ) - case(
+        (paired.c.low < paired.c.prev_close, paired.c.low),
+        else_=paired.c.prev_close,
+    )
+    return (
+        select(paired.c.ticker, func.max(paired.c.date), func.sum(true_range) / n)
+        .where(paired.c.prev_close.is_not(None))
+        .group_by(paired.c.ticker)
+        .having(func.count() == n)
+    )
+
+
+def _bulk_atr_rows(
+    db: Session, tickers: list[str], n: int, today: date | None
+) -> list[tuple[str, date, Decimal]]:
+    if not tickers:
+        return []
+    since = _window_start(n, today or date.today())
+    return [
+        (ticker, as_of, Decimal(str(atr)))
+        for ticker, as_of, atr in db.execute(_bulk_atr_query(tickers, n, since))
+    ]
+
+
+def bulk_atr(
+    db: Session,
+    tickers: list[str],
+    n: int = ATR_PERIODS,
+    *,
+    today: date | None = None,
+) -> dict[str, Decimal]:
+    """n-period ATR for many tickers in a single query.
+
+    Tickers with fewer than n+1 bars in the same recent window
+    `warm_atr_bars` fills (counted back from `today`) are left out; the DB
+    is never backfilled here, so callers use `compute_atr` for those. The
+    arithmetic runs in the database's double precision, so values match
+    `compute_atr` to float rounding rather than digit for digit.
+    """
+    rows = _bulk_atr_rows(db, tickers, n, today)
+    return {ticker: atr for ticker, _, atr in rows}
+
+
+async def warm_bar_stats(
+    db: Session,
+    tickers: list[str],
+    periods: tuple[int, ...] = (ATR_PERIODS,),
+    *,
+    today: date | None = None,
+) -> int:
+    """Cache ATR for `periods` and the latest volume of each ticker.
+
+    One `bulk_atr` query per period plus one volume query cover the whole
+    basket. Returns the number of tickers with enough history to cache.
+    """
+    if not tickers:
+        return 0
+    by_ticker: dict[str, BarStats] = {}
+    for n in periods:
+        for ticker, as_of, atr in _bulk_atr_rows(db, tickers, n, today):
+            stats = BarStats(as_of=as_of, atr={n: atr})
+            current = by_ticker.get(ticker)
+            by_ticker[ticker] = stats if current is None else current.merge(stats)
+
+    latest = (
+        select(DailyBar.ticker, func.max(DailyBar.date).label("max_date"))
+        .where(DailyBar.ticker.in_(list(by_ticker)))
+        .group_by(DailyBar.ticker)
+        .subquery()
+    )
+    volumes = db.execute(
+        select(DailyBar.ticker, DailyBar.date, DailyBar.volume).join(
+            latest,
+            (DailyBar.ticker == latest.c.ticker) & (DailyBar.date == latest.c.max_date),
+        )
+    )
+    for ticker, as_of, volume in volumes:
+        if volume:
+            by_ticker[ticker] = by_ticker[ticker].merge(
+                BarStats(as_of=as_of, volume=Decimal(str(volume)))
+            )
+
+    for ticker, stats in by_ticker.items():
+        await remember_bar_stats(ticker, stats)
+    return len(by_ticker)
+
+
 def _compute_atr(
     bars: list,
     n: int,
@@ -73,46 +338,3 @@ def _atr_from_db_bars(bars: list, n: int) -> Decimal:
         n,
         lambda b: (Decimal(str(b.high)), Decimal(str(b.low)), Decimal(str(b.close))),
     )
-
-
-def _atr_from_raw_bars(raw: list[dict], n: int) -> Decimal:
-    """Compute ATR from a list of raw Alpaca bar dicts (oldest first).
-
-    Alpaca bar keys: t (time), o, h, l, c, v.
-    """
-    return _compute_atr(
-        raw,
-        n,
-        lambda b: (Decimal(str(b["h"])), Decimal(str(b["l"])), Decimal(str(b["c"]))),
-    )
-
-
-def _fetch_bars_sync(ticker: str, limit: int) -> list[dict]:
-    """Synchronous Alpaca daily bar fetch using httpx.Client.
-
-    Returns raw Alpaca bar dicts sorted oldest first, or [] on any error.
-    """
-    config = get_config()
-    headers = {
-        "APCA-API-KEY-ID": config.alpaca_api_key,
-        "APCA-API-SECRET-KEY": config.alpaca_secret_key,
-    }
-    end = date.today().isoformat()
-    # Fetch extra calendar days to account for weekends and holidays
-    start = (date.today() - timedelta(days=limit * 2)).isoformat()
-    url = f"{config.alpaca_data_base_url}/v2/stocks/{ticker}/bars"
-    params = {
-        "timeframe": "1Day",
-        "start": start,
-        "end": end,
-        "limit": limit,
-        "feed": config.alpaca_feed,
-    }
-    try:
-        with httpx.Client(timeout=10) as client:
-            resp = client.get(url, headers=headers, params=params)
-            resp.raise_for_status()
-            return resp.json().get("bars", [])
-    except Exception:
-        logger.exception("Failed to fetch Alpaca bars for ATR on %s", ticker)
-        return []
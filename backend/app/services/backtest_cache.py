@@ -0,0 +1,122 @@
+"""Content-addressed cache of `/strategies/backtest` responses.
+
+A backtest is a pure function of its normalized request and of the daily
+bars it reads. The cache key is a SHA-256 over both: the request (template,
+symbols in order, params, risk, capital, range) and, per symbol, a data
+stamp of the bars in the backtest's window (latest bar date and bar count,
+from one aggregate query). New or backfilled bars change the stamp, so a
+stale entry is never read again; it just ages out. No explicit
+invalidation is needed.
+
+Two tiers, like `bar_stats`: a small process-local LRU and a Redis string
+shared by every worker. Values are the serialized response JSON.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import DailyBar
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_BACKTEST_PREFIX = "backtest:"
+BACKTEST_CACHE_TTL_SECONDS = 3600
+BACKTEST_CACHE_LOCAL_MAX_ENTRIES = 64
+# Bump when a change to the engine changes results for the same bars.
+BACKTEST_CACHE_VERSION = 1
+
+
+def data_stamps(
+    db: Session, symbols: list[str], history_start: date, end: date
+) -> dict[str, list]:
+    """Per symbol, [latest bar date, bar count] over [history_start, end]."""
+    rows = db.execute(
+        select(DailyBar.ticker, func.max(DailyBar.date), func.count())
+        .where(
+            DailyBar.ticker.in_(symbols),
+            DailyBar.date >= history_start,
+            DailyBar.date <= end,
+        )
+        .group_by(DailyBar.ticker)
+    ).all()
+    return {ticker: [str(latest), count] for ticker, latest, count in rows}
+
+
+def backtest_cache_key(request: dict, stamps: dict[str, list]) -> str:
+    """Hex digest of a normalized backtest request and its data stamps."""
+    blob = json.dumps(
+        {"v": BACKTEST_CACHE_VERSION, "request": request, "data": stamps},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# key -> (monotonic expiry, response JSON), least recently used first.
+_local: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+
+def get_local(key: str) -> str | None:
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires_at, payload = entry
+    if expires_at <= time.monotonic():
+        _local.pop(key, None)
+        return None
+    _local.move_to_end(key)
+    return payload
+
+
+def put_local(key: str, payload: str) -> None:
+    _local[key] = (time.monotonic() + BACKTEST_CACHE_TTL_SECONDS, payload)
+    _local.move_to_end(key)
+    while len(_local) > BACKTEST_CACHE_LOCAL_MAX_ENTRIES:
+        _local.popitem(last=False)
+
+
+async def read_redis(key: str) -> str | None:
+    try:
+        raw = await (await get_redis()).get(f"{REDIS_BACKTEST_PREFIX}{key}")
+    except Exception as exc:
+        logger.warning("Backtest cache read failed: %s", exc)
+        return None
+    if raw is None:
+        return None
+    return raw.decode() if isinstance(raw, bytes) else raw
+
+
+async def write_redis(key: str, payload: str) -> None:
+    try:
+        await (await get_redis()).set(
+            f"{REDIS_BACKTEST_PREFIX}{key}", payload, ex=BACKTEST_CACHE_TTL_SECONDS
+        )
+    except Exception as exc:
+        logger.warning("Backtest cache write failed: %s", exc)
+
+
+async def get_cached_backtest(key: str) -> str | None:
+    """Cached response JSON for `key`: local tier first, then Redis."""
+    payload = get_local(key)
+    if payload is not None:
+        return payload
+    payload = await read_redis(key)
+    if payload is not None:
+        put_local(key, payload)
+    return payload
+
+
+async def store_backtest(key: str, payload: str) -> None:
+    put_local(key, payload)
+    await write_redis(key, payload)
@@ -0,0 +1,219 @@
+"""Asynchronous backtest jobs: submit now, poll or stream progress, fetch the
+result later.
+
+A job wraps one unit of backtest work (a coroutine supplied by the router)
+and runs it as an asyncio task. At most `backtest_job_workers` jobs run at
+once; the rest wait in submission order on a semaphore. Each user may have
+`backtest_jobs_per_user` jobs queued or running, so a few heavy backtests
+can't starve everyone else.
+
+Work reports progress through `BacktestJob.record_day`, which the
+simulation calls once per day from its worker thread. That is also where
+cancellation lands: a queued job's task is cancelled outright, but a running
+job only has its flag set and stops at the next day (or the next
+`check_cancelled`), so the thread and its DB session are never torn down
+mid-query.
+
+Like the per-user rate limiter, state lives in process memory: jobs are
+tied to the worker that accepted them. Finished jobs are kept for
+BACKTEST_JOB_RETENTION_SECONDS and purged lazily.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.config import get_config
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_JOB_RETENTION_SECONDS = 3600
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_JOB_STATUSES = frozenset({JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED})
+
+
+class BacktestJobCancelled(Exception):
+    """Raised inside a job's work once it has been asked to stop."""
+
+
+class BacktestJobError(Exception):
+    """A job failure whose message is safe to show the user."""
+
+
+class BacktestJobLimitError(Exception):
+    """The user already has the maximum number of active jobs."""
+
+
+@dataclass
+class BacktestJob:
+    id: str
+    user_id: str
+    status: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = None
+    days_done: int = 0
+    days_total: int = 0
+    # Equity points so far, serialized; appended from the worker thread.
+    equity_curve: list[dict] = field(default_factory=list)
+    result: dict | None = None
+    error: str | None = None
+    cancel_requested: threading.Event = field(default_factory=threading.Event)
+    task: asyncio.Task | None = field(default=None, repr=False)
+    finished_monotonic: float | None = field(default=None, repr=False)
+
+    @property
+    def progress(self) -> float:
+        if self.status == JOB_SUCCEEDED:
+            return 1.0
+        if self.days_total <= 0:
+            return 0.0
+        return self.days_done / self.days_total
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_JOB_STATUSES
+
+    def check_cancelled(self) -> None:
+        if self.cancel_requested.is_set():
+            raise BacktestJobCancelled()
+
+    def record_day(self, days_done: int, days_total: int, point: dict) -> None:
+        """`simulate_backtest`'s on_day hook: record progress, honour cancel."""
+        self.check_cancelled()
+        self.equity_curve.append(point)
+        self.days_total = days_total
+        self.days_done = days_done
+
+
+JobWork = Callable[[BacktestJob], Awaitable[dict]]
+
+
+class BacktestJobManager:
+    """In-process registry and bounded runner for backtest jobs."""
+
+    def __init__(self, workers: int, jobs_per_user: int) -> None:
+        if workers <= 0 or jobs_per_user <= 0:
+            raise ValueError("workers and jobs_per_user must be > 0")
+        self.jobs_per_user = jobs_per_user
+        self._slots = asyncio.Semaphore(workers)
+        self._jobs: dict[str, BacktestJob] = {}
+
+    def submit(self, user_id: str, work: JobWork) -> BacktestJob:
+        """Queue `work` for `user_id` and return its job right away.
+
+        Raises BacktestJobLimitError if the user has too many active jobs.
+        """
+        self._purge_expired()
+        active = sum(
+            1
+            for job in self._jobs.values()
+            if job.user_id == user_id and not job.finished
+        )
+        if active >= self.jobs_per_user:
+            raise BacktestJobLimitError(
+                f"At most {self.jobs_per_user} backtest jobs may run at once"
+            )
+        job = BacktestJob(id=uuid.uuid4().hex, user_id=user_id)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, work))
+        return job
+
+    def get(self, job_id: str, user_id: str) -> BacktestJob | None:
+        """The job, if it exists and belongs to `user_id`."""
+        self._purge_expired()
+        job = self._jobs.get(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    def cancel(self, job_id: str, user_id: str) -> BacktestJob | None:
+        job = self.get(job_id, user_id)
+        if job is not None:
+            self._cancel(job)
+        return job
+
+    def shutdown(self) -> None:
+        for job in list(self._jobs.values()):
+            self._cancel(job)
+
+    def _cancel(self, job: BacktestJob) -> None:
+        if job.finished:
+            return
+        job.cancel_requested.set()
+        if job.status == JOB_QUEUED:
+            if job.task is not None:
+                job.task.cancel()
+            self._finish(job, JOB_CANCELLED)
+
+    async def _run(self, job: BacktestJob, work: JobWork) -> None:
+        try:
+            async with self._slots:
+                job.check_cancelled()
+                job.status = JOB_RUNNING
+                job.result = await work(job)
+            self._finish(job, JOB_SUCCEEDED)
+        except (asyncio.CancelledError, BacktestJobCancelled):
+            self._finish(job, JOB_CANCELLED)
+        except BacktestJobError as exc:
+            self._finish(job, JOB_FAILED, str(exc))
+        except Exception:
+            logger.exception("Backtest job %s failed", job.id)
+            self._finish(job, JOB_FAILED, "Backtest failed")
+
+    @staticmethod
+    def _finish(job: BacktestJob, status: str, error: str | None = None) -> None:
+        if job.finished:
+            return
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        job.finished_monotonic = time.monotonic()
+        job.task = None
+
+    def _purge_expired(self) -> None:
+        cutoff = time.monotonic() - BACKTEST_JOB_RETENTION_SECONDS
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_monotonic is not None and job.finished_monotonic < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_manager: BacktestJobManager | None = None
+
+
+def get_backtest_job_manager() -> BacktestJobManager:
+    global _manager
+    if _manager is None:
+        config = get_config()
+        _manager = BacktestJobManager(
+            workers=max(1, config.backtest_job_workers),
+            jobs_per_user=max(1, config.backtest_jobs_per_user),
+        )
+    return _manager
+
+
+def shutdown_backtest_jobs() -> None:
+    """Cancel every unfinished job; called on app shutdown."""
+    if _manager is not None:
+        _manager.shutdown()
+
+
+def _reset_for_tests() -> None:
+    """Drop the shared manager. Tests call this in fixtures to isolate state."""
+    global _manager
+    _manager = None
@@ -0,0 +1,375 @@
+"""Parameter sweeps: one strategy template backtested over a grid of params.
+
+Combinations are split into chunks and simulated in a process pool. The
+bars are shared through the memory-mapped bar store (`bar_store`): the
+caller refreshes it for the sweep's symbols once, and every worker maps the
+same files, so the OS page cache holds one copy whatever the pool size.
+Every combination runs the same `simulate_backtest` as
+`/strategies/backtest`, so a sweep result reproduces the single backtest
+with those params exactly.
+
+Workers return a summary per combination (no curves or trade lists) and the
+summaries come back ranked by one of SWEEP_METRICS.
+
+With precision "float64" the combinations run through
+`simulate_backtest_float64` instead, which is faster but not bit-exact;
+`reconcile_sweep_result` then re-runs the chosen combination through the
+Decimal path and reports how far the float64 summary was off.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from multiprocessing import get_context
+from pathlib import Path
+
+from app.config import get_config
+from app.services.strategy_engine import (
+    BacktestBars,
+    backtest_history_start,
+    load_backtest_bars_from_store,
+    simulate_backtest,
+    simulate_backtest_float64,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_SWEEP_COMBINATIONS = 1000
+# Higher is better for every metric (max_drawdown is <= 0).
+SWEEP_METRICS = (
+    "ending_equity",
+    "total_return",
+    "win_rate",
+    "avg_return_per_trade",
+    "max_drawdown",
+)
+# Chunks per worker, so a slow chunk doesn't leave the other workers idle.
+_CHUNKS_PER_WORKER = 4
+SIMULATION_PRECISIONS = ("decimal", "float64")
+# Largest |float64 - Decimal| ending equity, as a fraction of the starting
+# capital, that a reconciled result may show without being flagged.
+RECONCILE_TOLERANCE = Decimal("0.000001")
+_SIMULATORS = {"decimal": simulate_backtest, "float64": simulate_backtest_float64}
+
+
+class SweepGridError(ValueError):
+    """The parameter grid is malformed or expands to too many combinations."""
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    params_json: dict
+    ending_equity: Decimal
+    total_return: float
+    win_rate: float
+    avg_return_per_trade: float
+    max_drawdown: float
+    trade_count: int
+
+
+@dataclass(frozen=True)
+class SweepReconciliation:
+    """A float64 sweep result next to its exact Decimal re-run."""
+
+    approximate: SweepResult
+    exact: SweepResult
+    # |approximate - exact| ending equity as a fraction of starting capital.
+    ending_equity_divergence: Decimal
+    trade_count_divergence: int
+    within_tolerance: bool
+
+
+def _range_values(spec: dict) -> list:
+    try:
+        start, stop = Decimal(str(spec["start"])), Decimal(str(spec["stop"]))
+        step = Decimal(str(spec.get("step", 1)))
+    except (KeyError, InvalidOperation):
+        raise SweepGridError("Ranges need numeric start, stop and step")
+    if step <= 0 or stop < start:
+        raise SweepGridError("Ranges need step > 0 and stop >= start")
+    if (stop - start) / step >= MAX_SWEEP_COMBINATIONS:
+        raise SweepGridError(f"At most {MAX_SWEEP_COMBINATIONS} combinations per sweep")
+    values = []
+    value = start
+    while value <= stop:
+        values.append(int(value) if value == value.to_integral_value() else str(value))
+        value += step
+    return values
+
+
+def expand_param_grid(base_params: dict, grid: dict) -> list[dict]:
+    """Every combination of `grid` layered over `base_params`.
+
+    Each grid value is either a list of values or an inclusive range
+    ``{"start": 5, "stop": 20, "step": 5}``. Combinations come out in the
+    order of the grid's keys, last key varying fastest.
+    """
+    if not grid:
+        return [dict(base_params)]
+    keys = list(grid)
+    axes = []
+    for key in keys:
+        spec = grid[key]
+        values = _range_values(spec) if isinstance(spec, dict) else list(spec)
+        if not values:
+            raise SweepGridError(f"No values to sweep for {key}")
+        axes.append(values)
+    total = 1
+    for values in axes:
+        total *= len(values)
+    if total > MAX_SWEEP_COMBINATIONS:
+        raise SweepGridError(f"At most {MAX_SWEEP_COMBINATIONS} combinations per sweep")
+    return [
+        {**base_params, **dict(zip(keys, combination))}
+        for combination in itertools.product(*axes)
+    ]
+
+
+def summarize_backtest(
+    params_json: dict, result: dict, capital: Decimal
+) -> SweepResult:
+    ending_equity = Decimal(result["ending_equity"])
+    return SweepResult(
+        params_json=params_json,
+        ending_equity=ending_equity,
+        total_return=float((ending_equity - capital) / capital) if capital else 0.0,
+        win_rate=result["win_rate"],
+        avg_return_per_trade=result["avg_return_per_trade"],
+        max_drawdown=result["max_drawdown"],
+        trade_count=len(result["trades"]),
+    )
+
+
+def rank_results(results: list[SweepResult], metric: str) -> list[SweepResult]:
+    """Best first by `metric`; ties keep grid order."""
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown sweep metric {metric!r}")
+    return sorted(results, key=lambda result: getattr(result, metric), reverse=True)
+
+
+def simulate_combinations(
+    bars: BacktestBars,
+    *,
+    strategy_type: str,
+    combinations: list[dict],
+    risk_json: dict,
+    capital_allocation: Decimal,
+    start: date,
+    end: date | None = None,
+    precision: str = "decimal",
+) -> list[SweepResult]:
+    simulate = _SIMULATORS[precision]
+    return [
+        summarize_backtest(
+            params,
+            simulate(
+                bars,
+                strategy_type=strategy_type,
+                params_json=params,
+                risk_json=risk_json,
+                capital_allocation=capital_allocation,
+                start=start,
+                end=end,
+            ),
+            capital_allocation,
+        )
+        for params in combinations
+    ]
+
+
+def _simulate_chunk(
+    symbols: list[str],
+    history_start: date,
+    load_end: date,
+    bar_store_dir: str,
+    **kwargs,
+) -> list[SweepResult]:
+    bars = load_backtest_bars_from_store(
+        symbols, history_start, load_end, root=Path(bar_store_dir)
+    )
+    return simulate_combinations(bars, **kwargs)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def sweep_workers() -> int:
+    return get_config().backtest_sweep_workers or os.cpu_count() or 1
+
+
+def get_sweep_pool() -> ProcessPoolExecutor:
+    """The shared sweep process pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking the threaded API process isn't safe.
+            _pool = ProcessPoolExecutor(
+                max_workers=sweep_workers(), mp_context=get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_sweep_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def sweep_history_start(
+    strategy_type: str, combinations: list[dict], risk_json: dict, start: date
+) -> date:
+    """First date any of `combinations` needs bars from."""
+    return min(
+        backtest_history_start(strategy_type, params, risk_json, start)
+        for params in combinations
+    )
+
+
+def run_sweep_jobs(
+    *,
+    symbols: list[str],
+    history_start: date,
+    end: date,
+    jobs: list[dict],
+    bars: BacktestBars | None = None,
+) -> list[list[SweepResult]]:
+    """Run several sweeps over the same bars; one result list per job.
+
+    Each job is the keyword arguments of `simulate_combinations` (minus the
+    bars). All jobs' combinations are chunked into one batch for the pool,
+    whose workers read bars from `history_start` to `end` out of the bar
+    store; the caller has refreshed it for `symbols`. Passing preloaded
+    `bars` instead (the store is disabled) or configuring one worker runs
+    everything in this process. Blocks until done; call it from a worker
+    thread.
+    """
+    workers = sweep_workers()
+    total = sum(len(job["combinations"]) for job in jobs)
+    if bars is not None or workers <= 1 or total <= 1:
+        if bars is None:
+            bars = load_backtest_bars_from_store(symbols, history_start, end)
+        return [simulate_combinations(bars, **job) for job in jobs]
+
+    chunk_size = -(-total // (workers * _CHUNKS_PER_WORKER))
+    pool = get_sweep_pool()
+    bar_store_dir = get_config().bar_store_dir
+    futures = [
+        [
+            pool.submit(
+                _simulate_chunk,
+                symbols,
+                history_start,
+                end,
+                bar_store_dir,
+                **{**job, "combinations": job["combinations"][i : i + chunk_size]},
+            )
+            for i in range(0, len(job["combinations"]), chunk_size)
+        ]
+        for job in jobs
+    ]
+    return [
+        [result for future in job_futures for result in future.result()]
+        for job_futures in futures
+    ]
+
+
+def run_param_sweep(
+    *,
+    symbols: list[str],
+    strategy_type: str,
+    combinations: list[dict],
+    risk_json: dict,
+    capital_allocation: Decimal,
+    start: date,
+    end: date,
+    metric: str = "ending_equity",
+    bars: BacktestBars | None = None,
+    precision: str = "decimal",
+) -> list[SweepResult]:
+    """Backtest every combination over `symbols`, ranked best first by `metric`.
+
+    Runs as one `run_sweep_jobs` job; see there for where bars come from.
+    """
+    (results,) = run_sweep_jobs(
+        symbols=symbols,
+        history_start=sweep_history_start(
+            strategy_type, combinations, risk_json, start
+        ),
+        end=end,
+        jobs=[
+            dict(
+                strategy_type=strategy_type,
+                combinations=combinations,
+                risk_json=risk_json,
+                capital_allocation=capital_allocation,
+                start=start,
+                precision=precision,
+            )
+        ],
+        bars=bars,
+    )
+    return rank_results(results, metric)
+
+
+def reconcile_sweep_result(
+    result: SweepResult,
+    *,
+    symbols: list[str],
+    strategy_type: str,
+    risk_json: dict,
+    capital_allocation: Decimal,
+    start: date,
+    end: date,
+    bars: BacktestBars | None = None,
+    tolerance: Decimal = RECONCILE_TOLERANCE,
+) -> SweepReconciliation:
+    """Re-run a float64 sweep result's combination through the Decimal path.
+
+    Bars come from the bar store unless preloaded `bars` are passed, as in
+    `run_sweep_jobs`.
+    """
+    if bars is None:
+        history_start = backtest_history_start(
+            strategy_type, result.params_json, risk_json, start
+        )
+        bars = load_backtest_bars_from_store(symbols, history_start, end)
+    (exact,) = simulate_combinations(
+        bars,
+        strategy_type=strategy_type,
+        combinations=[result.params_json],
+        risk_json=risk_json,
+        capital_allocation=capital_allocation,
+        start=start,
+        end=end,
+    )
+    divergence = abs(result.ending_equity - exact.ending_equity) / capital_allocation
+    reconciliation = SweepReconciliation(
+        approximate=result,
+        exact=exact,
+        ending_equity_divergence=divergence,
+        trade_count_divergence=abs(result.trade_count - exact.trade_count),
+        within_tolerance=divergence <= tolerance
+        and result.trade_count == exact.trade_count,
+    )
+    if not reconciliation.within_tolerance:
+        logger.warning(
+            "float64 sweep diverged from Decimal for %s %s: equity %s vs %s, "
+            "%d vs %d trades",
+            strategy_type,
+            result.params_json,
+            result.ending_equity,
+            exact.ending_equity,
+            result.trade_count,
+            exact.trade_count,
+        )
+    return reconciliation
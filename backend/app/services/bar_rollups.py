@@ -0,0 +1,183 @@
+"""Weekly/monthly/... rollups of daily bars in `daily_bar_rollup`.
+
+Aggregated charts used to `date_trunc` + `array_agg` all of daily_bar on every
+request. The rollup rows are instead kept current as daily bars are
+inserted: `refresh_rollups` recomputes only the periods containing the new
+dates (for the normal daily append that's just the open week/month/...), and
+reads become an indexed range scan on the primary key.
+"""
+
+from collections.abc import Iterable, Mapping
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import DailyBar, DailyBarRollup
+
+# timeframe -> period length in months (weeks are handled separately)
+_MONTHS_PER_PERIOD = {"1Month": 1, "3Month": 3, "6Month": 6, "1Year": 12}
+ROLLUP_TIMEFRAMES = ("1Week", *_MONTHS_PER_PERIOD)
+
+
+def period_start(timeframe: str, day: date) -> date:
+    """First day of the `timeframe` period containing `day` (weeks start Monday)."""
+    if timeframe == "1Week":
+        return day - timedelta(days=day.weekday())
+    months = _MONTHS_PER_PERIOD[timeframe]
+    return date(day.year, (day.month - 1) // months * months + 1, 1)
+
+
+def period_end(timeframe: str, start: date) -> date:
+    """Exclusive end of the period beginning at `start`."""
+    if timeframe == "1Week":
+        return start + timedelta(days=7)
+    month_index = start.month - 1 + _MONTHS_PER_PERIOD[timeframe]
+    return date(start.year + month_index // 12, month_index % 12 + 1, 1)
+
+
+def _aggregate(
+    ticker: str, timeframe: str, start: date, bars: list[DailyBar]
+) -> dict:
+    """One rollup row from the period's daily bars (oldest first)."""
+    volume = sum(bar.volume for bar in bars)
+    vwap_notional = [bar.vwap * bar.volume for bar in bars if bar.vwap is not None]
+    return {
+        "ticker": ticker,
+        "timeframe": timeframe,
+        "period_start": start,
+        "open": bars[0].open,
+        "high": max(bar.high for bar in bars),
+        "low": min(bar.low for bar in bars),
+        "close": bars[-1].close,
+        "volume": volume,
+        "trade_count": sum(bar.trade_count or 0 for bar in bars),
+        "vwap": sum(vwap_notional) / volume if vwap_notional and volume else None,
+    }
+
+
+def refresh_rollups(
+    db: Session, dates_by_ticker: Mapping[str, Iterable[date]]
+) -> int:
+    """Recompute the rollup periods that contain the given daily bar dates.
+
+    Does not commit, so callers can keep the rollups in the same transaction
+    as the daily bar insert. Returns the number of rollup rows written.
+    """
+    rows: list[dict] = []
+    for ticker, dates in dates_by_ticker.items():
+        touched = {
+            timeframe: {period_start(timeframe, day) for day in dates}
+            for timeframe in ROLLUP_TIMEFRAMES
+        }
+        if not touched["1Week"]:
+            continue
+        lo = min(min(starts) for starts in touched.values())
+        hi = max(
+            period_end(timeframe, max(starts))
+            for timeframe, starts in touched.items()
+        )
+        bars = (
+            db.query(DailyBar)
+            .filter(
+                DailyBar.ticker == ticker,
+                DailyBar.date >= lo,
+                DailyBar.date < hi,
+            )
+            .order_by(DailyBar.date)
+            .all()
+        )
+
+        for timeframe, starts in touched.items():
+            grouped: dict[date, list[DailyBar]] = {}
+            for bar in bars:
+                start = period_start(timeframe, bar.date)
+                if start in starts:
+                    grouped.setdefault(start, []).append(bar)
+            rows.extend(
+                _aggregate(ticker, timeframe, start, period_bars)
+                for start, period_bars in grouped.items()
+            )
+
+    if not rows:
+        return 0
+    stmt = pg_insert(DailyBarRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ticker", "timeframe", "period_start"],
+        set_={
+            column: stmt.excluded[column]
+            for column in (
+                "open",
+                "high",
+                "low",
+                "close",
+                "volume",
+                "trade_count",
+                "vwap",
+            )
+        },
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+def read_rollups(
+    db: Session, ticker: str, timeframe: str, start: date, end: date
+) -> list[dict]:
+    """Rollup bars for every period overlapping [start, end], oldest first."""
+    rows = (
+        db.query(DailyBarRollup)
+        .filter(
+            DailyBarRollup.ticker == ticker,
+            DailyBarRollup.timeframe == timeframe,
+            DailyBarRollup.period_start >= period_start(timeframe, start),
+            DailyBarRollup.period_start <= end,
+        )
+        .order_by(DailyBarRollup.period_start)
+        .all()
+    )
+    return [
+        {
+            "time": int(
+                datetime(
+                    row.period_start.year,
+                    row.period_start.month,
+                    row.period_start.day,
+                    tzinfo=timezone.utc,
+                ).timestamp()
+            ),
+            "open": row.open,
+            "high": row.high,
+            "low": row.low,
+            "close": row.close,
+            "volume": row.volume,
+            "trade_count": int(row.trade_count or 0),
+            "vwap": row.vwap,
+        }
+        for row in rows
+    ]
+
+
+def read_rollup_rows(
+    db: Session, ticker: str, timeframe: str, start: date, end: date
+) -> list[tuple]:
+    """`read_rollups` as plain (period_start, open, high, low, close, volume)
+    tuples, for callers that don't need a dict per bar."""
+    return (
+        db.query(
+            DailyBarRollup.period_start,
+            DailyBarRollup.open,
+            DailyBarRollup.high,
+            DailyBarRollup.low,
+            DailyBarRollup.close,
+            DailyBarRollup.volume,
+        )
+        .filter(
+            DailyBarRollup.ticker == ticker,
+            DailyBarRollup.timeframe == timeframe,
+            DailyBarRollup.period_start >= period_start(timeframe, start),
+            DailyBarRollup.period_start <= end,
+        )
+        .order_by(DailyBarRollup.period_start)
+        .all()
+    )
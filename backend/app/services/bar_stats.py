@@ -0,0 +1,194 @@
+"""Per-ticker cache of the daily-bar statistics the order path reads.
+
+Order placement and strategy sizing need a ticker's n-period ATR and the
+latest session's volume. Both only change when a new daily bar lands, so
+they are cached here rather than recomputed from `daily_bar` per order.
+
+Two tiers: a process-local dict (the only tier synchronous code can use)
+and a Redis JSON value shared by every worker. An entry records the date of
+the latest bar it was computed from (`as_of`). Values computed from an older
+latest bar never overwrite a newer entry, and `backfill_daily_bars` drops
+the entries of every ticker it inserts bars for. Local entries also expire
+after BAR_STATS_LOCAL_TTL_SECONDS so a worker notices bars another process
+inserted. ATR itself is computed in `app/services/atr.py`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field, replace
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.db.models import DailyBar
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_BAR_STATS_PREFIX = "barstats:"
+# Backstop for an invalidation that never reached Redis.
+BAR_STATS_REDIS_TTL_SECONDS = 24 * 3600
+BAR_STATS_LOCAL_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True, slots=True)
+class BarStats:
+    """Statistics of one ticker's daily bars up to and including `as_of`."""
+
+    as_of: date
+    volume: Decimal | None = None  # latest session's volume, None if unknown
+    atr: Mapping[int, Decimal] = field(default_factory=dict)  # period -> ATR
+
+    def merge(self, other: BarStats) -> BarStats:
+        """Combine two entries, keeping the newer one when `as_of` differs."""
+        if other.as_of != self.as_of:
+            return other if other.as_of > self.as_of else self
+        return replace(
+            self,
+            volume=other.volume if other.volume is not None else self.volume,
+            atr={**self.atr, **other.atr},
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "as_of": self.as_of.isoformat(),
+                "volume": None if self.volume is None else str(self.volume),
+                "atr": {str(n): str(value) for n, value in self.atr.items()},
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> BarStats:
+        data = json.loads(raw)
+        volume = data.get("volume")
+        return cls(
+            as_of=date.fromisoformat(data["as_of"]),
+            volume=None if volume is None else Decimal(volume),
+            atr={int(n): Decimal(value) for n, value in data.get("atr", {}).items()},
+        )
+
+
+# ticker -> (monotonic expiry, stats)
+_local: dict[str, tuple[float, BarStats]] = {}
+
+
+def get_local(ticker: str) -> BarStats | None:
+    entry = _local.get(ticker)
+    if entry is None:
+        return None
+    expires_at, stats = entry
+    if expires_at <= time.monotonic():
+        _local.pop(ticker, None)
+        return None
+    return stats
+
+
+def merge_local(ticker: str, stats: BarStats) -> BarStats:
+    """Merge `stats` into the local entry for `ticker`. Returns the result."""
+    current = get_local(ticker)
+    merged = stats if current is None else current.merge(stats)
+    _local[ticker] = (time.monotonic() + BAR_STATS_LOCAL_TTL_SECONDS, merged)
+    return merged
+
+
+async def read_redis(ticker: str) -> BarStats | None:
+    """The shared Redis entry for `ticker`, or None on miss/error."""
+    try:
+        raw = await (await get_redis()).get(f"{REDIS_BAR_STATS_PREFIX}{ticker}")
+        return BarStats.from_json(raw) if raw else None
+    except Exception as exc:
+        logger.warning("Bar stats cache read failed for %s: %s", ticker, exc)
+        return None
+
+
+async def write_redis(ticker: str, stats: BarStats) -> None:
+    try:
+        await (await get_redis()).set(
+            f"{REDIS_BAR_STATS_PREFIX}{ticker}",
+            stats.to_json(),
+            ex=BAR_STATS_REDIS_TTL_SECONDS,
+        )
+    except Exception as exc:
+        logger.warning("Bar stats cache write failed for %s: %s", ticker, exc)
+
+
+async def delete_redis(tickers: list[str]) -> None:
+    try:
+        await (await get_redis()).delete(
+            *(f"{REDIS_BAR_STATS_PREFIX}{ticker}" for ticker in tickers)
+        )
+    except Exception as exc:
+        logger.warning("Bar stats cache invalidation failed: %s", exc)
+
+
+async def lookup_bar_stats(ticker: str) -> BarStats | None:
+    """Cached stats for `ticker`: local tier first, then Redis."""
+    stats = get_local(ticker)
+    if stats is not None:
+        return stats
+    stats = await read_redis(ticker)
+    if stats is not None:
+        merge_local(ticker, stats)
+    return stats
+
+
+async def remember_bar_stats(ticker: str, stats: BarStats) -> BarStats:
+    """Merge `stats` into both tiers. Returns the merged entry."""
+    merged = merge_local(ticker, stats)
+    await write_redis(ticker, merged)
+    return merged
+
+
+async def invalidate_bar_stats(tickers: Iterable[str]) -> None:
+    """Drop cached stats for `tickers` after new daily bars were stored."""
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return
+    for ticker in tickers:
+        _local.pop(ticker, None)
+    await delete_redis(tickers)
+
+
+def _volume_from_db(db: Session, ticker: str) -> BarStats | None:
+    latest = (
+        db.query(DailyBar.date, DailyBar.volume)
+        .filter(DailyBar.ticker == ticker)
+        .order_by(DailyBar.date.desc())
+        .first()
+    )
+    if latest is None:
+        return None
+    bar_date, volume = latest
+    return BarStats(as_of=bar_date, volume=Decimal(str(volume)) if volume else None)
+
+
+def latest_volume(db: Session, ticker: str) -> Decimal | None:
+    """Latest session volume for `ticker` from the local tier or the DB.
+
+    None when there's no bar or it reported no volume — callers fall back to
+    their default slippage in that case.
+    """
+    cached = get_local(ticker)
+    if cached is not None and cached.volume is not None:
+        return cached.volume
+    stats = _volume_from_db(db, ticker)
+    if stats is None:
+        return None
+    return merge_local(ticker, stats).volume
+
+
+async def get_latest_volume(db: Session, ticker: str) -> Decimal | None:
+    """Like `latest_volume`, also consulting and filling the Redis tier."""
+    cached = await lookup_bar_stats(ticker)
+    if cached is not None and cached.volume is not None:
+        return cached.volume
+    stats = _volume_from_db(db, ticker)
+    if stats is None:
+        return None
+    return (await remember_bar_stats(ticker, stats)).volume
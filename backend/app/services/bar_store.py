@@ -0,0 +1,240 @@
+"""Memory-mapped columnar cache of daily_bar for analytics workloads.
+
+Each ticker is one ``.npy`` file under `Config.bar_store_dir` holding an
+int64 array of shape ``(len(BAR_STORE_FIELDS), n)``. Every row is one field
+stored contiguously and oldest first: dates as days since the epoch,
+`trade_count` as integers, and the float fields as raw float64 bit patterns
+that are read back through `.view(np.float64)`. A single file per ticker
+means a refresh is one atomic `os.replace`.
+
+Readers `np.load(..., mmap_mode="r")` the file, so slicing ten years of bars
+costs a `searchsorted` rather than an ORM round trip, and the pages live in
+the OS page cache shared by every worker process. `refresh_bar_store` brings
+files up to date from Postgres. When only newer sessions were added it reads
+just those rows; anything else (a backfilled gap, older history) rewrites
+the file.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_config
+from app.db.models import DailyBar
+
+logger = logging.getLogger(__name__)
+
+BAR_STORE_FIELDS = (
+    "date",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "trade_count",
+    "vwap",
+)
+_FLOAT_FIELDS = frozenset({"open", "high", "low", "close", "volume", "vwap"})
+_ROW = {name: i for i, name in enumerate(BAR_STORE_FIELDS)}
+
+# path -> (st_mtime_ns, st_ino, mapped array); reopened when the file is replaced.
+_mapped: dict[Path, tuple[int, int, np.ndarray]] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class BarArrays:
+    """Read-only NumPy views of one ticker's daily bars, oldest first."""
+
+    dates: np.ndarray  # datetime64[D]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    trade_count: np.ndarray  # int64
+    vwap: np.ndarray  # NaN where Alpaca sent none
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def _store_dir() -> Path:
+    return Path(get_config().bar_store_dir)
+
+
+def _ticker_path(ticker: str, root: Path | None = None) -> Path:
+    return (root or _store_dir()) / f"{ticker.replace('/', '_')}.npy"
+
+
+def _open(path: Path) -> np.ndarray | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        _mapped.pop(path, None)
+        return None
+    cached = _mapped.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_ino):
+        return cached[2]
+    data = np.load(path, mmap_mode="r")
+    _mapped[path] = (stat.st_mtime_ns, stat.st_ino, data)
+    return data
+
+
+def _views(data: np.ndarray, lo: int, hi: int) -> BarArrays:
+    def column(name: str) -> np.ndarray:
+        values = data[_ROW[name], lo:hi]
+        return values.view(np.float64) if name in _FLOAT_FIELDS else values
+
+    return BarArrays(
+        dates=column("date").view("datetime64[D]"),
+        open=column("open"),
+        high=column("high"),
+        low=column("low"),
+        close=column("close"),
+        volume=column("volume"),
+        trade_count=column("trade_count"),
+        vwap=column("vwap"),
+    )
+
+
+_EMPTY = _views(np.zeros((len(BAR_STORE_FIELDS), 0), dtype=np.int64), 0, 0)
+
+
+def get_bars(
+    ticker: str,
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    root: Path | None = None,
+) -> BarArrays:
+    """Views of the stored bars for `ticker` with start <= date <= end.
+
+    Returns empty arrays when the ticker has no file yet; callers that need
+    fresh data call `refresh_bar_store` first.
+    """
+    data = _open(_ticker_path(ticker, root))
+    if data is None or data.shape[1] == 0:
+        return _EMPTY
+    days = data[_ROW["date"]]
+    lo = 0 if start is None else int(np.searchsorted(days, _epoch_day(start), "left"))
+    hi = (
+        data.shape[1]
+        if end is None
+        else int(np.searchsorted(days, _epoch_day(end), "right"))
+    )
+    return _views(data, lo, hi)
+
+
+def get_bars_many(
+    tickers: Iterable[str],
+    start: date | None = None,
+    end: date | None = None,
+    *,
+    root: Path | None = None,
+) -> dict[str, BarArrays]:
+    return {ticker: get_bars(ticker, start, end, root=root) for ticker in tickers}
+
+
+def _epoch_day(day: date) -> int:
+    return int(np.datetime64(day, "D").astype(np.int64))
+
+
+def _to_columns(rows: list[tuple]) -> np.ndarray:
+    """(date, open, ..., vwap) tuples in BAR_STORE_FIELDS order -> int64 block."""
+    out = np.empty((len(BAR_STORE_FIELDS), len(rows)), dtype=np.int64)
+    if not rows:
+        return out
+    columns = list(zip(*rows))
+    for name, values in zip(BAR_STORE_FIELDS, columns):
+        row = _ROW[name]
+        if name == "date":
+            out[row] = np.array(values, dtype="datetime64[D]").astype(np.int64)
+        elif name == "trade_count":
+            out[row] = [value or 0 for value in values]
+        else:
+            floats = np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+            out[row] = floats.view(np.int64)
+    return out
+
+
+def _select_rows(ticker: str):
+    return select(*(getattr(DailyBar, name) for name in BAR_STORE_FIELDS)).where(
+        DailyBar.ticker == ticker
+    )
+
+
+def _write(path: Path, block: np.ndarray) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per writer thread too: sweeps refresh from worker threads.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as fh:
+        np.save(fh, block)
+    os.replace(tmp, path)
+
+
+def refresh_ticker(db: Session, ticker: str, *, root: Path | None = None) -> int:
+    """Bring one ticker's file in line with daily_bar. Returns rows read."""
+    path = _ticker_path(ticker, root)
+    count, first, last = db.execute(
+        select(func.count(), func.min(DailyBar.date), func.max(DailyBar.date)).where(
+            DailyBar.ticker == ticker
+        )
+    ).one()
+    if not count:
+        if path.exists():
+            path.unlink()
+        return 0
+
+    current = _open(path)
+    if current is not None and current.shape[1]:
+        days = current[_ROW["date"]]
+        stored = current.shape[1]
+        if int(days[0]) == _epoch_day(first):
+            if stored == count and int(days[-1]) == _epoch_day(last):
+                return 0
+            newer = db.execute(
+                _select_rows(ticker)
+                .where(DailyBar.date > _from_epoch_day(int(days[-1])))
+                .order_by(DailyBar.date)
+            ).all()
+            if stored + len(newer) == count:
+                _write(path, np.concatenate([current, _to_columns(newer)], axis=1))
+                return len(newer)
+
+    rows = db.execute(_select_rows(ticker).order_by(DailyBar.date)).all()
+    _write(path, _to_columns(rows))
+    return len(rows)
+
+
+def _from_epoch_day(day: int) -> date:
+    return np.datetime64(day, "D").astype(date)
+
+
+def refresh_bar_store(
+    db: Session, tickers: Iterable[str], *, root: Path | None = None
+) -> int:
+    """Refresh the files for `tickers`, best effort. Returns rows read.
+
+    A ticker that fails to refresh keeps its previous file (readers see
+    slightly stale bars rather than an error).
+    """
+    total = 0
+    for ticker in dict.fromkeys(tickers):
+        try:
+            total += refresh_ticker(db, ticker, root=root)
+        except (OSError, ValueError):
+            logger.warning("Failed to refresh bar store for %s", ticker, exc_info=True)
+    return total
@@ -1,16 +1,24 @@
 """Historical bar service layer."""
 
+import asyncio
 import logging
-from datetime import date, datetime, timezone
+import time
+from datetime import date, datetime, timedelta, timezone
 
 import httpx
-from sqlalchemy import text
+from sqlalchemy import func
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.config import get_config
-from app.db.models import DailyBar
+from app.db.models import DailyBar, IntradayBar, IntradayBarCoverage
+from app.db.session import db_session
 from app.rate_limit import get_alpaca_limiter
+from app.services.bar_rollups import read_rollup_rows, read_rollups, refresh_rollups
+from app.services.bar_stats import invalidate_bar_stats
+from app.services.bar_store import refresh_bar_store
+from app.services.downsample import resample_bars
+from app.services.market_calendar import ET, trading_sessions
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,44 @@ INTRADAY_TIMEFRAMES = {"1Min", "5Min", "15Min", "30Min", "1Hour"}
 DAILY_TIMEFRAME = "1Day"
 AGGREGATED_TIMEFRAMES = {"1Week", "1Month", "3Month", "6Month", "1Year"}
 
+INTRADAY_TIMEFRAME_SECONDS = {
+    "1Min": 60,
+    "5Min": 300,
+    "15Min": 900,
+    "30Min": 1800,
+    "1Hour": 3600,
+}
+# Intraday timeframes above this are resampled locally from its bars, unless
+# the range spans more than RESAMPLE_MAX_MINUTES (then the timeframe is
+# fetched directly rather than paging through that many minutes).
+RESAMPLE_BASE_TIMEFRAME = "1Min"
+RESAMPLE_MAX_MINUTES = 30_000
+# A bar is only cached once it closed this long ago; Alpaca can still revise
+# the most recent bar for late prints right after the interval ends.
+INTRADAY_SETTLE_SECONDS = 60
+
+# Alpaca's stock daily bar includes extended hours, so a session's bar is
+# only final once post-market trading ends.
+DAILY_SESSION_FINAL_ET = (20, 0)
+# Crypto daily bars close at midnight US Central; using the later CST offset
+# keeps the check conservative across DST.
+CRYPTO_DAY_CLOSE_UTC_HOURS = 6
+
+# Symbols per multi-symbol bars request, keeping the query string short.
+MULTI_SYMBOL_CHUNK = 100
+
+# A session with no daily bar is only remembered as empty once it is this
+# many days old: right after the close Alpaca often hasn't published the
+# latest session's bar yet, and that miss must be retried.
+EMPTY_SESSION_MIN_AGE_DAYS = 5
+# Tickers whose empty sessions are remembered; the least recently updated
+# ticker is dropped beyond this.
+EMPTY_SESSION_CACHE_MAX_TICKERS = 2048
+
+# ticker -> settled sessions Alpaca returned no daily bar for, least recently
+# updated ticker first.
+_empty_daily_sessions: dict[str, set[date]] = {}
+
 
 def parse_iso_utc(value: str) -> datetime:
     """Parse an ISO-8601 string into a timezone-aware UTC datetime."""
@@ -66,163 +112,610 @@ async def _fetch_alpaca_bars(
     timeframe: str,
     start: str,
     end: str,
+    *,
+    incomplete: set[str] | None = None,
 ) -> list[dict]:
-    """Paginated fetch of bars from Alpaca REST. Returns raw Alpaca bar dicts."""
-    config = get_config()
-    limiter = get_alpaca_limiter()
-    headers = _alpaca_headers()
+    """Paginated fetch of bars from Alpaca REST. Returns raw Alpaca bar dicts.
 
-    is_crypto = "/" in ticker
-    if is_crypto:
-        base_path = "/v1beta3/crypto/us/bars"
-        extra_params = {"symbols": ticker}
-    else:
-        base_path = f"/v2/stocks/{ticker}/bars"
-        extra_params = {"feed": config.alpaca_feed, "adjustment": "all"}
+    `incomplete` works as in `_fetch_alpaca_bars_multi`.
+    """
+    bars = await _fetch_alpaca_bars_multi(
+        [ticker], timeframe, start, end, incomplete=incomplete
+    )
+    return bars.get(ticker, [])
 
-    all_bars: list[dict] = []
-    page_token: str | None = None
-    seen_tokens: set[str] = set()
 
+async def _fetch_alpaca_bars_multi(
+    tickers: list[str],
+    timeframe: str,
+    start: str,
+    end: str,
+    *,
+    incomplete: set[str] | None = None,
+) -> dict[str, list[dict]]:
+    """Fetch bars for many tickers through Alpaca's multi-symbol endpoints.
+
+    Stocks and crypto go to their own endpoint, `MULTI_SYMBOL_CHUNK` symbols
+    per request. Pages span symbols, so each page's bars are appended to
+    their ticker's list. Returns raw Alpaca bar dicts grouped by ticker,
+    oldest first; tickers Alpaca has no bars for are absent. When pagination
+    of a chunk stops early (a repeated page token), its tickers are added to
+    `incomplete`, since their bars may end before `end`.
+    """
+    config = get_config()
+    headers = _alpaca_headers()
+    unique = list(dict.fromkeys(tickers))
+    stocks = [ticker for ticker in unique if "/" not in ticker]
+    crypto = [ticker for ticker in unique if "/" in ticker]
+
+    requests: list[tuple[str, dict, list[str]]] = []
+    for group, base_path, extra_params in (
+        (
+            stocks,
+            "/v2/stocks/bars",
+            {"feed": config.alpaca_feed, "adjustment": "all"},
+        ),
+        (crypto, "/v1beta3/crypto/us/bars", {}),
+    ):
+        for i in range(0, len(group), MULTI_SYMBOL_CHUNK):
+            chunk = group[i : i + MULTI_SYMBOL_CHUNK]
+            requests.append((base_path, extra_params, chunk))
+
+    grouped: dict[str, list[dict]] = {}
     async with httpx.AsyncClient(
         base_url=config.alpaca_data_base_url, timeout=20.0
     ) as client:
-        while True:
-            params = {
-                "timeframe": timeframe,
-                "start": start,
-                "end": end,
-                "sort": "asc",
-                "limit": 10000,
-                **extra_params,
-            }
-            if page_token:
-                params["page_token"] = page_token
-
-            await limiter.acquire()
-            response = await client.get(
-                base_path,
-                params=params,
-                headers=headers,
-            )
-            response.raise_for_status()
-            body = response.json()
-
-            if is_crypto:
-                bars_list = body.get("bars", {}).get(ticker, [])
-            else:
-                bars_list = body.get("bars", [])
-
-            all_bars.extend(bars_list)
-
-            next_token = body.get("next_page_token")
-            if not next_token:
-                break
-            if next_token in seen_tokens:
-                logger.warning(
-                    "Repeating page token for %s, stopping pagination", ticker
+        pages = await asyncio.gather(
+            *(
+                _fetch_bar_pages(
+                    client,
+                    headers,
+                    base_path,
+                    {
+                        "symbols": ",".join(chunk),
+                        "timeframe": timeframe,
+                        "start": start,
+                        "end": end,
+                        **extra_params,
+                    },
                 )
-                break
-            seen_tokens.add(next_token)
-            page_token = next_token
+                for base_path, extra_params, chunk in requests
+            )
+        )
+    for (_, _, chunk), (chunk_bars, complete) in zip(requests, pages):
+        for ticker, bars in chunk_bars.items():
+            grouped.setdefault(ticker, []).extend(bars)
+        if not complete and incomplete is not None:
+            incomplete.update(chunk)
+    return grouped
+
+
+async def _fetch_bar_pages(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    base_path: str,
+    base_params: dict,
+) -> tuple[dict[str, list[dict]], bool]:
+    """Every page of one bars request, grouped by ticker, and whether
+    pagination ran to the last page."""
+    limiter = get_alpaca_limiter()
+    grouped: dict[str, list[dict]] = {}
+    page_token: str | None = None
+    seen_tokens: set[str] = set()
+
+    while True:
+        params = {**base_params, "sort": "asc", "limit": 10000}
+        if page_token:
+            params["page_token"] = page_token
+
+        await limiter.acquire()
+        response = await client.get(
+            base_path,
+            params=params,
+            headers=headers,
+        )
+        response.raise_for_status()
+        body = response.json()
+
+        for ticker, bars in (body.get("bars") or {}).items():
+            grouped.setdefault(ticker, []).extend(bars)
+
+        next_token = body.get("next_page_token")
+        if not next_token:
+            break
+        if next_token in seen_tokens:
+            logger.warning(
+                "Repeating page token for %s, stopping pagination",
+                base_params["symbols"],
+            )
+            return grouped, False
+        seen_tokens.add(next_token)
+        page_token = next_token
 
-    return all_bars
+    return grouped, True
 
 
 async def fetch_intraday_bars(
-    ticker: str, timeframe: str, start: str, end: str
+    ticker: str,
+    timeframe: str,
+    start: str,
+    end: str,
+    *,
+    db: Session | None = None,
 ) -> list[dict]:
-    """Fetch intraday bars from Alpaca REST. Never stored in DB."""
-    raw = await _fetch_alpaca_bars(ticker, timeframe, start, end)
-    return _transform_bars(raw)
+    """Fetch intraday bars, serving closed bars from the intraday_bar cache.
+
+    Only windows that `intraday_bar_coverage` says were never fetched, plus
+    the still-open tail after the last settled bar, go to Alpaca. Fetched
+    closed bars are stored so the next load of the same chart stays local.
+    Timeframes above 1Min are resampled from the 1Min series (see
+    `_fetch_resampled`), so browsing several timeframes of one chart only
+    ever downloads minutes. Uses `db` when given, otherwise a short-lived
+    session of its own.
+    """
+    if db is None:
+        with db_session() as session:
+            return await _fetch_intraday(session, ticker, timeframe, start, end)
+    return await _fetch_intraday(db, ticker, timeframe, start, end)
+
+
+async def _fetch_intraday(
+    db: Session, ticker: str, timeframe: str, start: str, end: str
+) -> list[dict]:
+    if timeframe == RESAMPLE_BASE_TIMEFRAME:
+        return await _fetch_intraday_cached(db, ticker, timeframe, start, end)
+    step = INTRADAY_TIMEFRAME_SECONDS[timeframe]
+    span = parse_iso_utc(end).timestamp() - parse_iso_utc(start).timestamp()
+    if span > RESAMPLE_MAX_MINUTES * 60:
+        return await _fetch_intraday_cached(db, ticker, timeframe, start, end)
+    return await _fetch_resampled(db, ticker, step, start, end)
 
 
-async def fetch_daily_bars(
-    db: Session, ticker: str, start: str, end: str
+async def _fetch_resampled(
+    db: Session, ticker: str, step: int, start: str, end: str
 ) -> list[dict]:
-    """Fetch daily bars from the daily_bar table, backfilling gaps from Alpaca."""
-    start_date = parse_iso_utc(start).date()
-    end_date = parse_iso_utc(end).date()
+    """`step`-second bars built from the cached 1Min series.
+
+    Buckets sit on the same clock grid Alpaca uses (multiples of the
+    timeframe in UTC, which for these timeframes is also the ET grid the
+    9:30 session open falls on). The minutes fetched run from the bucket
+    containing `start` through the end of the bucket containing `end`, so
+    edge buckets are as complete as the data allows. Buckets with no trades
+    are omitted, and the still-open bucket is returned partial, as Alpaca
+    does.
+    """
+    start_ts = int(parse_iso_utc(start).timestamp()) // step * step
+    end_ts = int(parse_iso_utc(end).timestamp())
+    minutes_end_ts = min(end_ts // step * step + step - 60, int(time.time()))
+    minutes = await _fetch_intraday_cached(
+        db,
+        ticker,
+        RESAMPLE_BASE_TIMEFRAME,
+        _utc(start_ts).isoformat(),
+        _utc(max(minutes_end_ts, start_ts)).isoformat(),
+    )
+    return [bar for bar in resample_bars(minutes, step) if bar["time"] <= end_ts]
 
-    existing_rows = (
-        db.query(DailyBar)
+
+async def _fetch_intraday_cached(
+    db: Session, ticker: str, timeframe: str, start: str, end: str
+) -> list[dict]:
+    step = INTRADAY_TIMEFRAME_SECONDS[timeframe]
+    start_ts = int(parse_iso_utc(start).timestamp()) // step * step
+    end_ts = int(parse_iso_utc(end).timestamp())
+    settled_ts = int(time.time() - INTRADAY_SETTLE_SECONDS) // step * step
+    # Alpaca treats `end` as inclusive, so the cached window runs through the
+    # bar containing `end`, capped at the last settled bar.
+    cache_end_ts = min(end_ts // step * step + step, settled_ts)
+
+    by_time: dict[int, dict] = {}
+    if start_ts < cache_end_ts:
+        window_start = _utc(start_ts)
+        window_end = _utc(cache_end_ts)
+        for bar in _load_intraday_bars(db, ticker, timeframe, window_start, window_end):
+            by_time[bar["time"]] = bar
+
+        covered = _load_coverage(db, ticker, timeframe, window_start, window_end)
+        for gap_start, gap_end in missing_ranges(covered, window_start, window_end):
+            incomplete: set[str] = set()
+            raw = await _fetch_alpaca_bars(
+                ticker,
+                timeframe,
+                gap_start.isoformat(),
+                gap_end.isoformat(),
+                incomplete=incomplete,
+            )
+            gap_end_ts = int(gap_end.timestamp())
+            fetched = [b for b in _transform_bars(raw) if b["time"] < gap_end_ts]
+            for bar in fetched:
+                by_time[bar["time"]] = bar
+            covered_end = gap_end
+            if ticker in incomplete:
+                # Pagination stopped early: only the span up to the last bar
+                # received is known to be complete.
+                covered_end = _utc(fetched[-1]["time"] + step) if fetched else gap_start
+            _store_intraday_bars(
+                db, ticker, timeframe, fetched, gap_start, covered_end
+            )
+
+    if cache_end_ts <= end_ts:
+        tail_start = _utc(max(start_ts, cache_end_ts))
+        raw = await _fetch_alpaca_bars(ticker, timeframe, tail_start.isoformat(), end)
+        for bar in _transform_bars(raw):
+            if bar["time"] >= cache_end_ts:
+                by_time[bar["time"]] = bar
+
+    return [by_time[ts] for ts in sorted(by_time) if start_ts <= ts <= end_ts]
+
+
+def missing_ranges(
+    covered: list[tuple[datetime, datetime]], start: datetime, end: datetime
+) -> list[tuple[datetime, datetime]]:
+    """Sub-windows of [start, end) not inside any of the `covered` windows."""
+    gaps: list[tuple[datetime, datetime]] = []
+    cursor = start
+    for range_start, range_end in sorted(covered):
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            gaps.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _utc(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _load_intraday_bars(
+    db: Session, ticker: str, timeframe: str, start: datetime, end: datetime
+) -> list[dict]:
+    rows = (
+        db.query(IntradayBar)
         .filter(
-            DailyBar.ticker == ticker,
-            DailyBar.date >= start_date,
-            DailyBar.date <= end_date,
+            IntradayBar.ticker == ticker,
+            IntradayBar.timeframe == timeframe,
+            IntradayBar.time >= start,
+            IntradayBar.time < end,
         )
-        .order_by(DailyBar.date)
+        .order_by(IntradayBar.time)
         .all()
     )
+    return [
+        {
+            "time": int(_as_utc(row.time).timestamp()),
+            "open": row.open,
+            "high": row.high,
+            "low": row.low,
+            "close": row.close,
+            "volume": row.volume,
+            "vwap": row.vwap,
+            "trade_count": row.trade_count,
+        }
+        for row in rows
+    ]
 
-    existing_dates = {row.date for row in existing_rows}
 
-    should_backfill = len(existing_rows) == 0 or (
-        end_date > start_date and (end_date - start_date).days > len(existing_rows) * 2
+def _load_coverage(
+    db: Session, ticker: str, timeframe: str, start: datetime, end: datetime
+) -> list[tuple[datetime, datetime]]:
+    rows = (
+        db.query(IntradayBarCoverage)
+        .filter(
+            IntradayBarCoverage.ticker == ticker,
+            IntradayBarCoverage.timeframe == timeframe,
+            IntradayBarCoverage.range_start <= end,
+            IntradayBarCoverage.range_end >= start,
+        )
+        .all()
     )
+    return [(_as_utc(row.range_start), _as_utc(row.range_end)) for row in rows]
 
-    if should_backfill:
-        raw = await _fetch_alpaca_bars(ticker, "1Day", start, end)
 
-        if raw:
-            new_rows = []
-            for bar in raw:
+def _store_intraday_bars(
+    db: Session,
+    ticker: str,
+    timeframe: str,
+    bars: list[dict],
+    window_start: datetime,
+    window_end: datetime,
+) -> None:
+    """Upsert `bars` and record [window_start, window_end) as covered (nothing
+    when the window is empty).
+
+    Best effort: the caller already has the bars, so a failed write (e.g. a
+    ticker missing from `symbol`) only costs a refetch next time.
+    """
+    try:
+        if bars:
+            stmt = pg_insert(IntradayBar).values(
+                [
+                    {
+                        "ticker": ticker,
+                        "timeframe": timeframe,
+                        "time": _utc(bar["time"]),
+                        "open": bar["open"],
+                        "high": bar["high"],
+                        "low": bar["low"],
+                        "close": bar["close"],
+                        "volume": bar["volume"],
+                        "trade_count": bar["trade_count"],
+                        "vwap": bar["vwap"],
+                    }
+                    for bar in bars
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["ticker", "timeframe", "time"],
+                set_={
+                    column: getattr(stmt.excluded, column)
+                    for column in (
+                        "open",
+                        "high",
+                        "low",
+                        "close",
+                        "volume",
+                        "trade_count",
+                        "vwap",
+                    )
+                },
+            )
+            db.execute(stmt)
+
+        if window_end <= window_start:
+            db.commit()
+            return
+
+        touching = (
+            db.query(IntradayBarCoverage)
+            .filter(
+                IntradayBarCoverage.ticker == ticker,
+                IntradayBarCoverage.timeframe == timeframe,
+                IntradayBarCoverage.range_start <= window_end,
+                IntradayBarCoverage.range_end >= window_start,
+            )
+            .all()
+        )
+        merged_start = min([window_start, *(_as_utc(r.range_start) for r in touching)])
+        merged_end = max([window_end, *(_as_utc(r.range_end) for r in touching)])
+        for row in touching:
+            db.delete(row)
+        db.add(
+            IntradayBarCoverage(
+                ticker=ticker,
+                timeframe=timeframe,
+                range_start=merged_start,
+                range_end=merged_end,
+            )
+        )
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        logger.warning(
+            "Intraday bar cache write skipped for %s %s: %s", ticker, timeframe, exc
+        )
+
+
+def prune_intraday_bars(db: Session, now: datetime | None = None) -> int:
+    """Drop cached intraday bars older than INTRADAY_BAR_RETENTION_DAYS and
+    trim the coverage windows to match. Returns the number of bars deleted.
+
+    A window reaching past the cutoff keeps its newer part, so the bars still
+    stored stay covered; a load further back simply refetches from Alpaca.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=get_config().intraday_bar_retention_days)
+    deleted = (
+        db.query(IntradayBar)
+        .filter(IntradayBar.time < cutoff)
+        .delete(synchronize_session=False)
+    )
+    db.query(IntradayBarCoverage).filter(
+        IntradayBarCoverage.range_end <= cutoff
+    ).delete(synchronize_session=False)
+    db.query(IntradayBarCoverage).filter(
+        IntradayBarCoverage.range_start < cutoff
+    ).update({IntradayBarCoverage.range_start: cutoff}, synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def expected_daily_sessions(
+    ticker: str, start_date: date, end_date: date, *, now: datetime | None = None
+) -> list[date]:
+    """Days in [start_date, end_date] that should have a closed daily bar.
+
+    Stocks follow the NYSE calendar and a session only counts once Alpaca's
+    daily bar for it is final (after the extended-hours close). Crypto trades
+    every day; its daily bars run midnight to midnight US Central.
+    """
+    now = now or datetime.now(timezone.utc)
+    if "/" in ticker:
+        closed_through = now - timedelta(hours=CRYPTO_DAY_CLOSE_UTC_HOURS)
+        last = closed_through.date() - timedelta(days=1)
+        days = (min(end_date, last) - start_date).days + 1
+        return [start_date + timedelta(days=i) for i in range(max(days, 0))]
+
+    now_et = now.astimezone(ET)
+    last = now_et.date()
+    if (now_et.hour, now_et.minute) < DAILY_SESSION_FINAL_ET:
+        last -= timedelta(days=1)
+    return trading_sessions(start_date, min(end_date, last))
+
+
+def missing_session_ranges(
+    sessions: list[date], present: set[date]
+) -> list[tuple[date, date]]:
+    """Coalesce the sessions not in `present` into inclusive date ranges.
+
+    A range only breaks at a session that is already stored, so weekends and
+    holidays between two missing sessions don't split the download.
+    """
+    ranges: list[tuple[date, date]] = []
+    run_start: date | None = None
+    run_end: date | None = None
+    for day in sessions:
+        if day in present:
+            if run_start is not None and run_end is not None:
+                ranges.append((run_start, run_end))
+            run_start = None
+            continue
+        if run_start is None:
+            run_start = day
+        run_end = day
+    if run_start is not None and run_end is not None:
+        ranges.append((run_start, run_end))
+    return ranges
+
+
+async def backfill_daily_bars(
+    db: Session, tickers: list[str], start: str, end: str
+) -> int:
+    """Download the daily bars missing from daily_bar for `tickers`.
+
+    Only the closed sessions (see `expected_daily_sessions`) with no stored
+    bar are requested, as contiguous runs. Tickers missing the same run share
+    one multi-symbol request, so a fresh multi-symbol backtest costs a single
+    batched download. Sessions Alpaca has no bar for (before a listing,
+    halts, holidays older than NYSE_HOLIDAYS) are remembered per process so
+    they aren't re-asked on every load, once they are older than
+    EMPTY_SESSION_MIN_AGE_DAYS. Returns the number of rows inserted.
+    """
+    start_date = parse_iso_utc(start).date()
+    end_date = parse_iso_utc(end).date()
+    tickers = list(dict.fromkeys(tickers))
+
+    stored: dict[str, set[date]] = {ticker: set() for ticker in tickers}
+    stored_rows = (
+        db.query(DailyBar.ticker, DailyBar.date)
+        .filter(
+            DailyBar.ticker.in_(tickers),
+            DailyBar.date >= start_date,
+            DailyBar.date <= end_date,
+        )
+        .all()
+    )
+    for ticker, bar_date in stored_rows:
+        stored[ticker].add(bar_date)
+
+    wanted: dict[str, set[date]] = {}
+    by_range: dict[tuple[date, date], list[str]] = {}
+    for ticker in tickers:
+        present = stored[ticker] | _empty_daily_sessions.get(ticker, set())
+        sessions = expected_daily_sessions(ticker, start_date, end_date)
+        ranges = missing_session_ranges(sessions, present)
+        if not ranges:
+            continue
+        wanted[ticker] = {day for day in sessions if day not in present}
+        for date_range in ranges:
+            by_range.setdefault(date_range, []).append(ticker)
+
+    if not by_range:
+        return 0
+
+    rows: dict[tuple[str, date], dict] = {}
+    for (first, last), range_tickers in by_range.items():
+        raw = await _fetch_alpaca_bars_multi(
+            range_tickers,
+            DAILY_TIMEFRAME,
+            f"{first.isoformat()}T00:00:00Z",
+            f"{last.isoformat()}T23:59:59Z",
+        )
+        for ticker, bars in raw.items():
+            ticker_wanted = wanted.get(ticker)
+            if ticker_wanted is None:
+                continue
+            for bar in bars:
                 try:
                     bar_date = parse_iso_utc(str(bar.get("t", ""))).date()
                 except ValueError:
                     continue
-
-                if bar_date in existing_dates:
+                if bar_date not in ticker_wanted:
                     continue
+                rows[(ticker, bar_date)] = {
+                    "ticker": ticker,
+                    "date": bar_date,
+                    "open": float(bar.get("o", 0)),
+                    "high": float(bar.get("h", 0)),
+                    "low": float(bar.get("l", 0)),
+                    "close": float(bar.get("c", 0)),
+                    "volume": float(bar.get("v", 0)),
+                    "trade_count": int(bar.get("n", 0)),
+                    "vwap": float(bar.get("vw", 0)),
+                }
+
+    settled = datetime.now(timezone.utc).date() - timedelta(
+        days=EMPTY_SESSION_MIN_AGE_DAYS
+    )
+    for ticker, ticker_wanted in wanted.items():
+        empty = {
+            day
+            for day in ticker_wanted
+            if day <= settled and (ticker, day) not in rows
+        }
+        if empty:
+            _remember_empty_sessions(ticker, empty)
 
-                new_rows.append(
-                    DailyBar(
-                        ticker=ticker,
-                        date=bar_date,
-                        open=float(bar.get("o", 0)),
-                        high=float(bar.get("h", 0)),
-                        low=float(bar.get("l", 0)),
-                        close=float(bar.get("c", 0)),
-                        volume=float(bar.get("v", 0)),
-                        trade_count=int(bar.get("n", 0)),
-                        vwap=float(bar.get("vw", 0)),
-                    )
-                )
+    if rows:
+        stmt = pg_insert(DailyBar).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_nothing(
+            index_elements=["ticker", "date"],
+        )
+        db.execute(stmt)
+        dates_by_ticker: dict[str, set[date]] = {}
+        for ticker, bar_date in rows:
+            dates_by_ticker.setdefault(ticker, set()).add(bar_date)
+        refresh_rollups(db, dates_by_ticker)
+        db.commit()
+        logger.info(
+            "Backfilled %d daily bars for %d ticker(s) in %d request range(s)",
+            len(rows),
+            len(wanted),
+            len(by_range),
+        )
+        await invalidate_bar_stats(dates_by_ticker)
+        if get_config().bar_store_enabled:
+            refresh_bar_store(db, dates_by_ticker)
+    return len(rows)
 
-            if new_rows:
-                stmt = pg_insert(DailyBar).values(
-                    [
-                        {
-                            "ticker": row.ticker,
-                            "date": row.date,
-                            "open": row.open,
-                            "high": row.high,
-                            "low": row.low,
-                            "close": row.close,
-                            "volume": row.volume,
-                            "trade_count": row.trade_count,
-                            "vwap": row.vwap,
-                        }
-                        for row in new_rows
-                    ]
-                )
-                stmt = stmt.on_conflict_do_nothing(
-                    index_elements=["ticker", "date"],
-                )
-                db.execute(stmt)
-                db.commit()
-                logger.info("Backfilled %d daily bars for %s", len(new_rows), ticker)
 
-        existing_rows = (
-            db.query(DailyBar)
-            .filter(
-                DailyBar.ticker == ticker,
-                DailyBar.date >= start_date,
-                DailyBar.date <= end_date,
-            )
-            .order_by(DailyBar.date)
-            .all()
+def _remember_empty_sessions(ticker: str, days: set[date]) -> None:
+    sessions = _empty_daily_sessions.pop(ticker, set())
+    sessions.update(days)
+    _empty_daily_sessions[ticker] = sessions
+    while len(_empty_daily_sessions) > EMPTY_SESSION_CACHE_MAX_TICKERS:
+        del _empty_daily_sessions[next(iter(_empty_daily_sessions))]
+
+
+async def fetch_daily_bars(
+    db: Session, ticker: str, start: str, end: str
+) -> list[dict]:
+    """Fetch daily bars from the daily_bar table, backfilling gaps from Alpaca."""
+    await backfill_daily_bars(db, [ticker], start, end)
+
+    start_date = parse_iso_utc(start).date()
+    end_date = parse_iso_utc(end).date()
+    existing_rows = (
+        db.query(DailyBar)
+        .filter(
+            DailyBar.ticker == ticker,
+            DailyBar.date >= start_date,
+            DailyBar.date <= end_date,
         )
+        .order_by(DailyBar.date)
+        .all()
+    )
 
     result = []
     for row in existing_rows:
@@ -247,66 +740,121 @@ async def fetch_daily_bars(
     return result
 
 
-async def fetch_aggregated_bars(
-    db: Session, ticker: str, period: str, start: str, end: str
-) -> list[dict]:
-    """Aggregate daily bars into weekly/monthly/quarterly via SQL."""
-    await fetch_daily_bars(db, ticker, start, end)
+# Row-format bar key -> columnar array name.
+COLUMNAR_KEYS = {
+    "time": "t",
+    "open": "o",
+    "high": "h",
+    "low": "l",
+    "close": "c",
+    "volume": "v",
+}
 
-    start_date = parse_iso_utc(start).date()
-    end_date = parse_iso_utc(end).date()
 
-    if period == "6Month":
-        group_expr = (
-            "date_trunc('year', date)"
-            " + INTERVAL '6 months' * FLOOR((EXTRACT(month FROM date)::int - 1) / 6)"
+def to_columnar(bars: list[dict]) -> dict[str, list]:
+    """Parallel arrays (t, o, h, l, c, v) for a list of bar dicts."""
+    return {
+        short: [bar.get(key) for bar in bars] for key, short in COLUMNAR_KEYS.items()
+    }
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def columns_from_rows(rows: list[tuple]) -> dict[str, list]:
+    """Parallel arrays (t, o, h, l, c, v) straight from (date, open, high,
+    low, close, volume) rows, without building a dict per bar."""
+    if not rows:
+        return {short: [] for short in COLUMNAR_KEYS.values()}
+    days, *values = zip(*rows)
+    times = [(day.toordinal() - _EPOCH_ORDINAL) * 86_400 for day in days]
+    return dict(zip(COLUMNAR_KEYS.values(), [times, *map(list, values)]))
+
+
+async def fetch_daily_columns(
+    db: Session, ticker: str, start: str, end: str
+) -> dict[str, list]:
+    """`fetch_daily_bars` as parallel arrays, read as plain column tuples."""
+    await backfill_daily_bars(db, [ticker], start, end)
+    rows = (
+        db.query(
+            DailyBar.date,
+            DailyBar.open,
+            DailyBar.high,
+            DailyBar.low,
+            DailyBar.close,
+            DailyBar.volume,
         )
-    else:
-        trunc_map = {
-            "1Week": "week",
-            "1Month": "month",
-            "3Month": "quarter",
-            "1Year": "year",
-        }
-        trunc = trunc_map.get(period, "month")
-        group_expr = f"date_trunc('{trunc}', date)"
-
-    sql = text(f"""
-        SELECT
-            {group_expr} AS period,
-            (array_agg(open ORDER BY date))[1] AS open,
-            MAX(high) AS high,
-            MIN(low) AS low,
-            (array_agg(close ORDER BY date DESC))[1] AS close,
-            SUM(volume) AS volume,
-            SUM(trade_count) AS trade_count,
-            SUM(vwap * volume) / NULLIF(SUM(volume), 0) AS vwap
-        FROM daily_bar
-        WHERE ticker = :ticker AND date >= :start AND date <= :end
-        GROUP BY period
-        ORDER BY period
-    """)
-
-    rows = db.execute(
-        sql,
-        {"ticker": ticker, "start": start_date, "end": end_date},
-    ).fetchall()
+        .filter(
+            DailyBar.ticker == ticker,
+            DailyBar.date >= parse_iso_utc(start).date(),
+            DailyBar.date <= parse_iso_utc(end).date(),
+        )
+        .order_by(DailyBar.date)
+        .all()
+    )
+    return columns_from_rows(rows)
 
-    result = []
-    for row in rows:
-        period_dt = row[0]
-        ts = int(period_dt.timestamp()) if period_dt else 0
-        result.append(
-            {
-                "time": ts,
-                "open": float(row[1] or 0),
-                "high": float(row[2] or 0),
-                "low": float(row[3] or 0),
-                "close": float(row[4] or 0),
-                "volume": float(row[5] or 0),
-                "trade_count": int(row[6] or 0),
-                "vwap": float(row[7]) if row[7] is not None else None,
-            }
+
+def daily_bar_version(
+    db: Session, ticker: str, start_date: date, end_date: date
+) -> tuple[date | None, int]:
+    """(latest date, row count) of the stored daily bars in [start_date, end_date].
+
+    Daily and aggregated responses only change when this does: a new session
+    moves the latest date, a backfilled gap moves the count. That makes it
+    the version of those responses for HTTP caching.
+    """
+    latest, count = (
+        db.query(func.max(DailyBar.date), func.count())
+        .filter(
+            DailyBar.ticker == ticker,
+            DailyBar.date >= start_date,
+            DailyBar.date <= end_date,
         )
+        .one()
+    )
+    return latest, count
+
+
+def daily_bars_current(
+    ticker: str, latest: date | None, start_date: date, end_date: date
+) -> bool:
+    """Whether no closed session after `latest` (the newest stored bar) in
+    [start_date, end_date] is still waiting to be backfilled.
+
+    Cheap (calendar only, no query): when it holds, a backfill of the range
+    can only fill older gaps, which the request that stored `latest` already
+    asked for.
+    """
+    first = start_date if latest is None else max(start_date, latest + timedelta(days=1))
+    empty = _empty_daily_sessions.get(ticker, set())
+    return all(
+        day in empty for day in expected_daily_sessions(ticker, first, end_date)
+    )
 
-    return result
+
+async def fetch_aggregated_bars(
+    db: Session, ticker: str, period: str, start: str, end: str
+) -> list[dict]:
+    """Weekly/monthly/... bars from daily_bar_rollup, backfilling daily gaps first.
+
+    Returns whole periods overlapping [start, end]; the rollups are refreshed
+    as part of the daily backfill.
+    """
+    await backfill_daily_bars(db, [ticker], start, end)
+    return read_rollups(
+        db, ticker, period, parse_iso_utc(start).date(), parse_iso_utc(end).date()
+    )
+
+
+async def fetch_aggregated_columns(
+    db: Session, ticker: str, period: str, start: str, end: str
+) -> dict[str, list]:
+    """`fetch_aggregated_bars` as parallel arrays."""
+    await backfill_daily_bars(db, [ticker], start, end)
+    return columns_from_rows(
+        read_rollup_rows(
+            db, ticker, period, parse_iso_utc(start).date(), parse_iso_utc(end).date()
+        )
+    )
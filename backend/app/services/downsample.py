@@ -0,0 +1,139 @@
+"""Server-side downsampling of bar series for charts.
+
+Two methods, both bounded to `max_points` output bars:
+
+- ``ohlc``: consecutive bars are merged into equal-sized buckets (first open,
+  max high, min low, last close, summed volume and trade count,
+  volume-weighted vwap). Right for candlestick charts: no extreme is lost.
+- ``lttb``: largest-triangle-three-buckets on the close, which keeps the
+  original bars that best preserve the line's visual shape. Right for line
+  charts.
+
+Both work on NumPy arrays built once from the bar dicts; the OHLC reduction
+is a handful of `ufunc.reduceat` calls. `resample_bars` uses the same
+reduction to build fixed-duration bars (5Min, 1Hour, ...) from finer ones.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("ohlc", "lttb")
+
+
+def _column(bars: list[dict], key: str) -> np.ndarray:
+    return np.fromiter(
+        (np.nan if bar.get(key) is None else bar[key] for bar in bars),
+        dtype=np.float64,
+        count=len(bars),
+    )
+
+
+def downsample_bars(
+    bars: list[dict], max_points: int, method: str = "ohlc"
+) -> list[dict]:
+    """At most `max_points` bars summarising `bars` (oldest first)."""
+    if max_points <= 0 or len(bars) <= max_points:
+        return bars
+    if method == "lttb":
+        return [bars[i] for i in lttb_indices(_column(bars, "close"), max_points)]
+    return bucket_ohlc(bars, max_points)
+
+
+def bucket_ohlc(bars: list[dict], max_points: int) -> list[dict]:
+    n = len(bars)
+    size = -(-n // max_points)  # ceil
+    starts = np.arange(0, n, size)
+    return _merge_buckets(bars, starts, [bars[i]["time"] for i in starts.tolist()])
+
+
+def resample_bars(bars: list[dict], step: int) -> list[dict]:
+    """Merge bars with unix `time`s into `step`-second bars (oldest first).
+
+    A bar lands in the bucket starting at ``time // step * step``. Buckets
+    no input bar falls in are omitted rather than filled, and a trailing
+    bucket is returned with whatever bars it has so far.
+    """
+    if not bars:
+        return []
+    keys = np.fromiter(
+        (bar["time"] for bar in bars), dtype=np.int64, count=len(bars)
+    ) // step * step
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+    return _merge_buckets(bars, starts, keys[starts].tolist())
+
+
+def _merge_buckets(bars: list[dict], starts: np.ndarray, times: list) -> list[dict]:
+    """One bar per run of `bars` beginning at each index in `starts`."""
+    n = len(bars)
+    ends = np.append(starts[1:], n) - 1
+
+    opens = _column(bars, "open")
+    highs = _column(bars, "high")
+    lows = _column(bars, "low")
+    closes = _column(bars, "close")
+    volumes = np.nan_to_num(_column(bars, "volume"))
+    trades = np.nan_to_num(_column(bars, "trade_count"))
+    vwaps = _column(bars, "vwap")
+
+    has_vwap = ~np.isnan(vwaps)
+    notional = np.add.reduceat(np.where(has_vwap, vwaps * volumes, 0.0), starts)
+    vwap_volume = np.add.reduceat(np.where(has_vwap, volumes, 0.0), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bucket_vwap = notional / vwap_volume
+
+    columns = {
+        "open": opens[starts],
+        "high": np.maximum.reduceat(highs, starts),
+        "low": np.minimum.reduceat(lows, starts),
+        "close": closes[ends],
+        "volume": np.add.reduceat(volumes, starts),
+        "trade_count": np.add.reduceat(trades, starts).astype(np.int64),
+        "vwap": bucket_vwap,
+    }
+    lists = {key: values.tolist() for key, values in columns.items()}
+    vwap_present = (vwap_volume > 0).tolist()
+    return [
+        {
+            "time": times[i],
+            "open": lists["open"][i],
+            "high": lists["high"][i],
+            "low": lists["low"][i],
+            "close": lists["close"][i],
+            "volume": lists["volume"][i],
+            "vwap": lists["vwap"][i] if vwap_present[i] else None,
+            "trade_count": lists["trade_count"][i],
+        }
+        for i in range(len(times))
+    ]
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> list[int]:
+    """Indices picked by largest-triangle-three-buckets (x is the bar index).
+
+    The first and last points are always kept. Each middle bucket keeps the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket.
+    """
+    n = len(values)
+    if max_points >= n or max_points < 3:
+        return list(range(n)) if max_points >= n else [0, n - 1][:max_points]
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    values = np.nan_to_num(values)
+    x = np.arange(n, dtype=np.float64)
+    picked = [0]
+    prev = 0
+    for b in range(max_points - 2):
+        lo, hi = edges[b], edges[b + 1]
+        next_lo, next_hi = hi, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = values[next_lo:next_hi].mean()
+        areas = np.abs(
+            (x[prev] - avg_x) * (values[lo:hi] - values[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y - values[prev])
+        )
+        prev = int(lo + np.argmax(areas))
+        picked.append(prev)
+    picked.append(n - 1)
+    return picked
@@ -0,0 +1,113 @@
+"""Vectorized O(n) indicator series.
+
+NumPy counterparts of the list helpers in `app/services/strategy_signals.py`
+(`_sma_series`, `_ema_series`, `_rsi_series` and the Donchian window maxima)
+for code that needs a whole series at once, such as backtests. Inputs are
+1-D arrays or sequences of floats, oldest first. Each function returns a
+float64 array aligned the same way as its list counterpart, so
+``sma(x, p)[-1] == _sma_series(x, p)[-1]`` up to float rounding.
+
+SMA is a difference of cumulative sums and the Donchian channel is pandas'
+rolling max/min, both O(n) regardless of the period. EMA and Wilder's RSI
+smoothing are first-order recurrences; they run in pandas' compiled
+``ewm(adjust=False)``, which applies exactly the recurrence the list
+versions loop over.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+_EMPTY = np.empty(0, dtype=np.float64)
+
+
+def _as_array(values: Sequence[float] | np.ndarray) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _check_period(period: int) -> None:
+    if period <= 0:
+        raise ValueError("period must be > 0")
+
+
+def sma(values: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average; element i covers values[i : i + period]."""
+    _check_period(period)
+    values = _as_array(values)
+    if len(values) < period:
+        return _EMPTY
+    sums = np.cumsum(values)
+    window = sums[period - 1 :].copy()
+    window[1:] -= sums[:-period]
+    return window / period
+
+
+def ema(values: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the first value, alpha=2/(p+1)."""
+    _check_period(period)
+    values = _as_array(values)
+    if not len(values):
+        return _EMPTY
+    return _smooth(values, 2 / (period + 1))
+
+
+def _smooth(values: np.ndarray, alpha: float) -> np.ndarray:
+    """y[0] = values[0]; y[t] = alpha * values[t] + (1 - alpha) * y[t - 1]."""
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def rsi(values: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Wilder RSI; element i uses the first period + 1 + i values."""
+    _check_period(period)
+    values = _as_array(values)
+    if len(values) < period + 1:
+        return _EMPTY
+    deltas = np.diff(values)
+    gains = np.maximum(deltas, 0.0)
+    losses = np.maximum(-deltas, 0.0)
+    # Wilder's smoothing is an EMA with alpha = 1/period seeded by the plain
+    # mean of the first `period` moves.
+    alpha = 1 / period
+    avg_gain = _smooth(
+        np.concatenate(([gains[:period].mean()], gains[period:])), alpha
+    )
+    avg_loss = _smooth(
+        np.concatenate(([losses[:period].mean()], losses[period:])), alpha
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + avg_gain / avg_loss)
+    out[avg_loss == 0] = 100.0
+    out[(avg_loss == 0) & (avg_gain == 0)] = 50.0
+    out[(avg_gain == 0) & (avg_loss != 0)] = 0.0
+    return out
+
+
+def rolling_max(values: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Max of each `period`-long window; element i covers values[i : i + period]."""
+    return _rolling(values, period).max().to_numpy()[period - 1 :]
+
+
+def rolling_min(values: Sequence[float] | np.ndarray, period: int) -> np.ndarray:
+    """Min of each `period`-long window, aligned like `rolling_max`."""
+    return _rolling(values, period).min().to_numpy()[period - 1 :]
+
+
+def _rolling(values: Sequence[float] | np.ndarray, period: int):
+    _check_period(period)
+    return pd.Series(_as_array(values)).rolling(period)
+
+
+def donchian(
+    highs: Sequence[float] | np.ndarray,
+    lows: Sequence[float] | np.ndarray,
+    period: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Donchian channel (upper, lower) over windows ending at each bar.
+
+    Aligned like `rolling_max`. `evaluate_breakout_signal_from_bars` compares
+    each close with the channel of the window ending one bar earlier.
+    """
+    return rolling_max(highs, period), rolling_min(lows, period)
@@ -5,7 +5,7 @@ it falls on a weekday, July 3 when July 4 is a Tuesday) are treated as normal
 sessions since Alpaca still accepts orders during the reduced hours.
 """
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
 
 ET = ZoneInfo("America/New_York")
@@ -64,3 +64,19 @@ def is_stock_market_open(now_et: datetime) -> bool:
     return (MARKET_OPEN[0] * 60 + MARKET_OPEN[1]) <= minutes < (
         MARKET_CLOSE[0] * 60 + MARKET_CLOSE[1]
     )
+
+
+def is_trading_day(day: date) -> bool:
+    """True for a weekday that is not an NYSE full-day holiday."""
+    return day.weekday() < 5 and day not in NYSE_HOLIDAYS
+
+
+def trading_sessions(start: date, end: date) -> list[date]:
+    """NYSE sessions in [start, end], oldest first."""
+    sessions = []
+    day = start
+    while day <= end:
+        if is_trading_day(day):
+            sessions.append(day)
+        day += timedelta(days=1)
+    return sessions
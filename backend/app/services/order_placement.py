@@ -9,8 +9,9 @@ from decimal import Decimal
 
 from sqlalchemy.orm import Session
 
-from app.db.models import DailyBar, Holding, Order, Quote, TradingAccount
-from app.services.atr import compute_atr
+from app.db.models import Holding, Order, Quote, TradingAccount
+from app.services.atr import atr_from_db
+from app.services.bar_stats import latest_volume
 from app.services.trading import (
     OrderValidationError,
     compute_market_fill_price,
@@ -92,7 +93,7 @@ def place_order(
         if payload.order_type == "stop":
             if payload.stop_price is None:
                 raise OrderPlacementError("stop_price is required for stop orders")
-            atr = compute_atr(payload.ticker, db)
+            atr = atr_from_db(payload.ticker, db)
             rps = compute_stop_reservation_per_share(payload.stop_price, atr)
         elif payload.order_type in ("limit", "stop_limit"):
             rps = payload.limit_price
@@ -111,17 +112,7 @@ def place_order(
             )
         market_price = Decimal(str(quote.price))
 
-        latest_bar = (
-            db.query(DailyBar)
-            .filter(DailyBar.ticker == payload.ticker)
-            .order_by(DailyBar.date.desc())
-            .first()
-        )
-        daily_volume = (
-            Decimal(str(latest_bar.volume))
-            if latest_bar and latest_bar.volume
-            else None
-        )
+        daily_volume = latest_volume(db, payload.ticker)
         fill_price = compute_market_fill_price(
             market_price, payload.side, payload.quantity, daily_volume
         )
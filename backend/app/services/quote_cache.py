@@ -4,19 +4,35 @@ Owns Redis hot-cache reads/writes, the Postgres warm-cache read, the
 Alpaca REST fallback, and the `resolve_quote()` coordinator that walks
 all three layers. Both the `/quote` REST endpoint and the order-placement
 staleness check go through `resolve_quote()` so a quote is freshness-
-checked the same way no matter who is asking."""
+checked the same way no matter who is asking.
+
+The Redis entry is either a ``quote:{ticker}`` hash of string fields (the
+default) or, with QUOTE_REDIS_FORMAT=packed, a single ``quotepk:{ticker}``
+binary value (see `app/services/quote_codec.py`). Every reader and writer
+goes through `read_quote_fields` / `merge_quote_fields` so the format is
+decided in one place. In packed mode reads fall back to the hash on a miss,
+and `migrate_hash_quotes` converts whatever hashes are left at startup.
+
+A packed write merges the new fields into the stored value on the Redis
+server (`MERGE_QUOTE_LUA`, sent by EVALSHA), so it is one atomic round trip
+like the hash path's HSET: concurrent writers (the feed, API workers, each
+worker's startup migration) never overwrite each other's fields."""
 
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterable, Mapping
 from datetime import datetime, timezone
+from typing import Any
 
 from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.config import get_config
 from app.db import Quote, db_session
-from app.db.redis import get_redis
+from app.db.redis import RedisClient, get_binary_redis, get_redis
 from app.schemas import QuoteData, QuoteResponse
 from app.services.alpaca_rest import (
     AlpacaMissingCredentials,
@@ -25,38 +41,150 @@ from app.services.alpaca_rest import (
     AlpacaTickerNotFound,
     fetch_snapshot,
 )
+from app.services.quote_codec import (
+    MERGE_QUOTE_LUA,
+    decode_quote,
+    encode_quote,
+    merge_quote_args,
+    parse_quote_hash,
+)
+from app.services.quote_record import QuoteRecord
 
 logger = logging.getLogger(__name__)
 
 REDIS_QUOTE_PREFIX = "quote:"
+REDIS_PACKED_QUOTE_PREFIX = "quotepk:"
 QUOTE_FIELDS = tuple(QuoteData.model_fields.keys())
 
+# The merge script, registered on the binary client (EVALSHA, falling back
+# to EVAL after a script cache flush).
+_merge_script: Any = None
+
+
+# QUOTE_REDIS_FORMAT == "packed", resolved on first use (at startup, from the
+# lifespan) rather than per call: `get_config()` re-reads the environment,
+# which costs far more than decoding the quote it would guard.
+_packed_format: bool | None = None
+
+
+def packed_quotes_enabled() -> bool:
+    global _packed_format
+    if _packed_format is None:
+        _packed_format = get_config().quote_redis_format.lower() == "packed"
+    return _packed_format
+
+
+def _reset_for_tests() -> None:
+    """Forget the resolved quote format so a test's env takes effect."""
+    global _packed_format
+    _packed_format = None
+
+
+async def read_quote_fields(
+    ticker: str, *, redis: RedisClient | None = None
+) -> dict[str, Any] | None:
+    """Typed fields of the Redis quote entry for `ticker`, or None on miss.
+
+    Raises on Redis errors; callers decide whether that's a miss.
+    """
+    if packed_quotes_enabled():
+        raw = await (await get_binary_redis()).get(
+            f"{REDIS_PACKED_QUOTE_PREFIX}{ticker}"
+        )
+        fields = decode_quote(raw) if raw else None
+        if fields is not None:
+            return fields
+    client = redis or await get_redis()
+    data = await client.hgetall(f"{REDIS_QUOTE_PREFIX}{ticker}")
+    return parse_quote_hash(data) if data else None
+
+
+async def read_quote_field(
+    ticker: str, field: str, *, redis: RedisClient | None = None
+) -> Any:
+    """One typed field of the Redis quote entry (a single HGET on hashes)."""
+    if packed_quotes_enabled():
+        fields = await read_quote_fields(ticker, redis=redis)
+        return fields.get(field) if fields else None
+    client = redis or await get_redis()
+    raw = await client.hget(f"{REDIS_QUOTE_PREFIX}{ticker}", field)
+    return parse_quote_hash({field: raw}).get(field) if raw is not None else None
+
+
+async def merge_quote_fields(
+    ticker: str, fields: Mapping[str, Any], *, redis: RedisClient | None = None
+) -> None:
+    """Merge the non-None `fields` into the Redis quote entry for `ticker`."""
+    updates = {k: v for k, v in fields.items() if v is not None and k != "ticker"}
+    if not updates:
+        return
+    if not packed_quotes_enabled():
+        client = redis or await get_redis()
+        await client.hset(
+            f"{REDIS_QUOTE_PREFIX}{ticker}",
+            mapping={k: str(v) for k, v in updates.items()},
+        )
+        return
+
+    await _merge_packed(ticker, updates)
+
+
+async def _merge_packed(
+    ticker: str, fields: Mapping[str, Any], *, keep_current: bool = False
+) -> None:
+    """Merge `fields` into the packed value for `ticker` on the server.
+
+    With `keep_current`, fields already stored win over `fields`.
+    """
+    global _merge_script
+    binary = await get_binary_redis()
+    if _merge_script is None or _merge_script.registered_client is not binary:
+        _merge_script = binary.register_script(MERGE_QUOTE_LUA)
+    await _merge_script(
+        keys=[f"{REDIS_PACKED_QUOTE_PREFIX}{ticker}"],
+        args=merge_quote_args(encode_quote(fields), keep_current=keep_current),
+    )
+
 
-async def read_redis(ticker: str) -> QuoteData | None:
+async def migrate_hash_quotes() -> int:
+    """Fold every remaining ``quote:*`` hash into its packed value and drop
+    the hash. Packed fields win where both exist since they are newer.
+    Returns the number of tickers migrated."""
+    redis = await get_redis()
+    migrated = 0
+    async for key in redis.scan_iter(match=f"{REDIS_QUOTE_PREFIX}*"):
+        ticker = key.removeprefix(REDIS_QUOTE_PREFIX)
+        data = await redis.hgetall(key)
+        if data:
+            await _merge_packed(ticker, parse_quote_hash(data), keep_current=True)
+            migrated += 1
+        await redis.delete(key)
+    if migrated:
+        logger.info("Migrated %d Redis quote hashes to the packed format", migrated)
+    return migrated
+
+
+async def read_redis(ticker: str) -> QuoteRecord | None:
     """Read the current Redis hot-cache entry for `ticker`, or None on miss/error."""
     try:
-        r = await get_redis()
-        data = await r.hgetall(f"{REDIS_QUOTE_PREFIX}{ticker}")
-        if not data:
+        fields = await read_quote_fields(ticker)
+        if not fields:
             return None
-        return QuoteData.from_redis_hash(ticker, data)
+        return QuoteRecord.from_fields(ticker, fields)
     except Exception as exc:
         logger.warning("Redis cache read failed for %s: %s", ticker, exc)
         return None
 
 
-async def write_redis(quote: QuoteData) -> None:
-    """Write a quote into the Redis hot-cache as a hash."""
+async def write_redis(quote: QuoteRecord) -> None:
+    """Merge a quote into the Redis hot-cache."""
     try:
-        r = await get_redis()
-        flat = quote.to_redis_mapping()
-        if flat:
-            await r.hset(f"{REDIS_QUOTE_PREFIX}{quote.ticker}", mapping=flat)
+        await merge_quote_fields(quote.ticker, quote.as_dict())
     except Exception as exc:
         logger.warning("Redis cache write failed for %s: %s", quote.ticker, exc)
 
 
-def _read_from_postgres(ticker: str, db: Session | None = None) -> QuoteData | None:
+def _read_from_postgres(ticker: str, db: Session | None = None) -> QuoteRecord | None:
     """Read warm-cache row. Uses the caller's session when provided so the
     FastAPI test override (and any active transaction) is honoured."""
     try:
@@ -64,47 +192,64 @@ def _read_from_postgres(ticker: str, db: Session | None = None) -> QuoteData | N
             existing = db.query(Quote).filter(Quote.ticker == ticker).first()
             if not existing:
                 return None
-            return QuoteData.from_quote_row(existing)
+            return QuoteRecord.from_quote_row(existing)
         with db_session() as session:
             existing = session.query(Quote).filter(Quote.ticker == ticker).first()
             if not existing:
                 return None
-            return QuoteData.from_quote_row(existing)
+            return QuoteRecord.from_quote_row(existing)
     except Exception as exc:
         logger.warning("Postgres cache read failed for %s: %s", ticker, exc)
         return None
 
 
-def persist_quote(quote_data: QuoteData, db: Session | None = None) -> None:
+def persist_quote(quote_data: QuoteRecord, db: Session | None = None) -> None:
     """Upsert a quote into Postgres (warm cache layer).
 
     `db` lets the caller share a request-scoped session; when omitted,
     opens and commits its own short transaction. Both shapes write the
-    full `QuoteData` field set so a partial Alpaca snapshot does not
+    full quote field set so a partial Alpaca snapshot does not
     overwrite OHLCV columns the warm cache may have from a prior persist.
     """
+    persist_quotes([quote_data], db=db)
+
+
+def persist_quotes(quotes: Iterable[QuoteRecord], db: Session | None = None) -> None:
+    """Upsert any number of quotes in a single INSERT ... ON CONFLICT statement.
+
+    Same session semantics as `persist_quote`. Duplicate tickers collapse to
+    the last one given, since Postgres refuses to touch the same row twice
+    in one ON CONFLICT DO UPDATE.
+    """
+    by_ticker = {quote.ticker: quote.as_dict() for quote in quotes}
+    if not by_ticker:
+        return
+    stmt = _upsert_statement(list(by_ticker.values()))
     if db is not None:
-        _persist_in(db, quote_data)
+        db.execute(stmt)
         db.commit()
         return
     with db_session() as session:
-        _persist_in(session, quote_data)
+        session.execute(stmt)
         session.commit()
 
 
-def _persist_in(db: Session, quote_data: QuoteData) -> None:
-    payload = quote_data.to_db_payload()
-    existing = db.query(Quote).filter(Quote.ticker == quote_data.ticker).first()
-    if existing:
-        for field in QUOTE_FIELDS:
-            if field != "ticker":
-                setattr(existing, field, payload.get(field))
-        existing.updated_at = datetime.now(timezone.utc)
-    else:
-        db.add(Quote(**payload))
+def _upsert_statement(payloads: list[dict]):
+    stmt = pg_insert(Quote).values(payloads)
+    return stmt.on_conflict_do_update(
+        index_elements=[Quote.ticker],
+        set_={
+            **{
+                field: getattr(stmt.excluded, field)
+                for field in QUOTE_FIELDS
+                if field != "ticker"
+            },
+            "updated_at": func.now(),
+        },
+    )
 
 
-async def _fetch_from_alpaca(ticker: str) -> QuoteData:
+async def _fetch_from_alpaca(ticker: str) -> QuoteRecord:
     """Wrapper that maps Alpaca exceptions to HTTPException."""
     try:
         return await fetch_snapshot(ticker)
@@ -139,11 +284,8 @@ async def resolve_quote(ticker: str, db: Session | None = None) -> QuoteResponse
     if cached and cached.timestamp and cached.price is not None:
         cache_age = int(datetime.now(timezone.utc).timestamp()) - cached.timestamp
         if cache_age < config.quote_staleness_seconds:
-            return QuoteResponse(
-                **cached.model_dump(),
-                cached=True,
-                cache_layer="redis",
-                age_seconds=cache_age,
+            return cached.to_response(
+                cached=True, cache_layer="redis", age_seconds=cache_age
             )
 
     pg_data = _read_from_postgres(ticker, db=db)
@@ -151,11 +293,8 @@ async def resolve_quote(ticker: str, db: Session | None = None) -> QuoteResponse
         cache_age = int(datetime.now(timezone.utc).timestamp()) - pg_data.timestamp
         if cache_age < config.quote_staleness_seconds:
             await write_redis(pg_data)
-            return QuoteResponse(
-                **pg_data.model_dump(),
-                cached=True,
-                cache_layer="postgres",
-                age_seconds=cache_age,
+            return pg_data.to_response(
+                cached=True, cache_layer="postgres", age_seconds=cache_age
             )
 
     quote_data = await _fetch_from_alpaca(ticker)
@@ -165,11 +304,8 @@ async def resolve_quote(ticker: str, db: Session | None = None) -> QuoteResponse
     except Exception as exc:
         logger.warning("Postgres persist skipped for %s: %s", ticker, exc)
 
-    return QuoteResponse(
-        **quote_data.model_dump(),
-        cached=False,
-        cache_layer="alpaca_rest",
-        age_seconds=0,
+    return quote_data.to_response(
+        cached=False, cache_layer="alpaca_rest", age_seconds=0
     )
 
 
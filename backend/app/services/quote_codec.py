@@ -0,0 +1,213 @@
+"""Packed binary encoding for Redis quote entries.
+
+Layout (little-endian), version 1:
+
+    u8   version
+    u32  presence mask, bit i set when QUOTE_VALUE_FIELDS[i] is present
+    ...  present numeric fields in QUOTE_VALUE_FIELDS order, f64 for prices and
+         sizes, i64 for `trade_count` / `timestamp`
+    u8   source length, then that many UTF-8 bytes (only when bit 16 is set)
+
+The numeric block for a given mask is a fixed struct, so decoding is one
+`unpack_from` plus the source tail instead of a float()/int() per hash field.
+Struct layouts are memoised per mask; in practice a feed only produces a
+handful of distinct masks.
+
+Bump QUOTE_CODEC_VERSION (and keep decoding the old one) when the field list
+changes. A value with an unknown version decodes to None, which readers
+treat as a cache miss.
+
+Every numeric field is 8 bytes wide whatever its type, so two values can be
+merged field by field without decoding a number. `MERGE_QUOTE_LUA` does that
+on the Redis server, which makes a partial update one atomic round trip.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections.abc import Mapping
+from typing import Any
+
+QUOTE_CODEC_VERSION = 1
+
+# Order is part of the wire format — append only.
+QUOTE_VALUE_FIELDS = (
+    "price",
+    "bid_price",
+    "bid_size",
+    "ask_price",
+    "ask_size",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "trade_count",
+    "vwap",
+    "previous_close",
+    "change",
+    "change_percent",
+    "timestamp",
+    "source",
+)
+_INT_FIELDS = frozenset({"trade_count", "timestamp"})
+_SOURCE_BIT = 1 << QUOTE_VALUE_FIELDS.index("source")
+_NUMERIC_FIELDS = QUOTE_VALUE_FIELDS[:-1]
+
+_HEADER = struct.Struct("<BI")
+_layouts: dict[int, tuple[struct.Struct, tuple[str, ...]]] = {}
+
+
+def _layout(mask: int) -> tuple[struct.Struct, tuple[str, ...]]:
+    layout = _layouts.get(mask)
+    if layout is None:
+        names = tuple(
+            name for i, name in enumerate(_NUMERIC_FIELDS) if mask & (1 << i)
+        )
+        fmt = "<" + "".join("q" if name in _INT_FIELDS else "d" for name in names)
+        layout = (struct.Struct(fmt), names)
+        _layouts[mask] = layout
+    return layout
+
+
+def encode_quote(fields: Mapping[str, Any]) -> bytes:
+    """Pack the non-None quote fields of `fields` (extra keys are ignored)."""
+    mask = 0
+    for i, name in enumerate(QUOTE_VALUE_FIELDS):
+        if fields.get(name) is not None:
+            mask |= 1 << i
+
+    packer, names = _layout(mask & ~_SOURCE_BIT)
+    values = [
+        int(fields[name]) if name in _INT_FIELDS else float(fields[name])
+        for name in names
+    ]
+    out = _HEADER.pack(QUOTE_CODEC_VERSION, mask) + packer.pack(*values)
+    if mask & _SOURCE_BIT:
+        source = str(fields["source"]).encode()[:255]
+        out += bytes((len(source),)) + source
+    return out
+
+
+def decode_quote(raw: bytes) -> dict[str, Any] | None:
+    """Unpack a value written by `encode_quote`, or None if it isn't one."""
+    if len(raw) < _HEADER.size:
+        return None
+    version, mask = _HEADER.unpack_from(raw)
+    if version != QUOTE_CODEC_VERSION:
+        return None
+
+    unpacker, names = _layout(mask & ~_SOURCE_BIT)
+    offset = _HEADER.size + unpacker.size
+    if len(raw) < offset:
+        return None
+    fields: dict[str, Any] = dict(zip(names, unpacker.unpack_from(raw, _HEADER.size)))
+    if mask & _SOURCE_BIT:
+        length = raw[offset] if len(raw) > offset else 0
+        fields["source"] = raw[offset + 1 : offset + 1 + length].decode(
+            errors="replace"
+        )
+    return fields
+
+
+# Merge a packed update into the packed value at KEYS[1], in one step on the
+# server. ARGV: the update (from `encode_quote`), QUOTE_CODEC_VERSION, the
+# number of numeric fields, and "1" to keep stored fields where both values
+# have them (default: the update wins). A missing or unreadable stored value
+# is replaced by the update. Redis runs Lua 5.1, hence the arithmetic in
+# place of bit operations.
+MERGE_QUOTE_LUA = """
+local version = tonumber(ARGV[2])
+local numeric = tonumber(ARGV[3])
+
+local function fields(value)
+  if #value < 5 or string.byte(value, 1) ~= version then
+    return nil
+  end
+  local b2, b3, b4, b5 = string.byte(value, 2, 5)
+  local mask = b2 + b3 * 256 + b4 * 65536 + b5 * 16777216
+  local out, pos = {}, 6
+  for i = 0, numeric - 1 do
+    if math.floor(mask / 2 ^ i) % 2 == 1 then
+      if pos + 7 > #value then
+        return nil
+      end
+      out[i] = string.sub(value, pos, pos + 7)
+      pos = pos + 8
+    end
+  end
+  if math.floor(mask / 2 ^ numeric) % 2 == 1 then
+    local source = string.sub(value, pos + 1, pos + (string.byte(value, pos) or 0))
+    out[numeric] = string.char(#source) .. source
+  end
+  return out
+end
+
+local update = ARGV[1]
+local stored = redis.call('GET', KEYS[1])
+local current = stored and fields(stored)
+if not current then
+  redis.call('SET', KEYS[1], update)
+  return 1
+end
+local first, second = fields(update), current
+if ARGV[4] == '1' then
+  first, second = current, first
+end
+local mask, parts = 0, {}
+for i = 0, numeric do
+  local part = first[i] or second[i]
+  if part then
+    mask = mask + 2 ^ i
+    parts[#parts + 1] = part
+  end
+end
+redis.call('SET', KEYS[1], string.char(
+  version,
+  mask % 256,
+  math.floor(mask / 256) % 256,
+  math.floor(mask / 65536) % 256,
+  math.floor(mask / 16777216) % 256
+) .. table.concat(parts))
+return 1
+"""
+
+
+def merge_quote_args(update: bytes, *, keep_current: bool = False) -> list:
+    """ARGV for `MERGE_QUOTE_LUA` given a packed `update`."""
+    return [update, QUOTE_CODEC_VERSION, len(_NUMERIC_FIELDS), int(keep_current)]
+
+
+def _to_float(value: str | None) -> float | None:
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value: str | None) -> int | None:
+    if value in (None, ""):
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_quote_hash(data: Mapping[str, str]) -> dict[str, Any]:
+    """Typed fields from a legacy ``quote:{ticker}`` hash, same shape as
+    `decode_quote` so callers don't care which format they read."""
+    fields: dict[str, Any] = {}
+    for name in QUOTE_VALUE_FIELDS:
+        raw = data.get(name)
+        if name == "source":
+            value: Any = raw
+        elif name in _INT_FIELDS:
+            value = _to_int(raw)
+        else:
+            value = _to_float(raw)
+        if value is not None:
+            fields[name] = value
+    return fields
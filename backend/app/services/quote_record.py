@@ -0,0 +1,96 @@
+"""Unvalidated quote record for the internal quote paths.
+
+Everything that produces quotes inside the process (the Redis hot-cache,
+the Postgres warm-cache, Alpaca snapshots) is our own trusted writer, so
+validating each quote through pydantic on every read only costs CPU. The
+cache and feed layers pass `QuoteRecord`s around instead and convert to
+`QuoteData` / `QuoteResponse` once, at the API boundary. That conversion
+uses the normal validating constructor: on pydantic v2 `model_construct` is
+the slower of the two for a model this size.
+
+`benchmarks/quote_record.py` compares construction and serialisation cost
+against the pydantic model.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
+
+from app.db.models import Quote
+from app.schemas import QuoteData, QuoteResponse
+
+
+@dataclass(slots=True)
+class QuoteRecord:
+    ticker: str
+    price: float | None = None
+    bid_price: float | None = None
+    bid_size: float | None = None
+    ask_price: float | None = None
+    ask_size: float | None = None
+    open: float | None = None
+    high: float | None = None
+    low: float | None = None
+    close: float | None = None
+    volume: float | None = None
+    trade_count: int | None = None
+    vwap: float | None = None
+    previous_close: float | None = None
+    change: float | None = None
+    change_percent: float | None = None
+    source: str | None = None
+    timestamp: int | None = None
+
+    @classmethod
+    def from_fields(cls, ticker: str, fields: Mapping[str, Any]) -> QuoteRecord:
+        """Build from typed fields (`quote_cache.read_quote_fields`)."""
+        return cls(ticker, **fields)
+
+    @classmethod
+    def from_quote_row(cls, row: Quote) -> QuoteRecord:
+        return cls(
+            row.ticker,
+            row.price,
+            row.bid_price,
+            row.bid_size,
+            row.ask_price,
+            row.ask_size,
+            row.open,
+            row.high,
+            row.low,
+            row.close,
+            row.volume,
+            row.trade_count,
+            row.vwap,
+            row.previous_close,
+            row.change,
+            row.change_percent,
+            row.source,
+            row.timestamp,
+        )
+
+    def as_dict(self, *, skip_none: bool = False) -> dict[str, Any]:
+        values = zip(QUOTE_RECORD_FIELDS, _get_fields(self))
+        if skip_none:
+            return {name: value for name, value in values if value is not None}
+        return dict(values)
+
+    def to_quote_data(self) -> QuoteData:
+        return QuoteData(**self.as_dict())
+
+    def to_response(
+        self, *, cached: bool, cache_layer: str, age_seconds: int
+    ) -> QuoteResponse:
+        return QuoteResponse(
+            **self.as_dict(),
+            cached=cached,
+            cache_layer=cache_layer,
+            age_seconds=age_seconds,
+        )
+
+
+QUOTE_RECORD_FIELDS = tuple(QuoteRecord.__dataclass_fields__)
+_get_fields = attrgetter(*QUOTE_RECORD_FIELDS)
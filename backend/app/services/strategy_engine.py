@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime, time, timedelta, timezone
+import math
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
 from decimal import Decimal, ROUND_FLOOR
+from functools import cached_property
+from pathlib import Path
 
+import numpy as np
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.models import DailyBar, Strategy
+from app.services.bar_store import get_bars_many
 from app.services.strategy_signals import (
+    SIGNAL_BUY,
     bars_required_for_signal,
     evaluate_signal_from_bars,
+    signal_series,
 )
 
 
@@ -452,6 +462,152 @@ class BacktestTrade:
     profit: Decimal | None = None
 
 
+@dataclass(frozen=True)
+class BacktestSymbol:
+    """One symbol's daily bars for a backtest, oldest first."""
+
+    ticker: str
+    dates: list[date]
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    # Index into the shared `BacktestBars.dates` of each bar.
+    date_index: np.ndarray
+    # Per shared date, the index of this symbol's latest bar on or before it
+    # (-1 before its first bar).
+    last_row: np.ndarray
+    # Row -> close as the Decimal the fills and equity use. Filled on first
+    # read and kept for every later simulation over the same bars.
+    close_decimals: dict[int, Decimal] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def close_decimal(self, row: int) -> Decimal:
+        value = self.close_decimals.get(row)
+        if value is None:
+            value = Decimal(str(float(self.closes[row])))
+            self.close_decimals[row] = value
+        return value
+
+
+@dataclass(frozen=True)
+class BacktestBars:
+    """Every symbol's bars aligned onto one shared, sorted date index."""
+
+    dates: list[date]
+    symbols: tuple[BacktestSymbol, ...]
+
+    @cached_property
+    def timestamps(self) -> list[int]:
+        """Unix time of midnight UTC of each date, as the equity curve uses."""
+        return [
+            int(datetime.combine(day, time.min, tzinfo=timezone.utc).timestamp())
+            for day in self.dates
+        ]
+
+
+def backtest_history_start(
+    strategy_type: str, params_json: dict, risk_json: dict, start: date
+) -> date:
+    """First date of the pre-start history signals and ATR are computed over."""
+    risk = normalized_risk_config(risk_json)
+    lookback_days = max(
+        bars_required_for_signal(strategy_type, params_json),
+        int(risk["atr_period"]) + 1,
+    )
+    return start - timedelta(days=max(lookback_days * 3, 30))
+
+
+def load_backtest_bars(
+    db: Session, symbols: list[str], history_start: date, end: date
+) -> BacktestBars:
+    """Load `symbols`' daily bars in one query and align them by date."""
+    rows = db.execute(
+        select(
+            DailyBar.ticker, DailyBar.date, DailyBar.high, DailyBar.low, DailyBar.close
+        )
+        .where(
+            DailyBar.ticker.in_(symbols),
+            DailyBar.date >= history_start,
+            DailyBar.date <= end,
+        )
+        .order_by(DailyBar.ticker, DailyBar.date)
+    ).all()
+    by_symbol: dict[str, list] = {symbol: [] for symbol in symbols}
+    for row in rows:
+        by_symbol[row.ticker].append(row)
+    return _align_backtest_bars(
+        [
+            (
+                symbol,
+                np.array([row.date for row in symbol_rows], dtype="datetime64[D]"),
+                np.array([row.high for row in symbol_rows], dtype=np.float64),
+                np.array([row.low for row in symbol_rows], dtype=np.float64),
+                np.array([row.close for row in symbol_rows], dtype=np.float64),
+            )
+            for symbol, symbol_rows in by_symbol.items()
+        ]
+    )
+
+
+def load_backtest_bars_from_store(
+    symbols: list[str],
+    history_start: date,
+    end: date,
+    *,
+    root: Path | None = None,
+) -> BacktestBars:
+    """Like `load_backtest_bars`, but over views of the memory-mapped bar store.
+
+    Nothing is copied, so processes that load the same symbols share the
+    pages. The caller refreshes the store for `symbols` first.
+    """
+    return _align_backtest_bars(
+        [
+            (symbol, arrays.dates, arrays.high, arrays.low, arrays.close)
+            for symbol, arrays in get_bars_many(
+                symbols, history_start, end, root=root
+            ).items()
+        ]
+    )
+
+
+def _align_backtest_bars(
+    columns: list[tuple[str, np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+) -> BacktestBars:
+    """Build `BacktestBars` from (ticker, datetime64[D] dates, highs, lows,
+    closes) per symbol, oldest first."""
+    days = [dates.astype(np.int64) for _, dates, _, _, _ in columns]
+    all_days = np.unique(np.concatenate(days)) if days else np.empty(0, np.int64)
+    aligned = [
+        BacktestSymbol(
+            ticker=ticker,
+            dates=dates.astype("datetime64[D]").tolist(),
+            highs=highs,
+            lows=lows,
+            closes=closes,
+            date_index=np.searchsorted(all_days, symbol_days),
+            last_row=np.searchsorted(symbol_days, all_days, side="right") - 1,
+        )
+        for (ticker, dates, highs, lows, closes), symbol_days in zip(columns, days)
+    ]
+    return BacktestBars(
+        dates=all_days.astype("datetime64[D]").tolist(), symbols=tuple(aligned)
+    )
+
+
+def _empty_backtest_result(capital_allocation: Decimal) -> dict:
+    return {
+        "equity_curve": [],
+        "drawdown_curve": [],
+        "trades": [],
+        "win_rate": 0.0,
+        "avg_return_per_trade": 0.0,
+        "max_drawdown": 0.0,
+        "ending_equity": str(capital_allocation),
+    }
+
+
 def run_backtest(
     *,
     db: Session,
@@ -463,100 +619,140 @@ def run_backtest(
     capital_allocation: Decimal,
     start: datetime,
     end: datetime,
+    on_day: Callable[[int, int, dict], None] | None = None,
 ) -> dict:
     if strategy_type not in STRATEGY_TEMPLATE_MAP or timeframe != "1Day":
-        return {
-            "equity_curve": [],
-            "drawdown_curve": [],
-            "trades": [],
-            "win_rate": 0.0,
-            "avg_return_per_trade": 0.0,
-            "max_drawdown": 0.0,
-            "ending_equity": str(capital_allocation),
-        }
-
-    order_quantity = _safe_decimal(params_json.get("order_quantity", "1"), "1")
-    risk = normalized_risk_config(risk_json)
-    lookback_days = max(
-        bars_required_for_signal(strategy_type, params_json),
-        int(risk["atr_period"]) + 1,
+        return _empty_backtest_result(capital_allocation)
+    history_start = backtest_history_start(
+        strategy_type, params_json, risk_json, start.date()
+    )
+    bars = load_backtest_bars(db, symbols, history_start, end.date())
+    return simulate_backtest(
+        bars,
+        strategy_type=strategy_type,
+        params_json=params_json,
+        risk_json=risk_json,
+        capital_allocation=capital_allocation,
+        start=start.date(),
+        on_day=on_day,
     )
-    history_start = start.date() - timedelta(days=max(lookback_days * 3, 30))
 
-    bars_by_symbol: dict[str, list[DailyBar]] = {}
-    for symbol in symbols:
-        rows = (
-            db.query(DailyBar)
-            .filter(
-                DailyBar.ticker == symbol,
-                DailyBar.date >= history_start,
-                DailyBar.date <= end.date(),
+
+def _signal_events(
+    bars: BacktestBars,
+    strategy_type: str,
+    params_json: dict,
+    risk_json: dict,
+    start: date,
+    first_day: int,
+) -> tuple[list[tuple[int, int, int, int]], list[int]]:
+    """(date index, symbol position, row, signal) for every actionable bar
+    from `first_day` on, in date then symbol order, and per symbol the row of
+    its first bar on or after `backtest_history_start`."""
+    history_start = backtest_history_start(strategy_type, params_json, risk_json, start)
+    events: list[tuple[int, int, int, int]] = []
+    first_rows: list[int] = []
+    for position, symbol in enumerate(bars.symbols):
+        first_row = bisect_left(symbol.dates, history_start)
+        first_rows.append(first_row)
+        signals = np.zeros(len(symbol.dates), dtype=np.int8)
+        signals[first_row:] = signal_series(
+            strategy_type,
+            symbol.closes[first_row:],
+            symbol.highs[first_row:],
+            symbol.lows[first_row:],
+            params_json,
+        )
+        rows = np.flatnonzero(signals)
+        rows = rows[symbol.date_index[rows] >= first_day]
+        events.extend(
+            zip(
+                symbol.date_index[rows].tolist(),
+                [position] * len(rows),
+                rows.tolist(),
+                signals[rows].tolist(),
             )
-            .order_by(DailyBar.date.asc())
-            .all()
         )
-        bars_by_symbol[symbol] = rows
+    events.sort()
+    return events, first_rows
 
-    in_range_dates = sorted(
-        {
-            row.date
-            for rows in bars_by_symbol.values()
-            for row in rows
-            if row.date >= start.date()
-        }
+
+def simulate_backtest(
+    bars: BacktestBars,
+    *,
+    strategy_type: str,
+    params_json: dict,
+    risk_json: dict,
+    capital_allocation: Decimal,
+    start: date,
+    end: date | None = None,
+    on_day: Callable[[int, int, dict], None] | None = None,
+) -> dict:
+    """Simulate a backtest over pre-loaded bars in one pass over the dates.
+
+    Each symbol's signal on every bar comes from `signal_series` up front, so
+    a symbol's history is never re-evaluated. The sweep then visits only the
+    (date, symbol) pairs that signalled, in date then symbol order, and
+    sizes and books fills exactly as the paper-trading path does (Decimal
+    cash, `resolve_signal_order_quantity`, ATR from the bars up to that
+    day). Bars before `start` only warm up the indicators, and only those
+    from `backtest_history_start` on are used, and bars after `end` (when
+    given) are ignored, so `bars` may be loaded once over a wider range and
+    shared across runs with different parameters or date windows.
+
+    `on_day(days_done, days_total, point)` is called after each simulated
+    day with that day's equity point; an exception raised from it aborts
+    the run.
+    """
+    first_day = bisect_left(bars.dates, start)
+    last_day = len(bars.dates) if end is None else bisect_right(bars.dates, end)
+    if first_day >= last_day:
+        return _empty_backtest_result(capital_allocation)
+
+    order_quantity = _safe_decimal(params_json.get("order_quantity", "1"), "1")
+    risk = normalized_risk_config(risk_json)
+    # ATR only ever caps buys when both of these are set.
+    atr_sizing = risk["risk_per_trade"] > 0 and risk["atr_stop_multiplier"] > 0
+    events, first_rows = _signal_events(
+        bars, strategy_type, params_json, risk_json, start, first_day
     )
-    if not in_range_dates:
-        return {
-            "equity_curve": [],
-            "drawdown_curve": [],
-            "trades": [],
-            "win_rate": 0.0,
-            "avg_return_per_trade": 0.0,
-            "max_drawdown": 0.0,
-            "ending_equity": str(capital_allocation),
-        }
 
+    tickers = [symbol.ticker for symbol in bars.symbols]
     cash = capital_allocation
-    position_qty: dict[str, Decimal] = {symbol: Decimal("0") for symbol in symbols}
-    entry_price: dict[str, Decimal | None] = {symbol: None for symbol in symbols}
+    position_qty: dict[str, Decimal] = {ticker: Decimal("0") for ticker in tickers}
+    entry_price: dict[str, Decimal | None] = {ticker: None for ticker in tickers}
     closed_trade_returns: list[Decimal] = []
     trades: list[BacktestTrade] = []
     equity_curve: list[dict] = []
     drawdown_curve: list[dict] = []
     peak_equity = capital_allocation
+    # Positions of the symbols with an open position, for the equity sum.
+    held: set[int] = set()
 
-    history_by_symbol: dict[str, list[DailyBar]] = {symbol: [] for symbol in symbols}
-
-    all_dates = sorted({row.date for rows in bars_by_symbol.values() for row in rows})
-
-    for date_value in all_dates:
+    next_event = 0
+    for day in range(first_day, last_day):
+        date_value = bars.dates[day]
         day_order_count = 0
         day_notional = Decimal("0")
-        for symbol, rows in bars_by_symbol.items():
-            row = next((r for r in rows if r.date == date_value), None)
-            if row is None:
-                continue
-            history_by_symbol[symbol].append(row)
-            if row.date < start.date():
-                continue
-            decision = evaluate_signal_from_bars(
-                strategy_type,
-                history_by_symbol[symbol],
-                params_json,
-            )
-            signal = decision.signal
-            if signal == "hold":
-                continue
-
-            price = Decimal(str(row.close))
+        while next_event < len(events) and events[next_event][0] == day:
+            _, position, row, signal = events[next_event]
+            next_event += 1
+            symbol = tickers[position]
+            price = bars.symbols[position].close_decimal(row)
             if day_order_count >= risk["max_daily_orders"]:
                 continue
 
-            atr_value = _atr_from_rows(history_by_symbol[symbol], risk["atr_period"])
-
-            if signal == "buy":
+            if signal == SIGNAL_BUY:
+                atr_value = None
+                if atr_sizing:
+                    atr_value = _atr_at(
+                        bars.symbols[position],
+                        first_rows[position],
+                        row,
+                        risk["atr_period"],
+                    )
                 available_qty, reason = resolve_signal_order_quantity(
-                    signal=signal,
+                    signal="buy",
                     requested_quantity=order_quantity,
                     current_quantity=position_qty[symbol],
                     price=price,
@@ -582,6 +778,7 @@ def run_backtest(
                         / (current_qty + available_qty)
                     )
                 position_qty[symbol] += available_qty
+                held.add(position)
                 trades.append(
                     BacktestTrade(
                         ticker=symbol,
@@ -591,15 +788,14 @@ def run_backtest(
                         timestamp=datetime.combine(date_value, time.min, tzinfo=timezone.utc),
                     )
                 )
-            elif signal == "sell" and position_qty[symbol] > 0:
+            elif position_qty[symbol] > 0:
                 qty, reason = resolve_signal_order_quantity(
-                    signal=signal,
+                    signal="sell",
                     requested_quantity=order_quantity,
                     current_quantity=position_qty[symbol],
                     price=price,
                     capital_allocation=capital_allocation,
                     risk_json=risk,
-                    atr_value=atr_value,
                 )
                 if qty <= 0 or reason is not None:
                     continue
@@ -610,6 +806,7 @@ def run_backtest(
                 if position_qty[symbol] <= 0:
                     position_qty[symbol] = Decimal("0")
                     entry_price[symbol] = None
+                    held.discard(position)
                 closed_trade_returns.append(
                     pnl / (avg_entry * qty) if avg_entry > 0 else Decimal("0")
                 )
@@ -626,26 +823,24 @@ def run_backtest(
                     )
                 )
 
-        if date_value < start.date():
-            continue
-
         equity = cash
-        for symbol, qty in position_qty.items():
-            if qty <= 0:
-                continue
-            rows = bars_by_symbol[symbol]
-            row = next((r for r in reversed(rows) if r.date <= date_value), None)
-            if row is not None:
-                equity += qty * Decimal(str(row.close))
+        for position in sorted(held):
+            qty = position_qty[tickers[position]]
+            row = int(bars.symbols[position].last_row[day])
+            if row >= 0:
+                equity += qty * bars.symbols[position].close_decimal(row)
 
         peak_equity = max(peak_equity, equity)
         drawdown = Decimal("0")
         if peak_equity > 0:
             drawdown = (equity - peak_equity) / peak_equity
 
-        ts = int(datetime.combine(date_value, time.min, tzinfo=timezone.utc).timestamp())
-        equity_curve.append({"time": ts, "equity": equity, "drawdown": drawdown})
+        ts = bars.timestamps[day]
+        point = {"time": ts, "equity": equity, "drawdown": drawdown}
+        equity_curve.append(point)
         drawdown_curve.append({"time": ts, "equity": equity, "drawdown": drawdown})
+        if on_day is not None:
+            on_day(day - first_day + 1, last_day - first_day, point)
 
     win_rate = 0.0
     avg_return = 0.0
@@ -665,13 +860,218 @@ def run_backtest(
     }
 
 
-def _atr_from_rows(rows: list[DailyBar], period: int) -> Decimal:
-    if period <= 0 or len(rows) < period + 1:
+def simulate_backtest_float64(
+    bars: BacktestBars,
+    *,
+    strategy_type: str,
+    params_json: dict,
+    risk_json: dict,
+    capital_allocation: Decimal,
+    start: date,
+    end: date | None = None,
+) -> dict:
+    """`simulate_backtest` with float64 cash, sizing and ATR, for exploration.
+
+    Same signals, fill rules and result shape, but the sizing math runs on
+    floats and the equity and drawdown curves (floats here) are computed
+    with NumPy over the whole range instead of summed day by day. Results
+    usually match the Decimal path to within float rounding, but a quantity
+    that lands on a rounding boundary can size differently, so anything
+    reported as final should be re-run through `simulate_backtest`.
+    """
+    first_day = bisect_left(bars.dates, start)
+    last_day = len(bars.dates) if end is None else bisect_right(bars.dates, end)
+    if first_day >= last_day:
+        return _empty_backtest_result(capital_allocation)
+
+    order_quantity = float(_safe_decimal(params_json.get("order_quantity", "1"), "1"))
+    risk = normalized_risk_config(risk_json)
+    max_position = float(risk["max_position_quantity"])
+    max_daily_notional = float(risk["max_daily_notional"])
+    risk_per_trade = float(risk["risk_per_trade"])
+    atr_stop_multiplier = float(risk["atr_stop_multiplier"])
+    atr_sizing = risk_per_trade > 0 and atr_stop_multiplier > 0
+    events, first_rows = _signal_events(
+        bars, strategy_type, params_json, risk_json, start, first_day
+    )
+
+    days = last_day - first_day
+    capital = float(capital_allocation)
+    cash = capital
+    cash_change = np.zeros(days)
+    qty_change = np.zeros((len(bars.symbols), days))
+    position_qty = [0.0] * len(bars.symbols)
+    entry_price: list[float | None] = [None] * len(bars.symbols)
+    closed_trade_returns: list[float] = []
+    trades: list[BacktestTrade] = []
+
+    current_day = -1
+    day_order_count = 0
+    day_notional = 0.0
+    for day, position, row, signal in events:
+        if day >= last_day:
+            break
+        if day != current_day:
+            current_day = day
+            day_order_count = 0
+            day_notional = 0.0
+        if day_order_count >= risk["max_daily_orders"]:
+            continue
+        symbol = bars.symbols[position]
+        price = float(symbol.closes[row])
+        current_qty = position_qty[position]
+
+        if signal == SIGNAL_BUY:
+            if current_qty >= max_position or price <= 0:
+                continue
+            if current_qty > 0 and not risk["allow_pyramiding"]:
+                continue
+            quantity = min(
+                order_quantity,
+                max_position - current_qty,
+                _floor_qty(min(capital, cash) / price),
+            )
+            if atr_sizing and quantity > 0:
+                atr_value = _atr_at_float64(
+                    symbol, first_rows[position], row, risk["atr_period"]
+                )
+                if atr_value > 0:
+                    quantity = min(
+                        quantity,
+                        _floor_qty(risk_per_trade / (atr_value * atr_stop_multiplier)),
+                    )
+            if quantity <= 0:
+                continue
+            notional = quantity * price
+            if day_notional + notional > max_daily_notional:
+                continue
+            cash -= notional
+            cash_change[day - first_day] -= notional
+            day_notional += notional
+            day_order_count += 1
+            held_entry = entry_price[position]
+            entry_price[position] = (
+                price
+                if held_entry is None
+                else (held_entry * current_qty + price * quantity)
+                / (current_qty + quantity)
+            )
+            position_qty[position] = current_qty + quantity
+            qty_change[position, day - first_day] += quantity
+            trades.append(
+                BacktestTrade(
+                    ticker=symbol.ticker,
+                    side="buy",
+                    quantity=Decimal(str(quantity)),
+                    price=Decimal(str(price)),
+                    timestamp=_day_timestamp(bars, day),
+                )
+            )
+        elif current_qty > 0:
+            quantity = min(order_quantity, current_qty)
+            if quantity <= 0:
+                continue
+            avg_entry = entry_price[position] or price
+            pnl = (price - avg_entry) * quantity
+            cash += quantity * price
+            cash_change[day - first_day] += quantity * price
+            remaining = current_qty - quantity
+            if remaining <= 0:
+                remaining = 0.0
+                entry_price[position] = None
+            position_qty[position] = remaining
+            qty_change[position, day - first_day] -= current_qty - remaining
+            closed_trade_returns.append(
+                pnl / (avg_entry * quantity) if avg_entry > 0 else 0.0
+            )
+            day_notional += quantity * price
+            day_order_count += 1
+            trades.append(
+                BacktestTrade(
+                    ticker=symbol.ticker,
+                    side="sell",
+                    quantity=Decimal(str(quantity)),
+                    price=Decimal(str(price)),
+                    timestamp=_day_timestamp(bars, day),
+                    profit=Decimal(str(pnl)),
+                )
+            )
+
+    equity = capital + np.cumsum(cash_change)
+    for position in np.flatnonzero(qty_change.any(axis=1)):
+        symbol = bars.symbols[position]
+        rows = symbol.last_row[first_day:last_day]
+        closes = np.where(rows >= 0, symbol.closes[np.maximum(rows, 0)], 0.0)
+        equity += np.cumsum(qty_change[position]) * closes
+    peak = np.maximum(np.maximum.accumulate(equity), capital)
+    drawdown = np.divide(
+        equity - peak, peak, out=np.zeros(days), where=peak > 0
+    )
+
+    curve = [
+        {"time": ts, "equity": value, "drawdown": dd}
+        for ts, value, dd in zip(
+            bars.timestamps[first_day:last_day], equity.tolist(), drawdown.tolist()
+        )
+    ]
+    win_rate = 0.0
+    avg_return = 0.0
+    if closed_trade_returns:
+        wins = sum(1 for value in closed_trade_returns if value > 0)
+        win_rate = wins / len(closed_trade_returns)
+        avg_return = sum(closed_trade_returns) / len(closed_trade_returns)
+
+    return {
+        "equity_curve": curve,
+        "drawdown_curve": [dict(point) for point in curve],
+        "trades": trades,
+        "win_rate": win_rate,
+        "avg_return_per_trade": avg_return,
+        "max_drawdown": float(drawdown.min()),
+        "ending_equity": str(equity[-1]),
+    }
+
+
+def _day_timestamp(bars: BacktestBars, day: int) -> datetime:
+    return datetime.combine(bars.dates[day], time.min, tzinfo=timezone.utc)
+
+
+def _floor_qty(value: float) -> float:
+    """`_round_down_qty` in float."""
+    return math.floor(value * 1e8) / 1e8
+
+
+def _atr_at_float64(
+    symbol: BacktestSymbol, first_row: int, row: int, period: int
+) -> float:
+    """`_atr_at` in float64."""
+    if period <= 0 or row - first_row < period:
+        return 0.0
+    highs = symbol.highs[row - period + 1 : row + 1]
+    lows = symbol.lows[row - period + 1 : row + 1]
+    prev_closes = symbol.closes[row - period : row]
+    true_ranges = np.maximum(
+        highs - lows,
+        np.maximum(np.abs(highs - prev_closes), np.abs(lows - prev_closes)),
+    )
+    return float(true_ranges.sum()) / period
+
+
+def _atr_at(symbol: BacktestSymbol, first_row: int, row: int, period: int) -> Decimal:
+    """ATR over the `period` true ranges ending at bar `row`, in Decimal.
+
+    Zero when fewer than `period` + 1 bars from `first_row` on are available.
+    """
+    if period <= 0 or row - first_row < period:
         return Decimal("0")
+    window = slice(row - period, row + 1)
+    highs = symbol.highs[window].tolist()
+    lows = symbol.lows[window].tolist()
+    closes = symbol.closes[window].tolist()
     true_ranges: list[Decimal] = []
-    for previous, current in zip(rows[:-1], rows[1:]):
-        prev_close = Decimal(str(previous.close))
-        high = Decimal(str(current.high))
-        low = Decimal(str(current.low))
+    for index in range(1, period + 1):
+        prev_close = Decimal(str(closes[index - 1]))
+        high = Decimal(str(highs[index]))
+        low = Decimal(str(lows[index]))
         true_ranges.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
-    return sum(true_ranges[-period:], Decimal("0")) / Decimal(period)
+    return sum(true_ranges, Decimal("0")) / Decimal(period)
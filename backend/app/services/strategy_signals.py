@@ -5,9 +5,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from app.db.models import DailyBar, Strategy
+from app.services import indicators
 
 
 @dataclass(frozen=True)
@@ -344,6 +346,101 @@ def evaluate_signal_from_bars(
     )
 
 
+SIGNAL_BUY = 1
+SIGNAL_SELL = -1
+
+
+def _cross_series(fast: np.ndarray, slow: np.ndarray, first: int) -> np.ndarray:
+    """`_cross_signal` at every bar from `first` on; fast/slow are bar-aligned."""
+    out = np.zeros(len(fast), dtype=np.int8)
+    if first >= len(fast):
+        return out
+    prev_fast, curr_fast = fast[first - 1 : -1], fast[first:]
+    prev_slow, curr_slow = slow[first - 1 : -1], slow[first:]
+    buy = (prev_fast <= prev_slow) & (curr_fast > curr_slow)
+    sell = ~buy & (prev_fast >= prev_slow) & (curr_fast < curr_slow)
+    out[first:] = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, 0))
+    return out
+
+
+def signal_series(
+    strategy_type: str,
+    closes: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    params: dict | None,
+) -> np.ndarray:
+    """The signal `evaluate_signal_from_bars` gives on every prefix, in one pass.
+
+    Element i is SIGNAL_BUY, SIGNAL_SELL or 0 (hold) for the bars up to and
+    including bar i. Indicators come from `app.services.indicators`, so on
+    exact ties between two averages (flat prices) a decision can differ from
+    the list helpers by float rounding; on real prices they agree.
+    """
+    params = dict(params or {})
+    n = len(closes)
+    hold = np.zeros(n, dtype=np.int8)
+
+    if strategy_type in {"ema_crossover", "sma_crossover"}:
+        is_ema = strategy_type == "ema_crossover"
+        fast_default, slow_default = (9, 21) if is_ema else (20, 50)
+        fast_period = _safe_int(params.get("fast_period", fast_default), fast_default)
+        slow_period = _safe_int(params.get("slow_period", slow_default), slow_default)
+        if fast_period <= 0 or slow_period <= 0 or fast_period >= slow_period:
+            return hold
+        if is_ema:
+            fast = indicators.ema(closes, fast_period)
+            slow = indicators.ema(closes, slow_period)
+        else:
+            # Pad so element i is the average of the window ending at bar i.
+            fast = np.full(n, np.nan)
+            slow = np.full(n, np.nan)
+            fast[fast_period - 1 :] = indicators.sma(closes, fast_period)
+            slow[slow_period - 1 :] = indicators.sma(closes, slow_period)
+        return _cross_series(fast, slow, slow_period + 1)
+
+    if strategy_type == "rsi_reversion":
+        rsi_period = _safe_int(params.get("rsi_period", 14), 14)
+        oversold = _safe_float(params.get("oversold_threshold", 30), 30.0)
+        overbought = _safe_float(params.get("overbought_threshold", 70), 70.0)
+        if rsi_period <= 0 or not 0 < oversold < overbought < 100:
+            return hold
+        first = rsi_period + 1
+        if first >= n:
+            return hold
+        rsi = np.full(n, np.nan)
+        rsi[rsi_period:] = indicators.rsi(closes, rsi_period)
+        prev_rsi, curr_rsi = rsi[first - 1 : -1], rsi[first:]
+        buy = (prev_rsi > oversold) & (curr_rsi <= oversold)
+        sell = ~buy & (prev_rsi < overbought) & (curr_rsi >= overbought)
+        hold[first:] = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, 0))
+        return hold
+
+    if strategy_type == "donchian_breakout":
+        breakout_period = _safe_int(params.get("breakout_period", 20), 20)
+        exit_period = _safe_int(params.get("exit_period", 10), 10)
+        if breakout_period <= 0 or exit_period <= 0:
+            return hold
+        first = max(breakout_period, exit_period) + 1
+        if first >= n:
+            return hold
+        # upper[t] / lower[t]: channel of the window ending at bar t.
+        upper = np.full(n, np.nan)
+        lower = np.full(n, np.nan)
+        upper[breakout_period - 1 :] = indicators.rolling_max(highs, breakout_period)
+        lower[exit_period - 1 :] = indicators.rolling_min(lows, exit_period)
+        # Bar i compares against the channels ending at bars i-2 and i-1.
+        prev_close, curr_close = closes[first - 1 : -1], closes[first:]
+        prev_upper, curr_upper = upper[first - 2 : -2], upper[first - 1 : -1]
+        prev_lower, curr_lower = lower[first - 2 : -2], lower[first - 1 : -1]
+        buy = (prev_close <= prev_upper) & (curr_close > curr_upper)
+        sell = ~buy & (prev_close >= prev_lower) & (curr_close < curr_lower)
+        hold[first:] = np.where(buy, SIGNAL_BUY, np.where(sell, SIGNAL_SELL, 0))
+        return hold
+
+    return hold
+
+
 def evaluate_strategy_signal(strategy: Strategy, db: Session) -> SignalDecision:
     if strategy.timeframe != "1Day":
         return SignalDecision(
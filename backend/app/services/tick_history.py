@@ -0,0 +1,99 @@
+"""Recent tick history kept in capped per-ticker Redis streams.
+
+The feed appends one compact entry per trade to ``ticks:{ticker}`` (XADD with
+an approximate MAXLEN, so the append stays O(1)). The stream entry id carries
+the receive time in milliseconds, so each entry only stores the price and,
+when the upstream message has one, the trade size.
+
+`app.tasks.tick_rollover` rolls closed minutes out of these streams into the
+partitioned ``tick_minute`` table and trims anything older than
+TICK_HISTORY_RETENTION_SECONDS, so Redis holds the last few hours of raw ticks
+and Postgres holds the minute bars built from them.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from app.db.redis import RedisClient
+
+TICK_STREAM_PREFIX = "ticks:"
+
+
+@dataclass(frozen=True, slots=True)
+class Tick:
+    ts_ms: int
+    price: float
+    size: float | None = None
+
+
+def tick_stream_key(ticker: str) -> str:
+    return f"{TICK_STREAM_PREFIX}{ticker}"
+
+
+def stream_id_ms(entry_id: str) -> int:
+    """Millisecond timestamp half of a Redis stream id ("<ms>-<seq>")."""
+    return int(entry_id.split("-", 1)[0])
+
+
+async def append_tick(
+    redis: RedisClient,
+    ticker: str,
+    price: float,
+    size: float | None = None,
+    *,
+    maxlen: int,
+) -> None:
+    fields = {"p": str(price)}
+    if size is not None:
+        fields["s"] = str(size)
+    await redis.xadd(
+        tick_stream_key(ticker), fields, maxlen=maxlen, approximate=True
+    )
+
+
+def parse_tick_entries(entries: list[tuple[str, dict[str, str]]]) -> list[Tick]:
+    """Convert raw XRANGE output into `Tick`s, dropping malformed entries."""
+    ticks: list[Tick] = []
+    for entry_id, fields in entries:
+        try:
+            price = float(fields["p"])
+            size = float(fields["s"]) if fields.get("s") else None
+            ticks.append(Tick(ts_ms=stream_id_ms(entry_id), price=price, size=size))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return ticks
+
+
+def aggregate_minutes(ticker: str, ticks: list[Tick]) -> list[dict]:
+    """Fold time-ordered ticks into one OHLCV row per UTC minute.
+
+    A tick without a size still counts towards `tick_count` and the price
+    fields; it just adds nothing to `volume`.
+    """
+    rows: list[dict] = []
+    current: dict = {}
+    current_minute = -1
+    for tick in ticks:
+        minute = tick.ts_ms // 60_000
+        if minute != current_minute:
+            current = {
+                "ticker": ticker,
+                "minute": datetime.fromtimestamp(minute * 60, tz=timezone.utc),
+                "open": tick.price,
+                "high": tick.price,
+                "low": tick.price,
+                "close": tick.price,
+                "volume": 0.0,
+                "tick_count": 0,
+            }
+            rows.append(current)
+            current_minute = minute
+        current["high"] = max(current["high"], tick.price)
+        current["low"] = min(current["low"], tick.price)
+        current["close"] = tick.price
+        current["volume"] += tick.size or 0.0
+        current["tick_count"] += 1
+    return rows
+
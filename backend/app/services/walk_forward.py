@@ -0,0 +1,192 @@
+"""Walk-forward optimization of a strategy template's parameters.
+
+The range from `start` to `end` is cut into rolling windows. Each window
+picks the best combination of a parameter grid over its in-sample span (by
+one of SWEEP_METRICS) and then trades that combination, untouched, over the
+out-of-sample span right after it. Windows step forward by the
+out-of-sample length, so the out-of-sample spans tile the range without
+overlapping. Their results are stitched into one equity curve: each span
+starts flat, with the previous span's ending equity as its capital.
+
+Every window's in-sample sweep goes to the sweep pool in one batch over the
+same bars, loaded once from the earliest warm-up date any window needs, so
+the cost grows with windows x combinations rather than with reloads. With
+precision "float64" the in-sample sweeps use the float64 simulator and each
+window's winner is re-run in Decimal (`reconcile_sweep_result`); the
+out-of-sample spans always trade in Decimal.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.services.backtest_sweep import (
+    SweepReconciliation,
+    SweepResult,
+    rank_results,
+    reconcile_sweep_result,
+    run_sweep_jobs,
+    summarize_backtest,
+    sweep_history_start,
+)
+from app.services.strategy_engine import (
+    BacktestBars,
+    load_backtest_bars_from_store,
+    simulate_backtest,
+)
+
+# Cap on windows x combinations for one walk-forward run.
+MAX_WALK_FORWARD_RUNS = 5000
+
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    in_sample_start: date
+    in_sample_end: date
+    out_of_sample_start: date
+    out_of_sample_end: date
+
+
+@dataclass(frozen=True)
+class WalkForwardSegment:
+    window: WalkForwardWindow
+    in_sample: SweepResult  # the winning combination's in-sample summary
+    out_of_sample: SweepResult
+    # For float64 sweeps: the winner's float64 summary against Decimal.
+    reconciliation: SweepReconciliation | None = None
+
+
+def walk_forward_windows(
+    start: date, end: date, in_sample_days: int, out_of_sample_days: int
+) -> list[WalkForwardWindow]:
+    """Rolling windows over [start, end]; the last out-of-sample span may be
+    shorter than `out_of_sample_days`."""
+    if in_sample_days <= 0 or out_of_sample_days <= 0:
+        raise ValueError("Window lengths must be > 0")
+    windows = []
+    in_sample_start = start
+    while True:
+        out_of_sample_start = in_sample_start + timedelta(days=in_sample_days)
+        if out_of_sample_start > end:
+            return windows
+        windows.append(
+            WalkForwardWindow(
+                in_sample_start=in_sample_start,
+                in_sample_end=out_of_sample_start - timedelta(days=1),
+                out_of_sample_start=out_of_sample_start,
+                out_of_sample_end=min(
+                    out_of_sample_start + timedelta(days=out_of_sample_days - 1), end
+                ),
+            )
+        )
+        in_sample_start += timedelta(days=out_of_sample_days)
+
+
+def run_walk_forward(
+    *,
+    symbols: list[str],
+    strategy_type: str,
+    combinations: list[dict],
+    risk_json: dict,
+    capital_allocation: Decimal,
+    windows: list[WalkForwardWindow],
+    metric: str = "ending_equity",
+    bars: BacktestBars | None = None,
+    precision: str = "decimal",
+) -> dict:
+    """Optimize on each window's in-sample span and trade the winner out of
+    sample.
+
+    Bars come from the bar store unless preloaded `bars` are passed, as in
+    `run_sweep_jobs`. Returns the segments plus the stitched out-of-sample
+    equity curve, trades and stats in `run_backtest`'s shape. Blocks until
+    done; call it from a worker thread.
+    """
+    if not windows:
+        raise ValueError("No walk-forward windows")
+    history_start = sweep_history_start(
+        strategy_type, combinations, risk_json, windows[0].in_sample_start
+    )
+    end = windows[-1].out_of_sample_end
+    in_sample_results = run_sweep_jobs(
+        symbols=symbols,
+        history_start=history_start,
+        end=end,
+        jobs=[
+            dict(
+                strategy_type=strategy_type,
+                combinations=combinations,
+                risk_json=risk_json,
+                capital_allocation=capital_allocation,
+                start=window.in_sample_start,
+                end=window.in_sample_end,
+                precision=precision,
+            )
+            for window in windows
+        ],
+        bars=bars,
+    )
+    if bars is None:
+        bars = load_backtest_bars_from_store(symbols, history_start, end)
+
+    segments: list[WalkForwardSegment] = []
+    equity_curve: list[dict] = []
+    trades: list = []
+    equity = capital_allocation
+    peak_equity = capital_allocation
+    for window, results in zip(windows, in_sample_results):
+        best = rank_results(results, metric)[0]
+        reconciliation = None
+        if precision != "decimal":
+            reconciliation = reconcile_sweep_result(
+                best,
+                symbols=symbols,
+                strategy_type=strategy_type,
+                risk_json=risk_json,
+                capital_allocation=capital_allocation,
+                start=window.in_sample_start,
+                end=window.in_sample_end,
+                bars=bars,
+            )
+            best = reconciliation.exact
+        result = simulate_backtest(
+            bars,
+            strategy_type=strategy_type,
+            params_json=best.params_json,
+            risk_json=risk_json,
+            capital_allocation=equity,
+            start=window.out_of_sample_start,
+            end=window.out_of_sample_end,
+        )
+        segments.append(
+            WalkForwardSegment(
+                window=window,
+                in_sample=best,
+                out_of_sample=summarize_backtest(best.params_json, result, equity),
+                reconciliation=reconciliation,
+            )
+        )
+        for point in result["equity_curve"]:
+            peak_equity = max(peak_equity, point["equity"])
+            drawdown = Decimal("0")
+            if peak_equity > 0:
+                drawdown = (point["equity"] - peak_equity) / peak_equity
+            equity_curve.append({**point, "drawdown": drawdown})
+        trades.extend(result["trades"])
+        equity = Decimal(result["ending_equity"])
+
+    sells = [trade for trade in trades if trade.side == "sell"]
+    wins = sum(1 for trade in sells if trade.profit > 0)
+    return {
+        "segments": segments,
+        "equity_curve": equity_curve,
+        "trades": trades,
+        "win_rate": wins / len(sells) if sells else 0.0,
+        "max_drawdown": float(
+            min((point["drawdown"] for point in equity_curve), default=Decimal("0"))
+        ),
+        "total_return": float((equity - capital_allocation) / capital_allocation),
+        "ending_equity": str(equity),
+    }
@@ -0,0 +1,124 @@
+"""Nightly background task that pre-fetches daily bars for the active universe.
+
+Daily bars are otherwise only fetched when a chart, backtest or ATR sizing
+first asks for them. After each NYSE session's daily bar is final, this task
+backfills the last BAR_WARM_LOOKBACK_DAYS of bars for every ticker that is
+held, watched, on an open order or traded by an active strategy. It goes
+through `backfill_daily_bars`, so a warm universe costs one batched
+multi-symbol request for the newest session. It then pre-computes the ATR
+and latest volume the order path reads (`warm_bar_stats`), so the first
+order of the day on a held ticker is a cache hit. Each run also prunes the
+intraday bar cache to INTRADAY_BAR_RETENTION_DAYS (`prune_intraday_bars`).
+The task also runs once on startup to catch up on closes missed while the
+app was down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+from app.config import get_config
+from app.db.models import Holding, Order, Strategy, WatchlistItem
+from app.db.session import get_session_factory
+from app.services.atr import warm_bar_stats
+from app.services.bars import (
+    DAILY_SESSION_FINAL_ET,
+    backfill_daily_bars,
+    prune_intraday_bars,
+)
+from app.services.market_calendar import ET, is_trading_day
+from app.services.strategy_engine import normalize_symbols
+
+logger = logging.getLogger(__name__)
+
+# Minutes after the session's daily bar is final before warming, to give
+# Alpaca time to publish it.
+WARM_DELAY_MINUTES = 15
+
+
+def active_universe(db: Session) -> list[str]:
+    """Tickers held, watched, on an open order or used by an active strategy."""
+    tickers: set[str] = set()
+    tickers.update(
+        ticker for (ticker,) in db.query(Holding.ticker).filter(Holding.quantity != 0)
+    )
+    tickers.update(ticker for (ticker,) in db.query(WatchlistItem.ticker).distinct())
+    tickers.update(
+        ticker
+        for (ticker,) in db.query(Order.ticker)
+        .filter(Order.status.in_(["open", "partially_filled"]))
+        .distinct()
+    )
+    for strategy in db.query(Strategy).filter(Strategy.status == "active"):
+        tickers.update(normalize_symbols(strategy))
+    return sorted(tickers)
+
+
+def next_warm_at(now: datetime) -> datetime:
+    """The first post-close warm time on a trading day strictly after `now`."""
+    now_et = now.astimezone(ET)
+    day = now_et.date()
+    while True:
+        if is_trading_day(day):
+            at = datetime(
+                day.year, day.month, day.day, *DAILY_SESSION_FINAL_ET, tzinfo=ET
+            ) + timedelta(minutes=WARM_DELAY_MINUTES)
+            if at > now_et:
+                return at
+        day += timedelta(days=1)
+
+
+async def warm_daily_bars_once(today: date | None = None) -> int:
+    """Backfill the lookback window for the active universe. Returns rows inserted."""
+    config = get_config()
+    today = today or datetime.now(ET).date()
+    start = today - timedelta(days=config.bar_warm_lookback_days)
+    db: Session = get_session_factory()()
+    try:
+        pruned = prune_intraday_bars(db)
+        if pruned:
+            logger.info("Pruned %d expired intraday bars", pruned)
+        tickers = active_universe(db)
+        if not tickers:
+            return 0
+        inserted = await backfill_daily_bars(
+            db,
+            tickers,
+            f"{start.isoformat()}T00:00:00Z",
+            f"{today.isoformat()}T23:59:59Z",
+        )
+        cached = await warm_bar_stats(db, tickers, today=today)
+        logger.info(
+            "Bar warming: %d new daily bars across %d tickers, %d stats cached",
+            inserted,
+            len(tickers),
+            cached,
+        )
+        return inserted
+    finally:
+        db.close()
+
+
+async def run_bar_warming_loop() -> None:
+    """Warm once on startup, then after every NYSE close."""
+    config = get_config()
+    if not config.bar_warming_enabled:
+        logger.info("Bar warming disabled")
+        return
+
+    while True:
+        try:
+            await warm_daily_bars_once()
+            now = datetime.now(timezone.utc)
+            delay = (next_warm_at(now) - now).total_seconds()
+            logger.info("Next bar warming in %.0fs", delay)
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            break
+        except Exception:
+            logger.exception("Bar warming failed")
+            await asyncio.sleep(config.bar_warm_retry_seconds)
@@ -16,7 +16,7 @@ from sqlalchemy.exc import ProgrammingError
 from app.config import get_config
 from app.db.models import Holding, Quote, Strategy, StrategyRun, Symbol, TradingAccount
 from app.db.session import get_session_factory
-from app.services.atr import compute_atr
+from app.services.atr import atr_from_db, warm_atr_bars
 from app.services.order_placement import (
     OrderPlacementError,
     PlaceOrderInput,
@@ -336,7 +336,7 @@ def _process_strategy(
             and risk["risk_per_trade"] > 0
             and risk["atr_stop_multiplier"] > 0
         ):
-            atr_value = compute_atr(ticker, db, risk["atr_period"])
+            atr_value = atr_from_db(ticker, db, risk["atr_period"])
         quantity, blocked_reason = resolve_signal_order_quantity(
             signal=signal,
             requested_quantity=quantity_default,
@@ -475,12 +475,39 @@ def run_strategy_once(strategy_id: int, *, force: bool = True) -> bool:
         db.close()
 
 
+async def warm_strategy_atr_bars() -> int:
+    """Batch-backfill the daily bars ATR sizing needs for active strategies.
+
+    Strategy cycles size from `atr_from_db`, which never fetches, so this runs
+    before each cycle to give every ticker the history its ATR period needs.
+    """
+    db: Session = get_session_factory()()
+    try:
+        if not _strategy_schema_ready(db):
+            return 0
+        by_period: dict[int, set[str]] = {}
+        for strategy in db.query(Strategy).filter(Strategy.status == "active").all():
+            risk = normalized_risk_config(strategy.risk_json or {})
+            if risk["risk_per_trade"] <= 0 or risk["atr_stop_multiplier"] <= 0:
+                continue
+            by_period.setdefault(risk["atr_period"], set()).update(
+                normalize_symbols(strategy)
+            )
+        inserted = 0
+        for period, tickers in by_period.items():
+            inserted += await warm_atr_bars(db, sorted(tickers), period)
+        return inserted
+    finally:
+        db.close()
+
+
 async def run_strategy_executor() -> None:
     poll_interval = max(5, int(getattr(get_config(), "strategy_poll_interval", 30)))
     logger.info("Strategy executor started (poll interval: %ds)", poll_interval)
     while True:
         try:
             if _config_enabled():
+                await warm_strategy_atr_bars()
                 process_active_strategies_once(force=False)
         except Exception:
             logger.exception("Strategy executor encountered an error")
@@ -0,0 +1,229 @@
+"""Background task that rolls closed minutes out of the Redis tick streams.
+
+Every TICK_ROLLOVER_INTERVAL seconds each ``ticks:{ticker}`` stream is read
+from the last rolled entry up to the most recent closed minute, folded into
+OHLCV rows and upserted into ``tick_minute``. The last rolled stream id per
+ticker is kept in the ``ticks:rolled`` hash so a restart resumes where it
+left off instead of re-reading the whole stream.
+
+Every write is a full recomputation of the minutes it touches: a pass
+re-reads the stream from the start of the cursor's minute and rebuilds each
+minute from all of its ticks, and the upsert replaces the stored row. The
+cursor is saved to Redis only after the Postgres commit, so a crash in
+between replays those minutes on the next pass; the replay rebuilds the
+same rows instead of adding their volume a second time. The same re-read
+handles a minute whose ticks straddle two passes (see
+ROLLOVER_GRACE_SECONDS).
+
+Once a batch is committed the streams are trimmed to the retention window,
+never past the start of the rolled cursor's minute, so a failed Postgres
+write can't lose ticks that haven't made it into a minute bar yet.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_config
+from app.db.models import TickMinute
+from app.db.redis import RedisClient, get_redis
+from app.db.session import get_session_factory
+from app.services.tick_history import (
+    TICK_STREAM_PREFIX,
+    aggregate_minutes,
+    parse_tick_entries,
+    stream_id_ms,
+    tick_stream_key,
+)
+
+logger = logging.getLogger(__name__)
+
+TICK_CURSOR_KEY = "ticks:rolled"
+# A minute is only rolled once it closed this long ago, so a tick whose
+# Redis-assigned id lands just before the boundary (clock skew between the
+# app and Redis) still makes it into the first write of its minute.
+ROLLOVER_GRACE_SECONDS = 5
+# Daily partitions created ahead of the current UTC day.
+PARTITIONS_AHEAD_DAYS = 1
+
+# UTC day the partition maintenance last ran for.
+_partitions_checked_on: date | None = None
+
+
+async def run_tick_rollover_loop() -> None:
+    """Run forever, rolling closed tick minutes from Redis into Postgres."""
+    config = get_config()
+    if not config.tick_history_enabled:
+        logger.info("Tick history disabled; rollover task not running")
+        return
+
+    logger.info(
+        "Tick rollover started (interval: %ds)", config.tick_rollover_interval
+    )
+    while True:
+        try:
+            await asyncio.sleep(config.tick_rollover_interval)
+            await rollover_once()
+        except asyncio.CancelledError:
+            break
+        except Exception:
+            logger.exception("Tick rollover error")
+
+
+async def rollover_once(now: float | None = None) -> int:
+    """Roll every closed minute still in the tick streams. Returns rows written."""
+    redis: RedisClient = await get_redis()
+    config = get_config()
+    now = time.time() if now is None else now
+    boundary_ms = int((now - ROLLOVER_GRACE_SECONDS) // 60) * 60_000
+
+    tickers: list[str] = []
+    async for key in redis.scan_iter(match=f"{TICK_STREAM_PREFIX}*"):
+        if key != TICK_CURSOR_KEY:
+            tickers.append(key.removeprefix(TICK_STREAM_PREFIX))
+
+    rows: list[dict] = []
+    cursors: dict[str, str] = {}
+    for ticker in tickers:
+        cursor = await redis.hget(TICK_CURSOR_KEY, ticker)
+        entries = await redis.xrange(
+            tick_stream_key(ticker),
+            min=str(_minute_start_ms(cursor)) if cursor else "-",
+            max=str(boundary_ms - 1),
+        )
+        new = _entries_after(entries, cursor)
+        if not new:
+            continue
+        # Rebuild every minute from its first new tick on, including the
+        # cursor's own minute when a late tick landed in it.
+        first_minute_ms = _minute_start_ms(new[0][0])
+        ticks = [
+            tick
+            for tick in parse_tick_entries(entries)
+            if tick.ts_ms >= first_minute_ms
+        ]
+        rows.extend(aggregate_minutes(ticker, ticks))
+        cursors[ticker] = entries[-1][0]
+
+    if rows:
+        started = time.perf_counter()
+        ok = await asyncio.to_thread(
+            _write_minutes, rows, datetime.fromtimestamp(now, tz=timezone.utc)
+        )
+        if not ok:
+            return 0
+        logger.info(
+            "Rolled %d tick minutes for %d tickers into Postgres (%.3fs)",
+            len(rows),
+            len(cursors),
+            time.perf_counter() - started,
+        )
+
+    for ticker, cursor in cursors.items():
+        await redis.hset(TICK_CURSOR_KEY, ticker, cursor)
+
+    retention_ms = int(now * 1000) - config.tick_history_retention_seconds * 1000
+    for ticker in tickers:
+        cursor = cursors.get(ticker) or await redis.hget(TICK_CURSOR_KEY, ticker)
+        if not cursor:
+            continue
+        await redis.xtrim(
+            tick_stream_key(ticker),
+            minid=min(retention_ms, _minute_start_ms(cursor)),
+            approximate=True,
+        )
+    return len(rows)
+
+
+def _minute_start_ms(entry_id: str) -> int:
+    return stream_id_ms(entry_id) // 60_000 * 60_000
+
+
+def _id_key(entry_id: str) -> tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def _entries_after(
+    entries: list[tuple[str, dict[str, str]]], cursor: str | None
+) -> list[tuple[str, dict[str, str]]]:
+    """The entries not rolled yet: those after `cursor` (all when there's none)."""
+    if not cursor:
+        return entries
+    rolled = _id_key(cursor)
+    return [entry for entry in entries if _id_key(entry[0]) > rolled]
+
+
+def _write_minutes(rows: list[dict], now: datetime) -> bool:
+    session = get_session_factory()()
+    try:
+        days = {row["minute"].date() for row in rows}
+        _maintain_partitions(session, days, now.date())
+
+        # Each row is rebuilt from every tick of its minute, so a replay after
+        # a crash or a minute straddling two passes replaces rather than adds.
+        stmt = pg_insert(TickMinute).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TickMinute.ticker, TickMinute.minute],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("open", "high", "low", "close", "volume", "tick_count")
+            },
+        )
+        session.execute(stmt)
+        session.commit()
+        return True
+    except Exception:
+        session.rollback()
+        logger.exception("Failed to roll tick minutes into Postgres")
+        return False
+    finally:
+        session.close()
+
+
+def _partition_name(day: date) -> str:
+    return f"tick_minute_p{day:%Y%m%d}"
+
+
+def _maintain_partitions(session: Session, days: set[date], today: date) -> None:
+    """Create the daily partitions `days` (plus the next few) need, and once
+    per UTC day drop the ones older than TICK_MINUTE_RETENTION_DAYS."""
+    global _partitions_checked_on
+
+    wanted = set(days)
+    wanted.update(today + timedelta(days=i) for i in range(PARTITIONS_AHEAD_DAYS + 1))
+    for day in sorted(wanted):
+        session.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{_partition_name(day)}" '
+                'PARTITION OF "tick_minute" '
+                f"FOR VALUES FROM ('{day.isoformat()} 00:00:00+00') "
+                f"TO ('{(day + timedelta(days=1)).isoformat()} 00:00:00+00')"
+            )
+        )
+
+    if _partitions_checked_on == today:
+        return
+
+    cutoff = _partition_name(today - timedelta(days=get_config().tick_minute_retention_days))
+    children = session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'tick_minute'"
+        )
+    ).scalars()
+    for name in children:
+        # Names share a fixed-width date suffix, so string order is date order.
+        if name.startswith("tick_minute_p") and name < cutoff:
+            session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            logger.info("Dropped expired tick partition %s", name)
+    _partitions_checked_on = today
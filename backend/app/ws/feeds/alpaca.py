@@ -26,6 +26,7 @@ from app.services.alpaca_rest import (
     AlpacaTickerNotFound,
     fetch_snapshot,
 )
+from app.services.quote_cache import read_quote_field
 from app.ws.feeds.base import BaseFeed
 
 if TYPE_CHECKING:
@@ -280,17 +281,12 @@ class AlpacaFeed(BaseFeed):
             return
 
         redis = await self._redis()
-        previous_close = await redis.hget(f"quote:{ticker}", "previous_close")
+        prev = await read_quote_field(ticker, "previous_close", redis=redis)
         change = None
         change_percent = None
-        if previous_close:
-            try:
-                prev = float(previous_close)
-                if prev > 0:
-                    change = round(price - prev, 4)
-                    change_percent = round((change / prev) * 100, 4)
-            except ValueError:
-                pass
+        if prev is not None and prev > 0:
+            change = round(price - prev, 4)
+            change_percent = round((change / prev) * 100, 4)
 
         await self._publish_quote(ticker, {
             "price": price,
@@ -299,6 +295,7 @@ class AlpacaFeed(BaseFeed):
             "timestamp": int(time.time()),
             "source": "alpaca_ws",
         })
+        await self._record_tick(ticker, price, msg.get("s"))
 
     async def _handle_quote_tick(self, msg: dict) -> None:
         ticker = msg.get("S", "")
@@ -4,7 +4,10 @@ import asyncio
 import logging
 from abc import ABC, abstractmethod
 
+from app.config import get_config
 from app.db.redis import RedisClient, get_redis
+from app.services.quote_cache import merge_quote_fields
+from app.services.tick_history import append_tick
 from app.ws.manager import ConnectionManager
 
 logger = logging.getLogger(__name__)
@@ -15,6 +18,10 @@ class BaseFeed(ABC):
         self._manager = manager
         self._running = False
         self._tasks: list[asyncio.Task] = []
+        # Read once: `_record_tick` runs on every trade.
+        config = get_config()
+        self._tick_history_enabled = config.tick_history_enabled
+        self._tick_stream_maxlen = config.tick_stream_maxlen
 
     @property
     def running(self) -> bool:
@@ -43,16 +50,24 @@ class BaseFeed(ABC):
     async def _redis(self) -> RedisClient:
         return await get_redis()
 
-    async def _cache_fields(self, ticker: str, fields: dict[str, str]) -> None:
-        if not fields:
-            return
+    async def _cache_fields(self, ticker: str, fields: dict) -> None:
         redis = await self._redis()
-        await redis.hset(f"quote:{ticker}", mapping=fields)
+        await merge_quote_fields(ticker, fields, redis=redis)
 
     async def _publish_quote(self, ticker: str, quote: dict) -> None:
-        fields = {k: str(v) for k, v in quote.items() if v is not None}
-        await self._cache_fields(ticker, fields)
+        await self._cache_fields(ticker, quote)
 
         redis = await self._redis()
         await redis.sadd("quotes:dirty", ticker)
         await self._manager.broadcast(ticker, quote)
+
+    async def _record_tick(
+        self, ticker: str, price: float, size: float | None = None
+    ) -> None:
+        """Append a trade to the ticker's capped Redis tick stream."""
+        if not self._tick_history_enabled:
+            return
+        redis = await self._redis()
+        await append_tick(
+            redis, ticker, price, size, maxlen=self._tick_stream_maxlen
+        )
@@ -78,5 +78,6 @@ class MockFeed(BaseFeed):
                     "source": "mock",
                 }
                 await self._publish_quote(ticker, quote)
+                await self._record_tick(ticker, next_price, random.randint(1, 500))
 
             await asyncio.sleep(1)
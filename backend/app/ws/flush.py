@@ -1,42 +1,152 @@
-"""Background task that flushes dirty Redis quotes to Postgres periodically."""
+"""Background task that flushes dirty Redis quotes to Postgres periodically.
+
+Each flush compares the dirty tickers against a digest of the values it last
+persisted and only upserts rows that actually changed, so a quiet ticker that
+keeps getting marked dirty by bid/ask ticks doesn't churn dead tuples and WAL.
+An unchanged row is still rewritten once its persisted timestamp is older than
+half the quote staleness window, which keeps the Postgres warm-cache layer in
+`resolve_quote` usable when Redis is unavailable. That refresh age is
+stretched to REFRESH_AFTER_FLUSHES flush intervals when the interval has
+grown past it, but never beyond the staleness window minus one interval: a
+skipped row must still be rewritten before the warm cache would reject it.
+
+The sleep between flushes adapts to load: a large dirty set shortens it so
+batches stay small, an empty one lengthens it, and slow Postgres writes back
+it off. Otherwise it drifts back toward QUOTE_FLUSH_INTERVAL. While quotes
+are ticking it is kept to a 1/(REFRESH_AFTER_FLUSHES + 1) share of the
+staleness window, so an unchanged row can be skipped at least once and still
+be refreshed in time.
+"""
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Callable
-from typing import TypeVar
+import math
+import time
+from dataclasses import dataclass
 
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.config import get_config
+from app.config import Config, get_config
 from app.db.redis import RedisClient, get_redis
 from app.db.session import get_session_factory
 from app.db.models import Quote
+from app.services.quote_cache import read_quote_fields
 
 logger = logging.getLogger(__name__)
 
-NumberT = TypeVar("NumberT", int, float)
+# Columns compared against the last persisted digest. `timestamp` is left out
+# on purpose: every tick bumps it, so including it would make every dirty row
+# look changed. Staleness of the persisted timestamp is handled separately.
+DIGEST_FIELDS = (
+    "price",
+    "bid_price",
+    "ask_price",
+    "change",
+    "change_percent",
+    "source",
+)
+
+# Dirty-set size at or above which the next flush is pulled in.
+HIGH_DIRTY_COUNT = 200
+# Postgres upsert latency at or above which the next flush is pushed out.
+SLOW_WRITE_SECONDS = 1.0
+# Minimum age, in flush intervals, before an unchanged row is rewritten.
+REFRESH_AFTER_FLUSHES = 2
+
+# ticker -> (digest of persisted values, persisted timestamp)
+_last_flushed: dict[str, tuple[tuple, int | None]] = {}
+
+
+@dataclass
+class FlushResult:
+    dirty: int = 0
+    written: int = 0
+    skipped: int = 0
+    write_seconds: float = 0.0
+
+
+@dataclass
+class FlushStats:
+    """Cumulative counters since process start, exposed via /health/quote-flush."""
+
+    flushes: int = 0
+    rows_written: int = 0
+    rows_skipped: int = 0
+    last_interval_seconds: float = 0.0
+    last_write_seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        considered = self.rows_written + self.rows_skipped
+        return {
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "rows_skipped": self.rows_skipped,
+            "skip_ratio": round(self.rows_skipped / considered, 4) if considered else 0.0,
+            "last_interval_seconds": self.last_interval_seconds,
+            "last_write_seconds": round(self.last_write_seconds, 4),
+        }
+
+
+_stats = FlushStats()
+
+
+def get_flush_stats() -> FlushStats:
+    return _stats
 
 
 async def flush_quotes_loop() -> None:
     """Run forever, flushing dirty quotes from Redis to Postgres."""
     config = get_config()
-    interval = config.quote_flush_interval
+    interval = float(config.quote_flush_interval)
 
     while True:
         try:
+            _stats.last_interval_seconds = interval
             await asyncio.sleep(interval)
-            await flush_once()
+            result = await flush_once(interval)
+            interval = next_flush_interval(interval, result, config)
         except asyncio.CancelledError:
             break
         except Exception:
             logger.exception("Quote flush error")
 
 
-async def flush_once() -> None:
-    """Flush all dirty quotes from Redis to Postgres in one batch."""
+def next_flush_interval(current: float, result: FlushResult, config: Config) -> float:
+    """Pick the sleep before the next flush from the last flush's outcome.
+
+    Slow writes win over a large dirty set: flushing more often into a
+    Postgres that is already struggling only makes the backlog worse.
+    """
+    base = float(config.quote_flush_interval)
+    lower = float(min(config.quote_flush_min_interval, base))
+    upper = float(max(config.quote_flush_max_interval, base))
+
+    if result.write_seconds >= SLOW_WRITE_SECONDS:
+        nxt = current * 2
+    elif result.dirty >= HIGH_DIRTY_COUNT:
+        nxt = current / 2
+    elif result.dirty == 0:
+        nxt = current * 1.5
+    else:
+        nxt = current + (base - current) / 2
+    if result.dirty and result.write_seconds < SLOW_WRITE_SECONDS:
+        # Quotes are ticking: flush often enough to refresh unchanged rows
+        # inside the staleness window (see flush_once).
+        upper = min(
+            upper, config.quote_staleness_seconds / (REFRESH_AFTER_FLUSHES + 1)
+        )
+    return max(lower, min(upper, nxt))
+
+
+async def flush_once(interval: float = 0.0) -> FlushResult:
+    """Flush all changed dirty quotes from Redis to Postgres in one batch.
+
+    `interval` is the current sleep between flushes; see REFRESH_AFTER_FLUSHES.
+    """
     redis: RedisClient = await get_redis()
+    result = FlushResult()
 
     # pop all dirty tickers atomically
     dirty: set[str] = set()
@@ -47,34 +157,69 @@ async def flush_once() -> None:
         if isinstance(popped, str):
             dirty.add(popped)
 
+    result.dirty = len(dirty)
     if not dirty:
-        return
+        return result
+
+    config = get_config()
+    staleness = config.quote_staleness_seconds
+    refresh_after = max(
+        1,
+        min(
+            max(staleness // 2, int(REFRESH_AFTER_FLUSHES * interval)),
+            staleness - math.ceil(interval),
+        ),
+    )
 
     rows: list[dict] = []
     for ticker in dirty:
-        data = await redis.hgetall(f"quote:{ticker}")
+        data = await read_quote_fields(ticker, redis=redis)
         if not data:
             continue
 
-        rows.append(
-            {
-                "ticker": ticker,
-                "price": _parse_number(data.get("price"), float),
-                "bid_price": _parse_number(data.get("bid_price"), float),
-                "ask_price": _parse_number(data.get("ask_price"), float),
-                "change": _parse_number(data.get("change"), float),
-                "change_percent": _parse_number(data.get("change_percent"), float),
-                "timestamp": _parse_number(
-                    data.get("timestamp"), lambda v: int(float(v))
-                ),
-                "source": data.get("source", "mock"),
-            }
-        )
+        row = {
+            "ticker": ticker,
+            "price": data.get("price"),
+            "bid_price": data.get("bid_price"),
+            "ask_price": data.get("ask_price"),
+            "change": data.get("change"),
+            "change_percent": data.get("change_percent"),
+            "timestamp": data.get("timestamp"),
+            "source": data.get("source", "mock"),
+        }
+        if _is_unchanged(row, refresh_after):
+            result.skipped += 1
+            continue
+        rows.append(row)
+
+    _stats.flushes += 1
+    _stats.rows_skipped += result.skipped
 
     if not rows:
-        return
+        logger.debug("Quote flush: %d dirty, all unchanged", result.dirty)
+        return result
 
     # upsert into Postgres quote table
+    started = time.perf_counter()
+    ok = _write_rows(rows)
+    result.write_seconds = time.perf_counter() - started
+    _stats.last_write_seconds = result.write_seconds
+
+    if ok:
+        for row in rows:
+            _last_flushed[row["ticker"]] = (_digest(row), row["timestamp"])
+        result.written = len(rows)
+        _stats.rows_written += result.written
+        logger.info(
+            "Flushed %d quotes to Postgres (%d unchanged skipped, %.3fs)",
+            result.written,
+            result.skipped,
+            result.write_seconds,
+        )
+    return result
+
+
+def _write_rows(rows: list[dict]) -> bool:
     session = get_session_factory()()
     try:
         stmt = pg_insert(Quote).values(rows)
@@ -92,18 +237,29 @@ async def flush_once() -> None:
         )
         session.execute(stmt)
         session.commit()
-        logger.info("Flushed %d quotes to Postgres", len(rows))
+        return True
     except Exception:
         session.rollback()
         logger.exception("Failed to flush quotes")
+        return False
     finally:
         session.close()
 
 
-def _parse_number(value: str | None, cast: Callable[[str], NumberT]) -> NumberT | None:
-    if value in (None, ""):
-        return None
-    try:
-        return cast(value)
-    except (TypeError, ValueError):
-        return None
+def _digest(row: dict) -> tuple:
+    return tuple(row.get(field) for field in DIGEST_FIELDS)
+
+
+def _is_unchanged(row: dict, refresh_after: int) -> bool:
+    """True when `row` matches what was last persisted and that write is
+    still recent enough for the Postgres layer to serve."""
+    previous = _last_flushed.get(row["ticker"])
+    if previous is None:
+        return False
+    digest, persisted_ts = previous
+    if digest != _digest(row):
+        return False
+    current_ts = row["timestamp"]
+    if current_ts is None or persisted_ts is None:
+        return current_ts == persisted_ts
+    return current_ts - persisted_ts < refresh_after
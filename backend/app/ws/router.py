@@ -133,7 +133,7 @@ async def _send_snapshot(
     for ticker, cached in zip(fetch, cached_quotes):
         if cached is None:
             continue
-        data = {k: v for k, v in cached.model_dump().items() if v is not None}
+        data = cached.as_dict(skip_none=True)
         if data:
             await _send(ws, {"type": "quote", "ticker": ticker, "data": data})
 
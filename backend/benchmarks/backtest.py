@@ -0,0 +1,138 @@
+"""Benchmark: the per-day reference backtest loop vs the vectorized core.
+
+Run from backend/:
+
+    python -m benchmarks.backtest [--symbols 20] [--years 10] [--reference-years 1]
+
+Seeds an in-memory SQLite daily_bar with `--symbols` random walks of
+`--years` x 252 sessions and times an EMA-crossover `run_backtest` over the
+whole range, split into loading the bars and simulating them, and the same
+simulation in the float64 exploration mode. The reference loop re-evaluates
+every symbol's full history on each date, so it is quadratic in history
+length and is timed over `--reference-years` only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.db.models import DailyBar
+from app.services.strategy_engine import (
+    backtest_history_start,
+    load_backtest_bars,
+    run_backtest,
+    simulate_backtest,
+    simulate_backtest_float64,
+)
+from tests.backtest_reference import reference_run_backtest
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_symbol,
+)
+
+FIRST_DAY = date(2014, 1, 1)
+PARAMS = {"fast_period": 10, "slow_period": 30, "order_quantity": "5"}
+RISK = {"max_position_quantity": "50", "max_daily_orders": 10}
+
+
+def _seed(db, symbols: list[str], sessions: int) -> None:
+    rng = random.Random(0)
+    for symbol in symbols:
+        seed_symbol(db, symbol)
+        price = rng.uniform(20, 200)
+        rows = []
+        for i in range(sessions):
+            price = max(1.0, price + rng.gauss(0, price * 0.02))
+            rows.append(
+                {
+                    "ticker": symbol,
+                    "date": FIRST_DAY + timedelta(days=i),
+                    "open": price,
+                    "high": price + 1,
+                    "low": price - 1,
+                    "close": price,
+                    "volume": 1_000_000.0,
+                }
+            )
+        db.bulk_insert_mappings(DailyBar, rows)
+    db.commit()
+
+
+def _best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time(), timezone.utc)
+
+
+def _kwargs(db, symbols: list[str], sessions: int) -> dict:
+    return dict(
+        db=db,
+        strategy_type="ema_crossover",
+        symbols=symbols,
+        timeframe="1Day",
+        params_json=PARAMS,
+        risk_json=RISK,
+        capital_allocation=Decimal("100000"),
+        start=_midnight(FIRST_DAY + timedelta(days=60)),
+        end=_midnight(FIRST_DAY + timedelta(days=sessions - 1)),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--reference-years", type=int, default=1)
+    args = parser.parse_args()
+
+    symbols = [f"S{i:03d}" for i in range(args.symbols)]
+    sessions = args.years * 252
+    db = make_session_factory(make_test_engine())()
+    _seed(db, symbols, sessions)
+
+    kwargs = _kwargs(db, symbols, sessions)
+    start, end = kwargs["start"].date(), kwargs["end"].date()
+    history_start = backtest_history_start("ema_crossover", PARAMS, RISK, start)
+    bars = load_backtest_bars(db, symbols, history_start, end)
+
+    trades = len(run_backtest(**kwargs)["trades"])
+    full_ms = _best_ms(lambda: run_backtest(**kwargs))
+    load_ms = _best_ms(lambda: load_backtest_bars(db, symbols, history_start, end))
+    sim_kwargs = dict(
+        strategy_type="ema_crossover",
+        params_json=PARAMS,
+        risk_json=RISK,
+        capital_allocation=kwargs["capital_allocation"],
+        start=start,
+    )
+    sim_ms = _best_ms(lambda: simulate_backtest(bars, **sim_kwargs))
+    float_ms = _best_ms(lambda: simulate_backtest_float64(bars, **sim_kwargs))
+
+    ref_kwargs = _kwargs(db, symbols, args.reference_years * 252)
+    ref_ms = _best_ms(lambda: reference_run_backtest(**ref_kwargs), repeat=1)
+    new_ref_ms = _best_ms(lambda: run_backtest(**ref_kwargs))
+
+    print(f"{args.symbols} symbols x {sessions} sessions, {trades} trades")
+    print(f"{'run_backtest':<36}{full_ms:>10.1f} ms")
+    print(f"{'  load_backtest_bars':<36}{load_ms:>10.1f} ms")
+    print(f"{'  simulate_backtest':<36}{sim_ms:>10.1f} ms")
+    print(f"{'simulate_backtest_float64':<36}{float_ms:>10.1f} ms")
+    print(f"over {args.reference_years} year(s):")
+    print(f"{'reference per-day loop':<36}{ref_ms:>10.1f} ms")
+    print(f"{'run_backtest':<36}{new_ref_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
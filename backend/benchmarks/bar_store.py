@@ -0,0 +1,97 @@
+"""Benchmark: loading daily bars through the ORM vs the memory-mapped bar store.
+
+Run from backend/:
+
+    python -m benchmarks.bar_store [--tickers 200] [--years 10]
+
+Seeds an in-memory SQLite daily_bar with `--tickers` x `--years` of
+sessions, builds the `.npy` store in a temp directory, and times loading
+every ticker's full history both ways.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.db.models import DailyBar
+from app.services.bar_store import get_bars_many, refresh_bar_store
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_symbol,
+)
+
+
+def _seed(db, tickers: list[str], sessions: int) -> None:
+    first = date(2015, 1, 1)
+    for ticker in tickers:
+        seed_symbol(db, ticker)
+        db.bulk_insert_mappings(
+            DailyBar,
+            [
+                {
+                    "ticker": ticker,
+                    "date": first + timedelta(days=i),
+                    "open": 100.0 + i,
+                    "high": 101.0 + i,
+                    "low": 99.0 + i,
+                    "close": 100.5 + i,
+                    "volume": 1_000_000.0,
+                    "trade_count": 1000,
+                    "vwap": 100.2 + i,
+                }
+                for i in range(sessions)
+            ],
+        )
+    db.commit()
+
+
+def _best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    db = make_session_factory(make_test_engine())()
+    _seed(db, tickers, args.years * 252)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_ms = _best_ms(lambda: refresh_bar_store(db, tickers, root=root), repeat=1)
+
+        def _orm() -> None:
+            for ticker in tickers:
+                rows = (
+                    db.query(DailyBar)
+                    .filter(DailyBar.ticker == ticker)
+                    .order_by(DailyBar.date)
+                    .all()
+                )
+                [row.close for row in rows]
+            db.expunge_all()
+
+        orm_ms = _best_ms(_orm, repeat=3)
+        store_ms = _best_ms(lambda: get_bars_many(tickers, root=root))
+
+    print(f"{args.tickers} tickers x {args.years * 252} sessions")
+    print(f"{'initial store build':<28}{build_ms:>10.1f} ms")
+    print(f"{'ORM load, all tickers':<28}{orm_ms:>10.1f} ms")
+    print(f"{'bar store, all tickers':<28}{store_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: ATR for a basket via the per-ticker loop vs one `bulk_atr` query.
+
+Run from backend/:
+
+    python -m benchmarks.bulk_atr [--tickers 500] [--sessions 300]
+
+Seeds an in-memory SQLite daily_bar with `--tickers` x `--sessions` bars and
+times computing the 14-period ATR of every ticker both ways. Postgres runs
+the same window-function query; SQLite just keeps the benchmark
+self-contained.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from app.db.models import DailyBar
+from app.services.atr import ATR_PERIODS, _atr_from_db_bars, _recent_bars, bulk_atr
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_symbol,
+)
+
+
+def _seed(db, tickers: list[str], sessions: int) -> None:
+    first = date(2024, 1, 1)
+    for t, ticker in enumerate(tickers):
+        seed_symbol(db, ticker)
+        db.bulk_insert_mappings(
+            DailyBar,
+            [
+                {
+                    "ticker": ticker,
+                    "date": first + timedelta(days=i),
+                    "open": 100.0 + i,
+                    "high": 101.0 + i + (i * t) % 7,
+                    "low": 99.0 + i - (i + t) % 5,
+                    "close": 100.5 + i,
+                    "volume": 1_000_000.0,
+                }
+                for i in range(sessions)
+            ],
+        )
+    db.commit()
+
+
+def _best_ms(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=300)
+    args = parser.parse_args()
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    db = make_session_factory(make_test_engine())()
+    _seed(db, tickers, args.sessions)
+
+    def _loop() -> None:
+        for ticker in tickers:
+            _atr_from_db_bars(_recent_bars(db, ticker, ATR_PERIODS), ATR_PERIODS)
+        db.expunge_all()
+
+    loop_ms = _best_ms(_loop, repeat=3)
+    today = date(2024, 1, 1) + timedelta(days=args.sessions - 1)
+    assert len(bulk_atr(db, tickers, today=today)) == len(tickers)
+    bulk_ms = _best_ms(lambda: bulk_atr(db, tickers, today=today))
+
+    print(f"{args.tickers} tickers x {args.sessions} sessions, ATR({ATR_PERIODS})")
+    print(f"{'per-ticker loop':<28}{loop_ms:>10.1f} ms")
+    print(f"{'bulk_atr, one query':<28}{bulk_ms:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
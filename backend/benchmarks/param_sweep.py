@@ -0,0 +1,111 @@
+"""Benchmark: sequential run_backtest calls vs one pooled parameter sweep.
+
+Run from backend/:
+
+    python -m benchmarks.param_sweep [--symbols 20] [--years 5] [--workers 0]
+        [--precision decimal|float64]
+
+Seeds an in-memory SQLite daily_bar, writes the bar store to a temporary
+directory, and times an EMA-crossover grid of fast x slow periods (about
+300 combinations) through `run_param_sweep` against a handful of
+sequential `run_backtest` calls, which is what tuning by resubmitting
+`/strategies/backtest` costs. `--workers 0` uses one process per CPU.
+`--precision float64` sweeps with the float64 simulator.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from app.services.backtest_sweep import (
+    SIMULATION_PRECISIONS,
+    expand_param_grid,
+    run_param_sweep,
+    shutdown_sweep_pool,
+)
+from app.services.bar_store import refresh_bar_store
+from app.services.strategy_engine import run_backtest
+from benchmarks.backtest import FIRST_DAY, RISK, _midnight, _seed
+from tests.integration_helpers import make_session_factory, make_test_engine
+
+GRID = {
+    "fast_period": {"start": 2, "stop": 30, "step": 2},
+    "slow_period": {"start": 20, "stop": 115, "step": 5},
+}
+SEQUENTIAL_RUNS = 5
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument(
+        "--precision", choices=SIMULATION_PRECISIONS, default="decimal"
+    )
+    args = parser.parse_args()
+
+    os.environ["BAR_STORE_DIR"] = tempfile.mkdtemp(prefix="bar_store_")
+    os.environ["BACKTEST_SWEEP_WORKERS"] = str(args.workers)
+    symbols = [f"S{i:03d}" for i in range(args.symbols)]
+    sessions = args.years * 252
+    db = make_session_factory(make_test_engine())()
+    _seed(db, symbols, sessions)
+    refresh_bar_store(db, symbols)
+
+    start = FIRST_DAY + timedelta(days=120)
+    end = FIRST_DAY + timedelta(days=sessions - 1)
+    combinations = expand_param_grid({"order_quantity": "5"}, GRID)
+    capital = Decimal("100000")
+
+    started = time.perf_counter()
+    for params in combinations[:SEQUENTIAL_RUNS]:
+        run_backtest(
+            db=db,
+            strategy_type="ema_crossover",
+            symbols=symbols,
+            timeframe="1Day",
+            params_json=params,
+            risk_json=RISK,
+            capital_allocation=capital,
+            start=_midnight(start),
+            end=_midnight(end),
+        )
+    sequential_ms = (time.perf_counter() - started) * 1000
+
+    def _sweep() -> list:
+        return run_param_sweep(
+            symbols=symbols,
+            strategy_type="ema_crossover",
+            combinations=combinations,
+            risk_json=RISK,
+            capital_allocation=capital,
+            start=start,
+            end=end,
+            precision=args.precision,
+        )
+
+    try:
+        started = time.perf_counter()
+        _sweep()
+        cold_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        best = _sweep()[0]
+        warm_ms = (time.perf_counter() - started) * 1000
+    finally:
+        shutdown_sweep_pool()
+
+    print(f"{args.symbols} symbols x {sessions} sessions, {args.precision}")
+    print(f"{f'{SEQUENTIAL_RUNS} sequential run_backtest':<40}{sequential_ms:>10.1f} ms")
+    print(f"{f'sweep of {len(combinations)}, pool start-up':<40}{cold_ms:>10.1f} ms")
+    print(f"{f'sweep of {len(combinations)}, warm pool':<40}{warm_ms:>10.1f} ms")
+    print(f"best: {best.params_json} ending_equity={best.ending_equity}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Microbenchmark: QuoteRecord vs the pydantic QuoteData on the quote hot path.
+
+Run from backend/:
+
+    python -m benchmarks.quote_record [--n 200000]
+
+Reports the per-quote cost of building a quote from typed cache fields (what
+`read_redis` does on every hit) and of serialising it back to a dict (what the
+WS snapshot, Redis write and Postgres persist do).
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from app.schemas import QuoteData
+from app.services.quote_record import QuoteRecord
+
+FIELDS = {
+    "price": 190.25,
+    "bid_price": 190.2,
+    "bid_size": 300.0,
+    "ask_price": 190.3,
+    "ask_size": 200.0,
+    "open": 188.5,
+    "high": 191.0,
+    "low": 187.9,
+    "close": 190.1,
+    "volume": 1_234_567.0,
+    "trade_count": 8123,
+    "vwap": 189.7,
+    "previous_close": 188.0,
+    "change": 2.25,
+    "change_percent": 1.1968,
+    "source": "alpaca_ws",
+    "timestamp": 1_760_000_000,
+}
+
+
+def _per_quote_ns(stmt, n: int) -> float:
+    best = min(timeit.repeat(stmt, number=n, repeat=5))
+    return best / n * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=200_000)
+    n = parser.parse_args().n
+
+    model = QuoteData(ticker="AAPL", **FIELDS)
+    record = QuoteRecord.from_fields("AAPL", FIELDS)
+
+    rows = [
+        ("construct  QuoteData(**fields)", lambda: QuoteData(ticker="AAPL", **FIELDS)),
+        ("construct  QuoteData.model_construct", lambda: QuoteData.model_construct(ticker="AAPL", **FIELDS)),
+        ("construct  QuoteRecord.from_fields", lambda: QuoteRecord.from_fields("AAPL", FIELDS)),
+        ("serialise  QuoteData.model_dump", model.model_dump),
+        ("serialise  QuoteRecord.as_dict", record.as_dict),
+        ("serialise  model_dump(exclude_none)", lambda: model.model_dump(exclude_none=True)),
+        ("serialise  as_dict(skip_none)", lambda: record.as_dict(skip_none=True)),
+        ("boundary   QuoteRecord.to_quote_data", record.to_quote_data),
+    ]
+    print(f"{'operation':<40}{'ns/quote':>12}")
+    for label, stmt in rows:
+        print(f"{label:<40}{_per_quote_ns(stmt, n):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
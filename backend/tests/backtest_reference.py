@@ -0,0 +1,252 @@
+"""Reference backtest: the original per-day `run_backtest` loop.
+
+Kept verbatim as the oracle the vectorized core in
+`app/services/strategy_engine.py` is checked against (and timed against in
+`benchmarks/backtest.py`). It re-evaluates each symbol's whole history on
+every date, so it is quadratic in history length; don't use it elsewhere.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.db.models import DailyBar
+from app.services.strategy_engine import (
+    STRATEGY_TEMPLATE_MAP,
+    BacktestTrade,
+    _safe_decimal,
+    normalized_risk_config,
+    resolve_signal_order_quantity,
+)
+from app.services.strategy_signals import (
+    bars_required_for_signal,
+    evaluate_signal_from_bars,
+)
+
+
+def reference_run_backtest(
+    *,
+    db: Session,
+    strategy_type: str,
+    symbols: list[str],
+    timeframe: str,
+    params_json: dict,
+    risk_json: dict,
+    capital_allocation: Decimal,
+    start: datetime,
+    end: datetime,
+) -> dict:
+    if strategy_type not in STRATEGY_TEMPLATE_MAP or timeframe != "1Day":
+        return {
+            "equity_curve": [],
+            "drawdown_curve": [],
+            "trades": [],
+            "win_rate": 0.0,
+            "avg_return_per_trade": 0.0,
+            "max_drawdown": 0.0,
+            "ending_equity": str(capital_allocation),
+        }
+
+    order_quantity = _safe_decimal(params_json.get("order_quantity", "1"), "1")
+    risk = normalized_risk_config(risk_json)
+    lookback_days = max(
+        bars_required_for_signal(strategy_type, params_json),
+        int(risk["atr_period"]) + 1,
+    )
+    history_start = start.date() - timedelta(days=max(lookback_days * 3, 30))
+
+    bars_by_symbol: dict[str, list[DailyBar]] = {}
+    for symbol in symbols:
+        rows = (
+            db.query(DailyBar)
+            .filter(
+                DailyBar.ticker == symbol,
+                DailyBar.date >= history_start,
+                DailyBar.date <= end.date(),
+            )
+            .order_by(DailyBar.date.asc())
+            .all()
+        )
+        bars_by_symbol[symbol] = rows
+
+    in_range_dates = sorted(
+        {
+            row.date
+            for rows in bars_by_symbol.values()
+            for row in rows
+            if row.date >= start.date()
+        }
+    )
+    if not in_range_dates:
+        return {
+            "equity_curve": [],
+            "drawdown_curve": [],
+            "trades": [],
+            "win_rate": 0.0,
+            "avg_return_per_trade": 0.0,
+            "max_drawdown": 0.0,
+            "ending_equity": str(capital_allocation),
+        }
+
+    cash = capital_allocation
+    position_qty: dict[str, Decimal] = {symbol: Decimal("0") for symbol in symbols}
+    entry_price: dict[str, Decimal | None] = {symbol: None for symbol in symbols}
+    closed_trade_returns: list[Decimal] = []
+    trades: list[BacktestTrade] = []
+    equity_curve: list[dict] = []
+    drawdown_curve: list[dict] = []
+    peak_equity = capital_allocation
+
+    history_by_symbol: dict[str, list[DailyBar]] = {symbol: [] for symbol in symbols}
+
+    all_dates = sorted({row.date for rows in bars_by_symbol.values() for row in rows})
+
+    for date_value in all_dates:
+        day_order_count = 0
+        day_notional = Decimal("0")
+        for symbol, rows in bars_by_symbol.items():
+            row = next((r for r in rows if r.date == date_value), None)
+            if row is None:
+                continue
+            history_by_symbol[symbol].append(row)
+            if row.date < start.date():
+                continue
+            decision = evaluate_signal_from_bars(
+                strategy_type,
+                history_by_symbol[symbol],
+                params_json,
+            )
+            signal = decision.signal
+            if signal == "hold":
+                continue
+
+            price = Decimal(str(row.close))
+            if day_order_count >= risk["max_daily_orders"]:
+                continue
+
+            atr_value = _atr_from_rows(history_by_symbol[symbol], risk["atr_period"])
+
+            if signal == "buy":
+                available_qty, reason = resolve_signal_order_quantity(
+                    signal=signal,
+                    requested_quantity=order_quantity,
+                    current_quantity=position_qty[symbol],
+                    price=price,
+                    capital_allocation=min(capital_allocation, cash),
+                    risk_json=risk,
+                    atr_value=atr_value,
+                )
+                if available_qty <= 0 or reason is not None:
+                    continue
+                notional = available_qty * price
+                if day_notional + notional > risk["max_daily_notional"]:
+                    continue
+                cash -= notional
+                day_notional += notional
+                day_order_count += 1
+                if entry_price[symbol] is None:
+                    entry_price[symbol] = price
+                else:
+                    current_qty = position_qty[symbol]
+                    assert current_qty > 0
+                    entry_price[symbol] = (
+                        (entry_price[symbol] * current_qty + price * available_qty)
+                        / (current_qty + available_qty)
+                    )
+                position_qty[symbol] += available_qty
+                trades.append(
+                    BacktestTrade(
+                        ticker=symbol,
+                        side="buy",
+                        quantity=available_qty,
+                        price=price,
+                        timestamp=datetime.combine(date_value, time.min, tzinfo=timezone.utc),
+                    )
+                )
+            elif signal == "sell" and position_qty[symbol] > 0:
+                qty, reason = resolve_signal_order_quantity(
+                    signal=signal,
+                    requested_quantity=order_quantity,
+                    current_quantity=position_qty[symbol],
+                    price=price,
+                    capital_allocation=capital_allocation,
+                    risk_json=risk,
+                    atr_value=atr_value,
+                )
+                if qty <= 0 or reason is not None:
+                    continue
+                avg_entry = entry_price[symbol] or price
+                pnl = (price - avg_entry) * qty
+                cash += qty * price
+                position_qty[symbol] -= qty
+                if position_qty[symbol] <= 0:
+                    position_qty[symbol] = Decimal("0")
+                    entry_price[symbol] = None
+                closed_trade_returns.append(
+                    pnl / (avg_entry * qty) if avg_entry > 0 else Decimal("0")
+                )
+                day_notional += qty * price
+                day_order_count += 1
+                trades.append(
+                    BacktestTrade(
+                        ticker=symbol,
+                        side="sell",
+                        quantity=qty,
+                        price=price,
+                        timestamp=datetime.combine(date_value, time.min, tzinfo=timezone.utc),
+                        profit=pnl,
+                    )
+                )
+
+        if date_value < start.date():
+            continue
+
+        equity = cash
+        for symbol, qty in position_qty.items():
+            if qty <= 0:
+                continue
+            rows = bars_by_symbol[symbol]
+            row = next((r for r in reversed(rows) if r.date <= date_value), None)
+            if row is not None:
+                equity += qty * Decimal(str(row.close))
+
+        peak_equity = max(peak_equity, equity)
+        drawdown = Decimal("0")
+        if peak_equity > 0:
+            drawdown = (equity - peak_equity) / peak_equity
+
+        ts = int(datetime.combine(date_value, time.min, tzinfo=timezone.utc).timestamp())
+        equity_curve.append({"time": ts, "equity": equity, "drawdown": drawdown})
+        drawdown_curve.append({"time": ts, "equity": equity, "drawdown": drawdown})
+
+    win_rate = 0.0
+    avg_return = 0.0
+    if closed_trade_returns:
+        wins = sum(1 for value in closed_trade_returns if value > 0)
+        win_rate = wins / len(closed_trade_returns)
+        avg_return = float(sum(closed_trade_returns) / len(closed_trade_returns))
+
+    return {
+        "equity_curve": equity_curve,
+        "drawdown_curve": drawdown_curve,
+        "trades": trades,
+        "win_rate": win_rate,
+        "avg_return_per_trade": avg_return,
+        "max_drawdown": float(min((p["drawdown"] for p in drawdown_curve), default=Decimal("0"))),
+        "ending_equity": str(equity_curve[-1]["equity"] if equity_curve else capital_allocation),
+    }
+
+
+def _atr_from_rows(rows: list[DailyBar], period: int) -> Decimal:
+    if period <= 0 or len(rows) < period + 1:
+        return Decimal("0")
+    true_ranges: list[Decimal] = []
+    for previous, current in zip(rows[:-1], rows[1:]):
+        prev_close = Decimal(str(previous.close))
+        high = Decimal(str(current.high))
+        low = Decimal(str(current.low))
+        true_ranges.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+    return sum(true_ranges[-period:], Decimal("0")) / Decimal(period)
@@ -28,3 +28,67 @@ def _isolate_redis_from_dev_cache(monkeypatch):
         return None
 
     monkeypatch.setattr("app.services.quote_cache.read_redis", _miss)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_bar_store(monkeypatch, tmp_path):
+    """Keep daily backfills in tests from writing `.npy` files into the
+    working tree's BAR_STORE_DIR."""
+    monkeypatch.setenv("BAR_STORE_DIR", str(tmp_path / "bar_store"))
+
+
+@pytest.fixture(autouse=True)
+def _isolate_bar_stats(monkeypatch):
+    """Start every test with an empty local bar stats tier and keep the Redis
+    tier out of reach, for the same reason as `_isolate_redis_from_dev_cache`."""
+    from app.services import bar_stats
+
+    async def _miss(_ticker):
+        return None
+
+    async def _noop(*_args):
+        return None
+
+    monkeypatch.setattr(bar_stats, "_local", {})
+    monkeypatch.setattr(bar_stats, "read_redis", _miss)
+    monkeypatch.setattr(bar_stats, "write_redis", _noop)
+    monkeypatch.setattr(bar_stats, "delete_redis", _noop)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_backtest_cache(monkeypatch):
+    """Start every test with an empty local backtest cache and no Redis tier."""
+    from collections import OrderedDict
+
+    from app.services import backtest_cache
+
+    async def _miss(_key):
+        return None
+
+    async def _noop(*_args):
+        return None
+
+    monkeypatch.setattr(backtest_cache, "_local", OrderedDict())
+    monkeypatch.setattr(backtest_cache, "read_redis", _miss)
+    monkeypatch.setattr(backtest_cache, "write_redis", _noop)
+
+
+@pytest.fixture(autouse=True)
+def _isolate_backtest_jobs():
+    """Give every test a fresh backtest job manager bound to its own loop."""
+    from app.services import backtest_jobs
+
+    backtest_jobs._reset_for_tests()
+    yield
+    backtest_jobs.shutdown_backtest_jobs()
+    backtest_jobs._reset_for_tests()
+
+
+@pytest.fixture(autouse=True)
+def _isolate_quote_format():
+    """Re-resolve QUOTE_REDIS_FORMAT per test, since it is cached on first use."""
+    from app.services import quote_cache
+
+    quote_cache._reset_for_tests()
+    yield
+    quote_cache._reset_for_tests()
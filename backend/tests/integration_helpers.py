@@ -16,9 +16,10 @@ Why SQLite, not the real Postgres test DB?
   on lock contention. For genuine concurrency tests see test_orders_router_loop.
 """
 
+import random
 import time
 from contextlib import contextmanager
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 
 from sqlalchemy import create_engine
@@ -243,6 +244,43 @@ def seed_daily_bar(
     return bar
 
 
+def seed_bar_universe(
+    db: Session,
+    symbols: list[str],
+    *,
+    first_day: date = date(2024, 1, 1),
+    days: int,
+    seed: int | None = None,
+) -> None:
+    """Seed `symbols` plus one bar per calendar day for each.
+
+    Closes follow a fixed saw-tooth around 50, or a random walk from
+    `random.Random(seed)` when a seed is given. Bars span close +/- 1.
+    """
+    rng = random.Random(seed) if seed is not None else None
+    for symbol in symbols:
+        seed_symbol(db, symbol)
+        price = rng.uniform(20, 200) if rng else 0.0
+        for i in range(days):
+            if rng:
+                price = max(1.0, price + rng.gauss(0, price * 0.03))
+                close = round(price, 2)
+            else:
+                close = 50 + (i * 7 % 13) - (i % 5)
+            db.add(
+                DailyBar(
+                    ticker=symbol,
+                    date=first_day + timedelta(days=i),
+                    open=close,
+                    high=close + 1,
+                    low=close - 1,
+                    close=close,
+                    volume=1_000_000,
+                )
+            )
+    db.commit()
+
+
 def seed_transaction(
     db: Session,
     account_id: int,
@@ -1,5 +1,6 @@
 from unittest.mock import AsyncMock, MagicMock
 
+from app.ws.feeds import base as base_mod
 from app.ws.feeds.alpaca import AlpacaFeed
 
 
@@ -18,6 +19,7 @@ def make_feed() -> AlpacaFeed:
     redis.hset = AsyncMock()
     redis.hget = AsyncMock(return_value=None)
     redis.sadd = AsyncMock()
+    redis.xadd = AsyncMock()
     feed._redis = AsyncMock(return_value=redis)
     return feed
 
@@ -67,3 +69,28 @@ class TestHandleTrade:
         assert ticker == "BTC/USD"
         assert payload["price"] == 77500.0
         assert payload["source"] == "alpaca_ws"
+
+    async def test_trade_appends_to_tick_stream(self):
+        feed = make_feed()
+        await feed._handle_trade({"S": "AAPL", "p": 190.25, "s": 100})
+
+        redis = await feed._redis()
+        redis.xadd.assert_awaited_once()
+        name, fields = redis.xadd.await_args.args
+        assert name == "ticks:AAPL"
+        assert fields == {"p": "190.25", "s": "100"}
+        assert redis.xadd.await_args.kwargs["approximate"] is True
+
+    async def test_tick_settings_are_read_once_at_construction(self, monkeypatch):
+        monkeypatch.setenv("TICK_HISTORY_ENABLED", "false")
+        feed = make_feed()
+
+        def _unexpected():
+            raise AssertionError("get_config called on the tick path")
+
+        monkeypatch.setattr(base_mod, "get_config", _unexpected)
+        await feed._handle_trade({"S": "AAPL", "p": 190.25, "s": 100})
+
+        redis = await feed._redis()
+        redis.xadd.assert_not_awaited()
+        feed._manager.broadcast.assert_awaited_once()
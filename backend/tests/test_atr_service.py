@@ -1,13 +1,27 @@
 """Unit tests for the ATR computation service.
 
-Tests the pure computation helpers directly and mocks DB/Alpaca for the
-high-level compute_atr function.
+Tests the pure computation helpers directly, and runs the high-level
+compute_atr against an in-memory DB with the Alpaca backfill stubbed out.
 """
 
+import asyncio
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
 from decimal import Decimal
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
-from app.services.atr import _atr_from_db_bars, _atr_from_raw_bars, compute_atr
+import pytest
+
+from app.db.models import DailyBar
+from app.services import atr as atr_mod
+from app.services.atr import _atr_from_db_bars, atr_from_db, compute_atr
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_daily_bar,
+    seed_symbol,
+)
 
 
 def make_db_bar(high: float, low: float, close: float) -> MagicMock:
@@ -72,55 +86,234 @@ class TestAtrFromDbBars:
 
 
 # ---------------------------------------------------------------------------
-# _atr_from_raw_bars — same logic but raw Alpaca dict format
+# compute_atr — high-level with DB and Alpaca backfill
 # ---------------------------------------------------------------------------
 
 
-class TestAtrFromRawBars:
-    def test_raw_bars_produce_correct_atr(self):
-        raw = [
-            {"h": 100, "l": 98, "c": 100},
-            {"h": 110, "l": 95, "c": 105},
-        ]
-        result = _atr_from_raw_bars(raw, n=1)
-        assert result == Decimal("15")
+@pytest.fixture
+def session_factory(monkeypatch):
+    factory = make_session_factory(make_test_engine())
 
+    @contextmanager
+    def _session():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
 
-# ---------------------------------------------------------------------------
-# compute_atr — high-level with DB and Alpaca fallback
-# ---------------------------------------------------------------------------
+    monkeypatch.setattr(atr_mod, "db_session", _session)
+    return factory
+
+
+@pytest.fixture
+def backfill_calls(monkeypatch):
+    """Stub backfill that stores 15 bars with TR=10 and records each call."""
+    calls: list[list[str]] = []
+
+    async def _backfill(db, tickers, start, end):
+        calls.append(tickers)
+        await asyncio.sleep(0.01)
+        first = date.today() - timedelta(days=20)
+        for ticker in tickers:
+            for i in range(15):
+                seed_daily_bar(
+                    db,
+                    ticker,
+                    bar_date=first + timedelta(days=i),
+                    high=110.0 if i else 100.0,
+                    low=100.0 if i else 99.0,
+                    close=105.0 if i else 100.0,
+                )
+        return 15 * len(tickers)
+
+    monkeypatch.setattr(atr_mod, "backfill_daily_bars", _backfill)
+    return calls
 
 
 class TestComputeAtr:
-    def test_uses_db_bars_when_sufficient(self):
+    async def test_uses_db_bars_when_sufficient(self, backfill_calls):
         # 15 bars → enough for n=14 ATR
         # All bars: high=115, low=100, close=100 → prev_close always=100 → TR always=15
         # Mock returns newest-first (as DB would); compute_atr reverses them internally.
         bars = [make_db_bar(high=115, low=100, close=100)] * 15
         db = make_db_with_bars(bars)
 
-        result = compute_atr("AAPL", db, n=14)
+        result = await compute_atr("AAPL", db, n=14)
 
         assert result == Decimal("15")
+        assert backfill_calls == []
+
+    async def test_returns_zero_when_no_data_at_all(
+        self, session_factory, monkeypatch
+    ):
+        async def _backfill(db, tickers, start, end):
+            return 0
+
+        monkeypatch.setattr(atr_mod, "backfill_daily_bars", _backfill)
+        db = session_factory()
+        seed_symbol(db, "NEWCO")
+
+        assert await compute_atr("NEWCO", db, n=14) == Decimal("0")
+
+    async def test_backfills_db_when_insufficient(
+        self, session_factory, backfill_calls
+    ):
+        db = session_factory()
+        seed_symbol(db, "AAPL")
+        seed_daily_bar(db, "AAPL", bar_date=date.today() - timedelta(days=30))
+
+        # Backfill adds prev_close=100, then 14 bars with TR=10 each.
+        assert await compute_atr("AAPL", db, n=14) == Decimal("10")
+        assert backfill_calls == [["AAPL"]]
+        assert db.query(DailyBar).filter(DailyBar.ticker == "AAPL").count() == 16
+
+        # The bars were written back, so the next call doesn't fetch.
+        assert await compute_atr("AAPL", db, n=14) == Decimal("10")
+        assert backfill_calls == [["AAPL"]]
+
+    async def test_concurrent_misses_share_one_backfill(
+        self, session_factory, backfill_calls
+    ):
+        db = session_factory()
+        seed_symbol(db, "AAPL")
+        seed_symbol(db, "MSFT")
+
+        results = await asyncio.gather(
+            compute_atr("AAPL", session_factory(), n=14),
+            compute_atr("AAPL", session_factory(), n=14),
+            compute_atr("AAPL", session_factory(), n=14),
+            compute_atr("MSFT", session_factory(), n=14),
+        )
+
+        assert results == [Decimal("10")] * 4
+        assert sorted(backfill_calls) == [["AAPL"], ["MSFT"]]
+        assert atr_mod._inflight_backfills == {}
+
+    async def test_one_backfill_per_ticker_at_a_time(
+        self, session_factory, monkeypatch
+    ):
+        starts: list[str] = []
+        running: list[int] = []
+        overlapping: list[int] = []
+
+        async def _backfill(db, tickers, start, end):
+            # One bar per calendar day of the requested window, TR=10 each.
+            starts.append(start)
+            running.append(1)
+            overlapping.append(len(running))
+            await asyncio.sleep(0.01)
+            stored = {row.date for row in db.query(DailyBar.date)}
+            day = date.fromisoformat(start[:10])
+            while day < date.today():
+                if day not in stored:
+                    seed_daily_bar(db, tickers[0], bar_date=day, high=110.0, low=100.0)
+                day += timedelta(days=1)
+            running.pop()
+            return 0
+
+        monkeypatch.setattr(atr_mod, "backfill_daily_bars", _backfill)
+        seed_symbol(session_factory(), "AAPL")
+
+        # The longer window waits for the shorter one, then tops up.
+        short, long = await asyncio.gather(
+            compute_atr("AAPL", session_factory(), n=3),
+            compute_atr("AAPL", session_factory(), n=20),
+        )
+
+        assert (short, long) == (Decimal("10"), Decimal("10"))
+        assert len(starts) == 2
+        assert max(overlapping) == 1
+        assert atr_mod._inflight_backfills == {}
+
+    async def test_shorter_window_joins_a_longer_backfill(
+        self, session_factory, monkeypatch
+    ):
+        starts: list[str] = []
+
+        async def _backfill(db, tickers, start, end):
+            starts.append(start)
+            await asyncio.sleep(0.01)
+            day = date.fromisoformat(start[:10])
+            while day < date.today():
+                seed_daily_bar(db, tickers[0], bar_date=day, high=110.0, low=100.0)
+                day += timedelta(days=1)
+            return 0
+
+        monkeypatch.setattr(atr_mod, "backfill_daily_bars", _backfill)
+        seed_symbol(session_factory(), "AAPL")
+
+        results = await asyncio.gather(
+            compute_atr("AAPL", session_factory(), n=20),
+            compute_atr("AAPL", session_factory(), n=3),
+        )
+
+        assert results == [Decimal("10"), Decimal("10")]
+        assert len(starts) == 1
+        assert atr_mod._inflight_backfills == {}
+
+    async def test_backfill_failure_falls_back_to_zero(
+        self, session_factory, monkeypatch
+    ):
+        async def _backfill(db, tickers, start, end):
+            raise RuntimeError("alpaca down")
+
+        monkeypatch.setattr(atr_mod, "backfill_daily_bars", _backfill)
+        db = session_factory()
+
+        assert await compute_atr("AAPL", db, n=14) == Decimal("0")
+
+
+def test_atr_from_db_never_fetches(session_factory, backfill_calls):
+    db = session_factory()
+    seed_symbol(db, "AAPL")
+
+    assert atr_from_db("AAPL", db, n=14) == Decimal("0")
+    assert backfill_calls == []
+
+
+# ---------------------------------------------------------------------------
+# bulk_atr — one window-function query for a basket
+# ---------------------------------------------------------------------------
 
-    def test_returns_zero_when_no_data_at_all(self):
-        db = make_db_with_bars([])  # empty DB
 
-        with patch("app.services.atr._fetch_bars_sync", return_value=[]):
-            result = compute_atr("NEWCO", db, n=14)
+def test_bulk_atr_matches_per_ticker_computation():
+    db = make_session_factory(make_test_engine())()
+    rng = random.Random(3)
+    last = date(2024, 3, 1)
+    lengths = {"AAA": 40, "BBB": 15, "CCC": 14, "DDD": 60}
+    for ticker, length in lengths.items():
+        seed_symbol(db, ticker)
+        close = 100.0
+        for i in range(length):
+            low = close - rng.uniform(0, 3)
+            high = close + rng.uniform(0, 3)
+            # Gaps past the previous close exercise all three TR branches.
+            close = rng.uniform(low - 2, high + 2)
+            seed_daily_bar(
+                db,
+                ticker,
+                bar_date=last - timedelta(days=length - 1 - i),
+                high=max(high, close),
+                low=min(low, close),
+                close=close,
+            )
 
-        assert result == Decimal("0")
+    result = atr_mod.bulk_atr(db, [*lengths, "NONE"], n=14, today=last)
 
-    def test_falls_back_to_alpaca_when_db_insufficient(self):
-        # DB has only 5 bars — not enough for n=14
-        db = make_db_with_bars([make_db_bar(100, 99, 100)] * 5)
+    # CCC has only 14 bars (one short of n+1); NONE has none.
+    assert set(result) == {"AAA", "BBB", "DDD"}
+    for ticker, value in result.items():
+        expected = atr_mod._atr_from_db_bars(atr_mod._recent_bars(db, ticker, 14), 14)
+        assert float(value) == pytest.approx(float(expected), rel=1e-12)
+    assert atr_mod.bulk_atr(db, [], n=14) == {}
 
-        # Alpaca returns 15 bars: prev_close=100, then 14 bars with TR=10 each
-        raw = [{"h": 100, "l": 99, "c": 100}]
-        for _ in range(14):
-            raw.append({"h": 110, "l": 100, "c": 105})
 
-        with patch("app.services.atr._fetch_bars_sync", return_value=raw):
-            result = compute_atr("AAPL", db, n=14)
+def test_bulk_atr_ignores_tickers_without_recent_bars():
+    db = make_session_factory(make_test_engine())()
+    seed_symbol(db, "OLD")
+    for i in range(15):
+        seed_daily_bar(db, "OLD", bar_date=date(2024, 1, 1) + timedelta(days=i))
 
-        assert result == Decimal("10")
+    assert atr_mod.bulk_atr(db, ["OLD"], n=14, today=date(2024, 1, 15)) != {}
+    assert atr_mod.bulk_atr(db, ["OLD"], n=14, today=date(2024, 6, 1)) == {}
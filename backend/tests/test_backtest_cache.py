@@ -0,0 +1,142 @@
+"""Tests for the content-addressed backtest result cache."""
+
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.db.models import DailyBar
+from app.routers import strategies as strategies_router
+from app.routers.strategies import BacktestRequest, backtest_strategy
+from app.services import backtest_cache
+from app.services.backtest_cache import backtest_cache_key, data_stamps
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_bar_universe,
+    seed_daily_bar,
+)
+
+FIRST_DAY = date(2024, 1, 1)
+
+
+@pytest.fixture
+def db():
+    engine = make_test_engine()
+    session = make_session_factory(engine)()
+    seed_bar_universe(session, ["AAA", "BBB"], first_day=FIRST_DAY, days=120)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _request(**overrides) -> BacktestRequest:
+    fields = dict(
+        ticker="AAA",
+        symbols_json=["BBB"],
+        params_json={"fast_period": 3, "slow_period": 8, "order_quantity": "2"},
+        risk_json={"max_position_quantity": "20", "max_daily_orders": 3},
+        capital_allocation="5000",
+        start="2024-02-01T00:00:00Z",
+        end="2024-04-26T00:00:00Z",
+    )
+    return BacktestRequest(**{**fields, **overrides})
+
+
+@pytest.fixture
+def ensure(monkeypatch):
+    ensure = AsyncMock(return_value=[])
+    monkeypatch.setattr(
+        strategies_router, "_ensure_backtest_symbols_and_history", ensure
+    )
+    return ensure
+
+
+async def test_repeat_request_is_served_from_the_cache(db, ensure, monkeypatch):
+    first = await backtest_strategy(_request(), user={"sub": "dev"}, db=db)
+    assert ensure.await_count == 1
+
+    def _unexpected(**_kwargs):
+        raise AssertionError("run_backtest called on a cache hit")
+
+    monkeypatch.setattr(strategies_router, "run_backtest", _unexpected)
+    second = await backtest_strategy(_request(), user={"sub": "dev"}, db=db)
+
+    assert second == first
+    assert ensure.await_count == 1
+
+
+async def test_new_bars_invalidate_the_cached_result(db, ensure):
+    gap = date(2024, 4, 10)
+    db.query(DailyBar).filter_by(ticker="BBB", date=gap).delete()
+    db.commit()
+    await backtest_strategy(_request(), user={"sub": "dev"}, db=db)
+    seed_daily_bar(db, "BBB", bar_date=gap, close=60)
+
+    await backtest_strategy(_request(), user={"sub": "dev"}, db=db)
+
+    assert ensure.await_count == 2
+
+
+async def test_hit_waits_for_sessions_newer_than_the_stored_bars(
+    db, ensure, monkeypatch
+):
+    runs = []
+    engine = strategies_router.run_backtest
+
+    def _run(**kwargs):
+        runs.append(kwargs)
+        return engine(**kwargs)
+
+    monkeypatch.setattr(strategies_router, "run_backtest", _run)
+    # Bars stop on 2024-04-29; the sessions up to the end are not stored yet.
+    request = _request(end="2024-05-15T00:00:00Z")
+    first = await backtest_strategy(request, user={"sub": "dev"}, db=db)
+
+    # Nothing newer upstream: the history check runs, then the cache serves.
+    assert await backtest_strategy(request, user={"sub": "dev"}, db=db) == first
+    assert (ensure.await_count, len(runs)) == (2, 1)
+
+    # The check backfills a newer session, so the result is recomputed.
+    async def _backfill(*_args, **_kwargs):
+        seed_daily_bar(db, "BBB", bar_date=date(2024, 5, 1), close=60)
+        return []
+
+    ensure.side_effect = _backfill
+    await backtest_strategy(request, user={"sub": "dev"}, db=db)
+    assert (ensure.await_count, len(runs)) == (3, 2)
+
+
+async def test_different_requests_do_not_share_entries(db, ensure):
+    await backtest_strategy(_request(), user={"sub": "dev"}, db=db)
+    await backtest_strategy(
+        _request(capital_allocation="6000"), user={"sub": "dev"}, db=db
+    )
+    await backtest_strategy(
+        _request(ticker="BBB", symbols_json=["AAA"]), user={"sub": "dev"}, db=db
+    )
+
+    assert ensure.await_count == 3
+    assert len(backtest_cache._local) == 3
+
+
+def test_data_stamps_track_latest_date_and_count(db):
+    stamps = data_stamps(db, ["AAA", "BBB", "ZZZ"], FIRST_DAY, date(2024, 2, 29))
+
+    assert stamps == {"AAA": ["2024-02-29", 60], "BBB": ["2024-02-29", 60]}
+    key = backtest_cache_key({"a": 1}, stamps)
+    assert key == backtest_cache_key({"a": 1}, dict(reversed(stamps.items())))
+    assert key != backtest_cache_key({"a": 1}, {**stamps, "AAA": ["2024-02-29", 59]})
+
+
+def test_local_tier_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(backtest_cache, "BACKTEST_CACHE_LOCAL_MAX_ENTRIES", 2)
+    backtest_cache.put_local("a", "1")
+    backtest_cache.put_local("b", "2")
+    assert backtest_cache.get_local("a") == "1"
+
+    backtest_cache.put_local("c", "3")
+
+    assert backtest_cache.get_local("b") is None
+    assert backtest_cache.get_local("a") == "1"
+    assert backtest_cache.get_local("c") == "3"
@@ -0,0 +1,201 @@
+"""Tests for asynchronous backtest jobs and their endpoints."""
+
+import asyncio
+import json
+import time
+from datetime import date
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import strategies as strategies_router
+from app.routers.strategies import (
+    BacktestRequest,
+    _stream_backtest_job,
+    backtest_strategy,
+    cancel_backtest_job,
+    get_backtest_job,
+    submit_backtest_job,
+)
+from app.services import backtest_cache
+from app.services.backtest_jobs import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    BacktestJobLimitError,
+    BacktestJobManager,
+    get_backtest_job_manager,
+)
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_bar_universe,
+)
+
+USER = {"sub": "dev"}
+FIRST_DAY = date(2024, 1, 1)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = make_test_engine()
+    factory = make_session_factory(engine)
+    session = factory()
+    seed_bar_universe(session, ["AAA", "BBB"], first_day=FIRST_DAY, days=150)
+    session.close()
+    monkeypatch.setattr(strategies_router, "get_session_factory", lambda: factory)
+    monkeypatch.setattr(
+        strategies_router,
+        "_ensure_backtest_symbols_and_history",
+        AsyncMock(return_value=[]),
+    )
+    yield factory
+    engine.dispose()
+
+
+def _request(**overrides) -> BacktestRequest:
+    fields = dict(
+        ticker="AAA",
+        symbols_json=["BBB"],
+        params_json={"fast_period": 3, "slow_period": 8, "order_quantity": "2"},
+        risk_json={"max_position_quantity": "20", "max_daily_orders": 3},
+        capital_allocation="5000",
+        start="2024-02-01T00:00:00Z",
+        end="2024-05-29T00:00:00Z",
+    )
+    return BacktestRequest(**{**fields, **overrides})
+
+
+async def _wait(job) -> None:
+    while not job.finished:
+        await asyncio.sleep(0.01)
+
+
+async def test_job_result_matches_the_synchronous_backtest(session_factory):
+    db = session_factory()
+    submitted = await submit_backtest_job(_request(), user=USER, db=db)
+    assert submitted["status"] == JOB_QUEUED
+
+    job = get_backtest_job_manager().get(submitted["id"], "dev")
+    await _wait(job)
+    response = await get_backtest_job(submitted["id"], user=USER)
+
+    assert response["status"] == JOB_SUCCEEDED
+    assert response["progress"] == 1.0
+    backtest_cache._local.clear()
+    expected = await backtest_strategy(_request(), user=USER, db=db)
+    assert response["result"] == expected.model_dump()
+    assert job.equity_curve == response["result"]["equity_curve"]
+    db.close()
+
+
+async def test_stream_sends_partial_curves_then_the_result(session_factory):
+    db = session_factory()
+    submitted = await submit_backtest_job(_request(), user=USER, db=db)
+    job = get_backtest_job_manager().get(submitted["id"], "dev")
+
+    events = []
+    async for chunk in _stream_backtest_job(job, poll_seconds=0.001):
+        name, data = chunk.strip().split("\n")
+        events.append((name.removeprefix("event: "), json.loads(data[len("data: "):])))
+
+    assert [name for name, _ in events[:-1]] == ["progress"] * (len(events) - 1)
+    final_name, final = events[-1]
+    assert final_name == JOB_SUCCEEDED
+    streamed = [point for _, data in events[:-1] for point in data["equity_curve"]]
+    assert streamed == final["result"]["equity_curve"]
+    db.close()
+
+
+async def test_failed_job_reports_the_request_error(session_factory, monkeypatch):
+    monkeypatch.setattr(
+        strategies_router,
+        "_ensure_backtest_symbols_and_history",
+        AsyncMock(side_effect=HTTPException(status_code=404, detail="AAA not found")),
+    )
+    db = session_factory()
+    submitted = await submit_backtest_job(_request(), user=USER, db=db)
+    await _wait(get_backtest_job_manager().get(submitted["id"], "dev"))
+
+    response = await get_backtest_job(submitted["id"], user=USER)
+
+    assert response["status"] == JOB_FAILED
+    assert response["error"] == "AAA not found"
+    assert response["result"] is None
+    db.close()
+
+
+async def test_jobs_are_private_to_their_user(session_factory):
+    db = session_factory()
+    submitted = await submit_backtest_job(_request(), user=USER, db=db)
+
+    for call in (get_backtest_job, cancel_backtest_job):
+        with pytest.raises(HTTPException) as exc:
+            await call(submitted["id"], user={"sub": "someone-else"})
+        assert exc.value.status_code == 404
+    db.close()
+
+
+async def test_submit_rejects_a_malformed_request_up_front(session_factory):
+    db = session_factory()
+    with pytest.raises(HTTPException) as exc:
+        await submit_backtest_job(_request(start="yesterday"), user=USER, db=db)
+    assert exc.value.status_code == 400
+    db.close()
+
+
+async def test_manager_bounds_workers_and_active_jobs_per_user():
+    manager = BacktestJobManager(workers=1, jobs_per_user=2)
+    release = asyncio.Event()
+
+    async def work(_job):
+        await release.wait()
+        return {"ok": True}
+
+    first = manager.submit("a", work)
+    second = manager.submit("a", work)
+    other = manager.submit("b", work)
+    with pytest.raises(BacktestJobLimitError):
+        manager.submit("a", work)
+    await asyncio.sleep(0)
+
+    assert [first.status, second.status, other.status] == [
+        JOB_RUNNING,
+        JOB_QUEUED,
+        JOB_QUEUED,
+    ]
+    release.set()
+    for job in (first, second, other):
+        await _wait(job)
+    assert {job.status for job in (first, second, other)} == {JOB_SUCCEEDED}
+    # Finished jobs no longer count against the limit.
+    manager.submit("a", work)
+
+
+async def test_cancel_stops_queued_and_running_jobs():
+    manager = BacktestJobManager(workers=1, jobs_per_user=5)
+
+    async def work(job):
+        def simulate():
+            for day in range(1, 10_000):
+                job.record_day(day, 10_000, {"time": day})
+                time.sleep(0.001)
+            return {}
+
+        return await asyncio.to_thread(simulate)
+
+    running = manager.submit("a", work)
+    queued = manager.submit("a", work)
+    while running.days_done < 3:
+        await asyncio.sleep(0.001)
+    assert manager.cancel(queued.id, "a").status == JOB_CANCELLED
+    assert manager.cancel(running.id, "a").status == JOB_RUNNING
+
+    await _wait(running)
+
+    assert running.status == JOB_CANCELLED
+    assert running.days_done < 10_000 - 1
+    assert len(running.equity_curve) == running.days_done
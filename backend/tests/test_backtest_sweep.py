@@ -0,0 +1,320 @@
+"""Tests for parameter sweeps over the bar store and the sweep endpoint."""
+
+import dataclasses
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import strategies as strategies_router
+from app.routers.strategies import BacktestSweepRequest, sweep_backtest_strategy
+from app.services import backtest_sweep
+from app.services.backtest_sweep import (
+    SweepGridError,
+    SweepResult,
+    expand_param_grid,
+    reconcile_sweep_result,
+    run_param_sweep,
+    summarize_backtest,
+)
+from app.services.bar_store import refresh_bar_store
+from app.services.strategy_engine import run_backtest
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_bar_universe,
+)
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+FIRST_DAY = date(2024, 1, 1)
+START = datetime(2024, 3, 1, tzinfo=timezone.utc)
+END = datetime(2024, 9, 30, tzinfo=timezone.utc)
+RISK = {"max_position_quantity": "30", "max_daily_orders": 3}
+
+
+@pytest.fixture
+def db():
+    engine = make_test_engine()
+    session = make_session_factory(engine)()
+    seed_bar_universe(session, SYMBOLS, first_day=FIRST_DAY, days=270, seed=3)
+    refresh_bar_store(session, SYMBOLS)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _grid() -> list[dict]:
+    return expand_param_grid(
+        {"order_quantity": "2"},
+        {
+            "fast_period": [3, 5, 8],
+            "slow_period": {"start": 10, "stop": 30, "step": 10},
+        },
+    )
+
+
+def _sweep(**overrides) -> list:
+    kwargs = dict(
+        symbols=SYMBOLS,
+        strategy_type="ema_crossover",
+        combinations=_grid(),
+        risk_json=RISK,
+        capital_allocation=Decimal("5000"),
+        start=START.date(),
+        end=END.date(),
+        metric="ending_equity",
+    )
+    return run_param_sweep(**{**kwargs, **overrides})
+
+
+def test_expand_param_grid_crosses_lists_and_ranges():
+    assert _grid()[:4] == [
+        {"order_quantity": "2", "fast_period": 3, "slow_period": 10},
+        {"order_quantity": "2", "fast_period": 3, "slow_period": 20},
+        {"order_quantity": "2", "fast_period": 3, "slow_period": 30},
+        {"order_quantity": "2", "fast_period": 5, "slow_period": 10},
+    ]
+    assert len(_grid()) == 9
+    assert expand_param_grid({"a": 1}, {}) == [{"a": 1}]
+    halves = {"x": {"start": "0.5", "stop": 1, "step": "0.25"}}
+    assert expand_param_grid({}, halves) == [{"x": "0.5"}, {"x": "0.75"}, {"x": 1}]
+
+
+@pytest.mark.parametrize(
+    "grid",
+    [
+        {"fast_period": []},
+        {"fast_period": {"start": 10, "stop": 1}},
+        {"fast_period": {"start": 1}},
+        {"fast_period": list(range(40)), "slow_period": list(range(40))},
+    ],
+)
+def test_expand_param_grid_rejects_bad_grids(grid):
+    with pytest.raises(SweepGridError):
+        expand_param_grid({}, grid)
+
+
+def test_sweep_matches_individual_backtests_and_ranks(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+
+    results = _sweep(metric="total_return")
+
+    assert len(results) == 9
+    returns = [result.total_return for result in results]
+    assert returns == sorted(returns, reverse=True)
+    for result in results:
+        expected = run_backtest(
+            db=db,
+            strategy_type="ema_crossover",
+            symbols=SYMBOLS,
+            timeframe="1Day",
+            params_json=result.params_json,
+            risk_json=RISK,
+            capital_allocation=Decimal("5000"),
+            start=START,
+            end=END,
+        )
+        assert result == summarize_backtest(
+            result.params_json, expected, Decimal("5000")
+        )
+
+
+def test_process_pool_gives_the_in_process_results(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    in_process = _sweep()
+
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "2")
+    try:
+        pooled = _sweep()
+    finally:
+        backtest_sweep.shutdown_sweep_pool()
+
+    assert pooled == in_process
+    assert any(result.trade_count for result in pooled)
+
+
+def test_float64_sweep_ranks_like_the_decimal_sweep(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+
+    exact = _sweep()
+    fast = _sweep(precision="float64")
+
+    assert [result.params_json for result in fast] == [
+        result.params_json for result in exact
+    ]
+    for approximate, expected in zip(fast, exact):
+        assert approximate.trade_count == expected.trade_count
+        assert approximate.ending_equity == pytest.approx(
+            expected.ending_equity, rel=Decimal("1e-9")
+        )
+
+    reconciliation = reconcile_sweep_result(
+        fast[0],
+        symbols=SYMBOLS,
+        strategy_type="ema_crossover",
+        risk_json=RISK,
+        capital_allocation=Decimal("5000"),
+        start=START.date(),
+        end=END.date(),
+    )
+    assert reconciliation.exact == exact[0]
+    assert reconciliation.within_tolerance
+    assert reconciliation.trade_count_divergence == 0
+
+
+def test_reconciliation_flags_divergence_beyond_tolerance(db):
+    (exact,) = _sweep(combinations=_grid()[:1])
+    off = SweepResult(
+        **{**exact.__dict__, "ending_equity": exact.ending_equity + Decimal("1")}
+    )
+
+    reconciliation = reconcile_sweep_result(
+        off,
+        symbols=SYMBOLS,
+        strategy_type="ema_crossover",
+        risk_json=RISK,
+        capital_allocation=Decimal("5000"),
+        start=START.date(),
+        end=END.date(),
+    )
+
+    assert reconciliation.exact == exact
+    assert reconciliation.ending_equity_divergence == Decimal("1") / Decimal("5000")
+    assert not reconciliation.within_tolerance
+
+
+async def test_sweep_endpoint_skips_invalid_combinations(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    ensure = AsyncMock(return_value=[])
+    monkeypatch.setattr(
+        strategies_router, "_ensure_backtest_symbols_and_history", ensure
+    )
+
+    response = await sweep_backtest_strategy(
+        BacktestSweepRequest(
+            ticker="aaa",
+            symbols_json=["BBB", "CCC"],
+            params_json={"order_quantity": "2"},
+            risk_json=RISK,
+            capital_allocation="5000",
+            param_grid={"fast_period": [3, 12, 20], "slow_period": [10, 20]},
+            metric="win_rate",
+            limit=2,
+            start="2024-03-01T00:00:00Z",
+            end="2024-09-30T00:00:00Z",
+        ),
+        user={"sub": "dev"},
+        db=db,
+    )
+
+    # fast >= slow: (12, 10), (20, 10) and (20, 20) are skipped.
+    assert response.combinations == 3
+    assert response.skipped_combinations == 3
+    assert len(response.results) == 2
+    assert response.results[0].win_rate >= response.results[1].win_rate
+    # History is ensured for the combination with the longest lookback.
+    assert ensure.await_args.kwargs["params_json"]["slow_period"] == 20
+
+
+async def test_float64_sweep_endpoint_reports_the_decimal_rerun(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    monkeypatch.setattr(
+        strategies_router,
+        "_ensure_backtest_symbols_and_history",
+        AsyncMock(return_value=[]),
+    )
+
+    response = await sweep_backtest_strategy(
+        BacktestSweepRequest(
+            ticker="AAA",
+            symbols_json=["BBB", "CCC"],
+            params_json={"order_quantity": "2"},
+            risk_json=RISK,
+            capital_allocation="5000",
+            param_grid={"fast_period": [3, 5], "slow_period": [10, 20]},
+            precision="float64",
+            start="2024-03-01T00:00:00Z",
+            end="2024-09-30T00:00:00Z",
+        ),
+        user={"sub": "dev"},
+        db=db,
+    )
+
+    assert response.precision == "float64"
+    reconciliation = response.reconciliation
+    assert reconciliation.within_tolerance
+    assert response.results[0] == reconciliation.approximate
+    assert reconciliation.exact.params_json == reconciliation.approximate.params_json
+
+
+async def test_float64_sweep_keeps_its_ranking_when_the_rerun_disagrees(
+    db, monkeypatch
+):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    monkeypatch.setattr(
+        strategies_router,
+        "_ensure_backtest_symbols_and_history",
+        AsyncMock(return_value=[]),
+    )
+
+    def _diverging(result, **kwargs):
+        # The exact re-run of the float64 winner ranks below every other result.
+        real = reconcile_sweep_result(result, **kwargs)
+        exact = dataclasses.replace(real.exact, ending_equity=Decimal("1"))
+        return dataclasses.replace(real, exact=exact, within_tolerance=False)
+
+    monkeypatch.setattr(strategies_router, "reconcile_sweep_result", _diverging)
+
+    response = await sweep_backtest_strategy(
+        BacktestSweepRequest(
+            ticker="AAA",
+            symbols_json=["BBB", "CCC"],
+            params_json={"order_quantity": "2"},
+            risk_json=RISK,
+            capital_allocation="5000",
+            param_grid={"fast_period": [3, 5], "slow_period": [10, 20]},
+            precision="float64",
+            start="2024-03-01T00:00:00Z",
+            end="2024-09-30T00:00:00Z",
+        ),
+        user={"sub": "dev"},
+        db=db,
+    )
+
+    equities = [Decimal(result.ending_equity) for result in response.results]
+    assert equities == sorted(equities, reverse=True)
+    assert response.results[0] == response.reconciliation.approximate
+    assert response.reconciliation.exact.ending_equity == "1"
+    assert not response.reconciliation.within_tolerance
+
+
+async def test_sweep_endpoint_rejects_unknown_metric(db):
+    with pytest.raises(HTTPException) as exc:
+        await sweep_backtest_strategy(
+            BacktestSweepRequest(
+                ticker="AAA",
+                metric="sharpe",
+                start="2024-03-01T00:00:00Z",
+                end="2024-09-30T00:00:00Z",
+            ),
+            user={"sub": "dev"},
+            db=db,
+        )
+    assert exc.value.status_code == 400
+
+
+async def test_sweep_endpoint_rejects_unknown_precision(db):
+    with pytest.raises(HTTPException) as exc:
+        await sweep_backtest_strategy(
+            BacktestSweepRequest(
+                ticker="AAA",
+                precision="float32",
+                start="2024-03-01T00:00:00Z",
+                end="2024-09-30T00:00:00Z",
+            ),
+            user={"sub": "dev"},
+            db=db,
+        )
+    assert exc.value.status_code == 400
@@ -0,0 +1,130 @@
+"""Tests for the incrementally maintained `daily_bar_rollup` table."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.models import DailyBarRollup
+from app.services import bar_rollups
+from app.services import bars as bars_mod
+from app.services.bar_rollups import period_end, period_start, refresh_rollups
+from app.services.bars import fetch_aggregated_bars
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_daily_bar,
+    seed_symbol,
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(bars_mod, "pg_insert", sqlite_insert)
+    monkeypatch.setattr(bar_rollups, "pg_insert", sqlite_insert)
+    session = make_session_factory(make_test_engine())()
+    seed_symbol(session, "AAPL")
+    yield session
+    session.close()
+
+
+def _rollup(db, timeframe: str, start: date) -> DailyBarRollup:
+    return (
+        db.query(DailyBarRollup)
+        .filter_by(ticker="AAPL", timeframe=timeframe, period_start=start)
+        .one()
+    )
+
+
+@pytest.mark.parametrize(
+    ("timeframe", "day", "start", "end"),
+    [
+        ("1Week", date(2025, 1, 1), date(2024, 12, 30), date(2025, 1, 6)),
+        ("1Month", date(2025, 12, 15), date(2025, 12, 1), date(2026, 1, 1)),
+        ("3Month", date(2025, 5, 31), date(2025, 4, 1), date(2025, 7, 1)),
+        ("6Month", date(2025, 9, 2), date(2025, 7, 1), date(2026, 1, 1)),
+        ("1Year", date(2025, 3, 3), date(2025, 1, 1), date(2026, 1, 1)),
+    ],
+)
+def test_period_bounds(timeframe, day, start, end):
+    assert period_start(timeframe, day) == start
+    assert period_end(timeframe, start) == end
+
+
+def test_refresh_aggregates_the_touched_periods(db):
+    seed_daily_bar(
+        db,
+        "AAPL",
+        bar_date="2025-01-06",
+        open_=10,
+        high=12,
+        low=9,
+        close=11,
+        volume=100,
+    )
+    seed_daily_bar(
+        db,
+        "AAPL",
+        bar_date="2025-01-07",
+        open_=11,
+        high=15,
+        low=10,
+        close=14,
+        volume=300,
+    )
+
+    written = refresh_rollups(db, {"AAPL": [date(2025, 1, 6), date(2025, 1, 7)]})
+    db.commit()
+
+    assert written == 5
+    week = _rollup(db, "1Week", date(2025, 1, 6))
+    assert (week.open, week.high, week.low, week.close) == (10, 15, 9, 14)
+    assert week.volume == 400
+
+
+def test_appending_a_day_only_recomputes_its_periods(db):
+    seed_daily_bar(db, "AAPL", bar_date="2025-01-31", close=100, volume=10)
+    refresh_rollups(db, {"AAPL": [date(2025, 1, 31)]})
+    db.commit()
+    january = _rollup(db, "1Month", date(2025, 1, 1))
+
+    seed_daily_bar(db, "AAPL", bar_date="2025-02-03", close=120, volume=20)
+    refresh_rollups(db, {"AAPL": [date(2025, 2, 3)]})
+    db.commit()
+
+    db.refresh(january)
+    assert january.close == 100
+    assert _rollup(db, "1Month", date(2025, 2, 1)).close == 120
+    quarter = _rollup(db, "3Month", date(2025, 1, 1))
+    assert (quarter.close, quarter.volume) == (120, 30)
+
+
+async def test_fetch_aggregated_bars_reads_rollups_kept_by_backfill(db, monkeypatch):
+    async def _fetch(tickers, timeframe, start, end):
+        day = date(2025, 1, 2)
+        raw = []
+        while day <= date(2025, 2, 28):
+            if day.weekday() < 5:
+                raw.append(
+                    {
+                        "t": f"{day}T05:00:00Z",
+                        "o": 1,
+                        "h": 2,
+                        "l": 0.5,
+                        "c": 1.5,
+                        "v": 10,
+                    }
+                )
+            day += timedelta(days=1)
+        return {"AAPL": raw}
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars_multi", _fetch)
+    monkeypatch.setattr(bars_mod, "_empty_daily_sessions", {})
+
+    bars = await fetch_aggregated_bars(
+        db, "AAPL", "1Month", "2025-01-01T00:00:00Z", "2025-02-28T00:00:00Z"
+    )
+
+    assert [bar["time"] for bar in bars] == [1735689600, 1738368000]
+    # 21 January sessions: New Year's and MLK Day bars aren't stored.
+    assert bars[0]["volume"] == 10 * 21
@@ -0,0 +1,144 @@
+"""Tests for the per-ticker ATR / latest-volume cache."""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.models import DailyBar
+from app.services import bar_rollups, bar_stats
+from app.services import bars as bars_mod
+from app.services.atr import atr_from_db, compute_atr, warm_bar_stats
+from app.services.bar_stats import (
+    BarStats,
+    get_latest_volume,
+    get_local,
+    latest_volume,
+    lookup_bar_stats,
+)
+from app.services.bars import backfill_daily_bars
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_daily_bar,
+    seed_symbol,
+)
+
+FIRST = date(2025, 1, 2)
+LAST = FIRST + timedelta(days=14)
+
+
+@pytest.fixture
+def db():
+    session = make_session_factory(make_test_engine())()
+    seed_symbol(session, "AAPL")
+    # 15 sessions: prev close 100, then 14 bars with TR=10 and volume 1000+i.
+    for i in range(15):
+        seed_daily_bar(
+            session,
+            "AAPL",
+            bar_date=FIRST + timedelta(days=i),
+            high=110.0 if i else 100.0,
+            low=100.0 if i else 99.0,
+            close=105.0 if i else 100.0,
+            volume=1000.0 + i,
+        )
+    yield session
+    session.close()
+
+
+def _drop_bars(db) -> None:
+    db.query(DailyBar).delete()
+    db.commit()
+
+
+def test_merge_keeps_the_newer_entry_and_combines_same_day_fields():
+    old = BarStats(as_of=date(2025, 1, 2), volume=Decimal("5"), atr={14: Decimal("1")})
+    same = BarStats(as_of=date(2025, 1, 2), atr={20: Decimal("2")})
+    new = BarStats(as_of=date(2025, 1, 3), atr={14: Decimal("3")})
+
+    assert old.merge(same) == BarStats(
+        as_of=date(2025, 1, 2),
+        volume=Decimal("5"),
+        atr={14: Decimal("1"), 20: Decimal("2")},
+    )
+    assert old.merge(new) is new
+    assert new.merge(old) is new
+    assert BarStats.from_json(old.to_json()) == old
+
+
+async def test_atr_and_volume_are_served_from_cache_after_first_read(db):
+    assert await compute_atr("AAPL", db, n=14) == Decimal("10")
+    assert await get_latest_volume(db, "AAPL") == Decimal("1014")
+    assert get_local("AAPL") == BarStats(
+        as_of=LAST,
+        volume=Decimal("1014"),
+        atr={14: Decimal("10")},
+    )
+
+    _drop_bars(db)
+
+    assert await compute_atr("AAPL", db, n=14) == Decimal("10")
+    assert atr_from_db("AAPL", db, n=14) == Decimal("10")
+    assert latest_volume(db, "AAPL") == Decimal("1014")
+    # A period that was never computed still goes to the DB.
+    assert atr_from_db("AAPL", db, n=5) == Decimal("0")
+
+
+async def test_redis_hit_fills_the_local_tier(monkeypatch):
+    shared = BarStats(as_of=FIRST, atr={14: Decimal("7")})
+
+    async def _hit(ticker):
+        return shared
+
+    monkeypatch.setattr(bar_stats, "read_redis", _hit)
+
+    assert await lookup_bar_stats("AAPL") == shared
+    assert get_local("AAPL") == shared
+
+
+def test_local_entries_expire(db, monkeypatch):
+    monkeypatch.setattr(bar_stats, "BAR_STATS_LOCAL_TTL_SECONDS", -1)
+    assert latest_volume(db, "AAPL") == Decimal("1014")
+
+    assert get_local("AAPL") is None
+
+
+async def test_warm_caches_every_period_and_volume_in_one_pass(db):
+    warmed = await warm_bar_stats(
+        db, ["AAPL", "MSFT"], periods=(5, 14, 30), today=LAST
+    )
+    assert warmed == 1
+
+    stats = get_local("AAPL")
+    assert stats.volume == Decimal("1014")
+    assert stats.atr == {5: Decimal("10"), 14: Decimal("10")}
+    assert get_local("MSFT") is None
+
+
+async def test_backfill_invalidates_tickers_it_inserted_bars_for(db, monkeypatch):
+    monkeypatch.setattr(bars_mod, "pg_insert", sqlite_insert)
+    monkeypatch.setattr(bar_rollups, "pg_insert", sqlite_insert)
+    monkeypatch.setattr(bars_mod, "_empty_daily_sessions", {})
+    deleted: list[list[str]] = []
+
+    async def _delete(tickers):
+        deleted.append(tickers)
+
+    async def _fetch(tickers, timeframe, start, end):
+        return {
+            ticker: [{"t": "2025-01-21T05:00:00Z", "o": 1, "h": 2, "l": 1, "c": 1}]
+            for ticker in tickers
+        }
+
+    monkeypatch.setattr(bar_stats, "delete_redis", _delete)
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars_multi", _fetch)
+    await warm_bar_stats(db, ["AAPL"], today=LAST)
+
+    await backfill_daily_bars(
+        db, ["AAPL"], "2025-01-21T00:00:00Z", "2025-01-21T23:59:59Z"
+    )
+
+    assert get_local("AAPL") is None
+    assert deleted == [["AAPL"]]
@@ -0,0 +1,105 @@
+"""Tests for the memory-mapped columnar daily bar store."""
+
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.services import bar_store
+from app.services.bar_store import get_bars, refresh_bar_store, refresh_ticker
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_daily_bar,
+    seed_symbol,
+)
+
+
+@pytest.fixture
+def db():
+    session = make_session_factory(make_test_engine())()
+    seed_symbol(session, "AAPL")
+    yield session
+    session.close()
+
+
+def _seed_days(db, first: date, count: int) -> None:
+    for i in range(count):
+        seed_daily_bar(db, "AAPL", bar_date=first + timedelta(days=i), close=100.0 + i)
+
+
+def test_refresh_writes_columns_and_get_bars_slices_by_date(db, tmp_path):
+    _seed_days(db, date(2025, 1, 1), 10)
+
+    assert refresh_ticker(db, "AAPL", root=tmp_path) == 10
+    bars = get_bars("AAPL", date(2025, 1, 3), date(2025, 1, 5), root=tmp_path)
+
+    assert len(bars) == 3
+    assert bars.dates[0] == np.datetime64("2025-01-03")
+    assert bars.close.dtype == np.float64
+    assert bars.close.tolist() == [102.0, 103.0, 104.0]
+    assert bars.trade_count.dtype == np.int64
+    assert np.isnan(bars.vwap).all()
+    assert not bars.close.flags.writeable
+
+
+def test_refresh_reads_only_newer_rows_when_appending(db, tmp_path):
+    _seed_days(db, date(2025, 1, 1), 5)
+    refresh_ticker(db, "AAPL", root=tmp_path)
+    _seed_days(db, date(2025, 1, 6), 2)
+
+    assert refresh_ticker(db, "AAPL", root=tmp_path) == 2
+    assert refresh_ticker(db, "AAPL", root=tmp_path) == 0
+    assert get_bars("AAPL", root=tmp_path).close[-1] == 101.0
+
+
+def test_backfilled_older_history_rewrites_the_file(db, tmp_path):
+    _seed_days(db, date(2025, 1, 10), 3)
+    refresh_ticker(db, "AAPL", root=tmp_path)
+    _seed_days(db, date(2025, 1, 1), 2)
+
+    assert refresh_ticker(db, "AAPL", root=tmp_path) == 5
+    bars = get_bars("AAPL", root=tmp_path)
+    assert bars.dates[0] == np.datetime64("2025-01-01")
+    assert len(bars) == 5
+
+
+def test_unknown_ticker_is_empty_and_refresh_is_best_effort(db, tmp_path, monkeypatch):
+    assert len(get_bars("MSFT", root=tmp_path)) == 0
+
+    def _fail(path, block):
+        raise OSError("disk full")
+
+    _seed_days(db, date(2025, 1, 1), 2)
+    monkeypatch.setattr(bar_store, "_write", _fail)
+    assert refresh_bar_store(db, ["AAPL"], root=tmp_path) == 0
+
+
+def test_unreadable_file_does_not_fail_the_refresh(db, tmp_path):
+    _seed_days(db, date(2025, 1, 1), 2)
+    bar_store._ticker_path("AAPL", tmp_path).write_bytes(b"not a numpy file")
+
+    assert refresh_bar_store(db, ["AAPL"], root=tmp_path) == 0
+
+
+def test_writer_threads_use_separate_temp_files(tmp_path, monkeypatch):
+    temp_names: set[str] = set()
+    replace = bar_store.os.replace
+
+    def _replace(src, dst):
+        temp_names.add(str(src))
+        replace(src, dst)
+
+    monkeypatch.setattr(bar_store.os, "replace", _replace)
+    path = tmp_path / "AAPL.npy"
+    workers = [
+        threading.Thread(target=bar_store._write, args=(path, np.zeros((2, 1))))
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(temp_names) == 2
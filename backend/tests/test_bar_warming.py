@@ -0,0 +1,96 @@
+"""Tests for the nightly daily-bar warming task."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.db.models import Strategy, WatchlistItem
+from app.tasks import bar_warming
+from app.tasks.bar_warming import active_universe, next_warm_at, warm_daily_bars_once
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_account,
+    seed_holding,
+    seed_order,
+    seed_symbol,
+    seed_user,
+)
+
+
+@pytest.fixture
+def session_factory():
+    factory = make_session_factory(make_test_engine())
+    db = factory()
+    seed_user(db, "u1")
+    account = seed_account(db, "u1")
+    for ticker in ("AAPL", "MSFT", "NVDA", "TSLA", "AMD", "IBM", "SPY"):
+        seed_symbol(db, ticker)
+    seed_holding(db, account.id, "AAPL")
+    seed_holding(db, account.id, "IBM", quantity="0")
+    db.add(WatchlistItem(user_id="u1", ticker="MSFT"))
+    seed_order(db, account.id, "NVDA")
+    seed_order(db, account.id, "AMD", status="filled")
+    db.add(
+        Strategy(
+            trading_account_id=account.id,
+            name="trend",
+            strategy_type="sma_crossover",
+            ticker="TSLA",
+            symbols_json=["TSLA", "SPY"],
+            params_json={},
+        )
+    )
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_active_universe_covers_held_watched_ordered_and_strategy_tickers(
+    session_factory,
+):
+    db = session_factory()
+    try:
+        assert active_universe(db) == ["AAPL", "MSFT", "NVDA", "SPY", "TSLA"]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        # Thursday afternoon -> same evening.
+        (
+            datetime(2025, 1, 16, 18, 0, tzinfo=timezone.utc),
+            datetime(2025, 1, 16, 20, 15),
+        ),
+        # Friday after the warm time -> skips the weekend and MLK Day.
+        (
+            datetime(2025, 1, 18, 2, 0, tzinfo=timezone.utc),
+            datetime(2025, 1, 21, 20, 15),
+        ),
+    ],
+)
+def test_next_warm_at_is_after_the_next_trading_close(now, expected):
+    assert next_warm_at(now).replace(tzinfo=None) == expected
+
+
+async def test_warm_backfills_universe_in_one_batch(session_factory, monkeypatch):
+    calls = []
+
+    async def _backfill(db, tickers, start, end):
+        calls.append((tickers, start, end))
+        return 3
+
+    monkeypatch.setattr(bar_warming, "get_session_factory", lambda: session_factory)
+    monkeypatch.setattr(bar_warming, "backfill_daily_bars", _backfill)
+    monkeypatch.setenv("BAR_WARM_LOOKBACK_DAYS", "10")
+
+    assert await warm_daily_bars_once(today=date(2025, 1, 17)) == 3
+    assert calls == [
+        (
+            ["AAPL", "MSFT", "NVDA", "SPY", "TSLA"],
+            "2025-01-07T00:00:00Z",
+            "2025-01-17T23:59:59Z",
+        )
+    ]
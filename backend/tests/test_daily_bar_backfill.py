@@ -0,0 +1,327 @@
+"""Tests for the calendar-aware, multi-symbol daily bar backfill."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.models import DailyBar
+from app.services import atr as atr_mod
+from app.services import bar_rollups
+from app.services import bars as bars_mod
+from app.services.bars import (
+    backfill_daily_bars,
+    columns_from_rows,
+    daily_bars_current,
+    expected_daily_sessions,
+    fetch_aggregated_bars,
+    fetch_aggregated_columns,
+    fetch_daily_bars,
+    fetch_daily_columns,
+    missing_session_ranges,
+    to_columnar,
+)
+from app.services.market_calendar import trading_sessions
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_daily_bar,
+    seed_symbol,
+)
+
+
+def _raw_daily_bars(start: str, end: str) -> list[dict]:
+    """Alpaca-shaped 1Day bars for every weekday in [start, end]."""
+    day = bars_mod.parse_iso_utc(start).date()
+    last = bars_mod.parse_iso_utc(end).date()
+    out = []
+    while day <= last:
+        if day.weekday() < 5:
+            out.append(
+                {
+                    "t": f"{day.isoformat()}T05:00:00Z",
+                    "o": 1.0,
+                    "h": 2.0,
+                    "l": 0.5,
+                    "c": 1.5,
+                    "v": 10,
+                    "n": 1,
+                    "vw": 1.2,
+                }
+            )
+        day += timedelta(days=1)
+    return out
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(bars_mod, "pg_insert", sqlite_insert)
+    monkeypatch.setattr(bar_rollups, "pg_insert", sqlite_insert)
+    monkeypatch.setattr(bars_mod, "_empty_daily_sessions", {})
+    session = make_session_factory(make_test_engine())()
+    seed_symbol(session, "AAPL")
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def alpaca_calls(monkeypatch):
+    calls: list[tuple[str, str]] = []
+
+    async def _fetch(tickers, timeframe, start, end):
+        calls.append((start, end))
+        return {ticker: _raw_daily_bars(start, end) for ticker in tickers}
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars_multi", _fetch)
+    return calls
+
+
+async def test_columns_match_the_row_format(db, alpaca_calls):
+    start, end = "2025-01-01T00:00:00Z", "2025-03-31T00:00:00Z"
+    sessions = trading_sessions(date(2025, 1, 2), date(2025, 3, 31))
+    for i, day in enumerate(sessions):
+        seed_daily_bar(db, "AAPL", bar_date=day, close=100.0 + i, volume=1_000 + i)
+    bar_rollups.refresh_rollups(db, {"AAPL": sessions})
+    db.commit()
+
+    columns = await fetch_daily_columns(db, "AAPL", start, end)
+
+    assert columns == to_columnar(await fetch_daily_bars(db, "AAPL", start, end))
+    assert len(columns["t"]) == len(sessions)
+    weekly = await fetch_aggregated_columns(db, "AAPL", "1Week", start, end)
+    assert weekly == to_columnar(
+        await fetch_aggregated_bars(db, "AAPL", "1Week", start, end)
+    )
+    assert len(weekly["t"]) == 14
+    assert columns_from_rows([]) == to_columnar([])
+
+
+def test_trading_sessions_skip_weekends_and_holidays():
+    sessions = trading_sessions(date(2025, 1, 16), date(2025, 1, 22))
+
+    # Sat/Sun 18-19 and MLK Day on the 20th are not sessions.
+    assert sessions == [
+        date(2025, 1, 16),
+        date(2025, 1, 17),
+        date(2025, 1, 21),
+        date(2025, 1, 22),
+    ]
+
+
+def test_missing_ranges_only_break_at_stored_sessions():
+    sessions = trading_sessions(date(2025, 1, 13), date(2025, 1, 24))
+    present = {date(2025, 1, 15), date(2025, 1, 22)}
+
+    assert missing_session_ranges(sessions, present) == [
+        (date(2025, 1, 13), date(2025, 1, 14)),
+        (date(2025, 1, 16), date(2025, 1, 21)),
+        (date(2025, 1, 23), date(2025, 1, 24)),
+    ]
+    assert missing_session_ranges(sessions, set(sessions)) == []
+
+
+def test_expected_sessions_exclude_unfinished_days():
+    # Friday 2025-01-17, 15:00 ET: today's session is still open.
+    during = datetime(2025, 1, 17, 20, 0, tzinfo=timezone.utc)
+    sessions = expected_daily_sessions(
+        "AAPL", date(2025, 1, 15), date(2025, 1, 17), now=during
+    )
+    assert sessions[-1] == date(2025, 1, 16)
+
+    after = datetime(2025, 1, 18, 2, 0, tzinfo=timezone.utc)  # 21:00 ET
+    sessions = expected_daily_sessions(
+        "AAPL", date(2025, 1, 15), date(2025, 1, 17), now=after
+    )
+    assert sessions[-1] == date(2025, 1, 17)
+
+    # Crypto counts weekends, but not a day that hasn't closed in US Central.
+    crypto = expected_daily_sessions(
+        "BTC/USD", date(2025, 1, 15), date(2025, 1, 20), now=after
+    )
+    assert crypto == [date(2025, 1, 15), date(2025, 1, 16)]
+
+
+async def test_backfill_fetches_only_missing_session_ranges(db, alpaca_calls):
+    for day in trading_sessions(date(2025, 1, 2), date(2025, 1, 31)):
+        if day not in (date(2025, 1, 8), date(2025, 1, 9), date(2025, 1, 21)):
+            seed_daily_bar(db, "AAPL", bar_date=day)
+
+    bars = await fetch_daily_bars(
+        db, "AAPL", "2025-01-01T00:00:00Z", "2025-01-31T00:00:00Z"
+    )
+
+    assert alpaca_calls == [
+        ("2025-01-08T00:00:00Z", "2025-01-09T23:59:59Z"),
+        ("2025-01-21T00:00:00Z", "2025-01-21T23:59:59Z"),
+    ]
+    # MLK Day (weekday holiday) comes back from the fake feed but isn't stored.
+    assert db.query(DailyBar).filter(DailyBar.date == date(2025, 1, 20)).count() == 0
+    assert len(bars) == len(trading_sessions(date(2025, 1, 2), date(2025, 1, 31)))
+
+    alpaca_calls.clear()
+    await fetch_daily_bars(
+        db, "AAPL", "2025-01-01T00:00:00Z", "2025-01-31T00:00:00Z"
+    )
+    assert alpaca_calls == []
+
+
+async def test_sessions_without_bars_are_not_requested_again(db, monkeypatch):
+    calls = []
+
+    async def _fetch(tickers, timeframe, start, end):
+        calls.append((start, end))
+        # Listed on the 15th: nothing before that.
+        return {"AAPL": _raw_daily_bars("2025-01-15T00:00:00Z", end)}
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars_multi", _fetch)
+
+    await fetch_daily_bars(
+        db, "AAPL", "2025-01-02T00:00:00Z", "2025-01-17T00:00:00Z"
+    )
+    assert len(calls) == 1
+
+    bars = await fetch_daily_bars(
+        db, "AAPL", "2025-01-02T00:00:00Z", "2025-01-17T00:00:00Z"
+    )
+    assert len(calls) == 1
+    assert len(bars) == 3
+
+
+async def test_recent_session_without_a_bar_is_asked_again(db, monkeypatch):
+    today = datetime.now(timezone.utc).date()
+    start = f"{(today - timedelta(days=14)).isoformat()}T00:00:00Z"
+    end = f"{today.isoformat()}T00:00:00Z"
+    latest = expected_daily_sessions(
+        "AAPL", today - timedelta(days=14), today
+    )[-1]
+    calls = []
+
+    async def _fetch(tickers, timeframe, range_start, range_end):
+        calls.append((range_start, range_end))
+        # The latest session's bar isn't published yet.
+        bars = _raw_daily_bars(range_start, range_end)
+        return {"AAPL": [b for b in bars if not b["t"].startswith(str(latest))]}
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars_multi", _fetch)
+
+    await fetch_daily_bars(db, "AAPL", start, end)
+    await fetch_daily_bars(db, "AAPL", start, end)
+
+    assert len(calls) == 2
+    assert calls[1] == (f"{latest}T00:00:00Z", f"{latest}T23:59:59Z")
+    assert latest not in bars_mod._empty_daily_sessions.get("AAPL", set())
+
+
+def test_daily_bars_current_only_when_no_newer_session_is_due(monkeypatch):
+    monkeypatch.setattr(bars_mod, "_empty_daily_sessions", {})
+    first, last = date(2025, 1, 2), date(2025, 1, 17)
+
+    assert daily_bars_current("AAPL", date(2025, 1, 17), first, last)
+    assert not daily_bars_current("AAPL", date(2025, 1, 15), first, last)
+    assert not daily_bars_current("AAPL", None, first, last)
+
+    bars_mod._remember_empty_sessions("AAPL", {date(2025, 1, 16), date(2025, 1, 17)})
+    assert daily_bars_current("AAPL", date(2025, 1, 15), first, last)
+
+
+def test_empty_session_cache_drops_least_recently_updated_ticker(monkeypatch):
+    monkeypatch.setattr(bars_mod, "_empty_daily_sessions", {})
+    monkeypatch.setattr(bars_mod, "EMPTY_SESSION_CACHE_MAX_TICKERS", 2)
+    day = date(2025, 1, 2)
+
+    bars_mod._remember_empty_sessions("AAA", {day})
+    bars_mod._remember_empty_sessions("BBB", {day})
+    bars_mod._remember_empty_sessions("AAA", {day + timedelta(days=1)})
+    bars_mod._remember_empty_sessions("CCC", {day})
+
+    assert list(bars_mod._empty_daily_sessions) == ["AAA", "CCC"]
+    assert bars_mod._empty_daily_sessions["AAA"] == {day, day + timedelta(days=1)}
+
+
+async def test_tickers_missing_the_same_range_share_one_request(db, monkeypatch):
+    seed_symbol(db, "MSFT")
+    seed_symbol(db, "NVDA")
+    seed_daily_bar(db, "NVDA", bar_date=date(2025, 1, 8))
+    calls = []
+
+    async def _fetch(tickers, timeframe, start, end):
+        calls.append((tuple(tickers), start, end))
+        return {ticker: _raw_daily_bars(start, end) for ticker in tickers}
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars_multi", _fetch)
+
+    inserted = await backfill_daily_bars(
+        db, ["AAPL", "MSFT", "NVDA"], "2025-01-06T00:00:00Z", "2025-01-10T00:00:00Z"
+    )
+
+    assert calls == [
+        (("AAPL", "MSFT"), "2025-01-06T00:00:00Z", "2025-01-10T23:59:59Z"),
+        (("NVDA",), "2025-01-06T00:00:00Z", "2025-01-07T23:59:59Z"),
+        (("NVDA",), "2025-01-09T00:00:00Z", "2025-01-10T23:59:59Z"),
+    ]
+    assert inserted == 14
+
+
+async def test_multi_symbol_fetch_groups_pages_by_ticker(monkeypatch):
+    pages = [
+        {
+            "bars": {"AAPL": [{"t": "a1"}, {"t": "a2"}]},
+            "next_page_token": "p2",
+        },
+        {
+            "bars": {"AAPL": [{"t": "a3"}], "MSFT": [{"t": "m1"}]},
+            "next_page_token": None,
+        },
+    ]
+    requests: list[httpx.Request] = []
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if "crypto" in request.url.path:
+            return httpx.Response(200, json={"bars": {"BTC/USD": [{"t": "b1"}]}})
+        token = request.url.params.get("page_token")
+        return httpx.Response(200, json=pages[1 if token == "p2" else 0])
+
+    real_client = httpx.AsyncClient
+
+    def _client(**kwargs):
+        return real_client(transport=httpx.MockTransport(_handler), **kwargs)
+
+    class _Limiter:
+        async def acquire(self):
+            return None
+
+    monkeypatch.setattr(bars_mod.httpx, "AsyncClient", _client)
+    monkeypatch.setattr(bars_mod, "get_alpaca_limiter", lambda: _Limiter())
+
+    grouped = await bars_mod._fetch_alpaca_bars_multi(
+        ["AAPL", "MSFT", "BTC/USD", "AAPL"], "1Day", "2025-01-01", "2025-01-31"
+    )
+
+    assert grouped == {
+        "AAPL": [{"t": "a1"}, {"t": "a2"}, {"t": "a3"}],
+        "MSFT": [{"t": "m1"}],
+        "BTC/USD": [{"t": "b1"}],
+    }
+    stock_requests = [r for r in requests if r.url.path == "/v2/stocks/bars"]
+    assert len(stock_requests) == 2
+    assert stock_requests[0].url.params["symbols"] == "AAPL,MSFT"
+
+
+async def test_warm_atr_bars_only_backfills_short_tickers(db, monkeypatch):
+    seed_symbol(db, "MSFT")
+    today = date.today()
+    for i in range(20):
+        seed_daily_bar(db, "MSFT", bar_date=today - timedelta(days=i))
+    requested = []
+
+    async def _backfill(session, tickers, start, end):
+        requested.append(tickers)
+        return 0
+
+    monkeypatch.setattr(atr_mod, "backfill_daily_bars", _backfill)
+
+    await atr_mod.warm_atr_bars(db, ["AAPL", "MSFT"], 14)
+
+    assert requested == [["AAPL"]]
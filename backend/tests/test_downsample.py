@@ -0,0 +1,105 @@
+"""Tests for server-side chart downsampling."""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.services.downsample import (
+    bucket_ohlc,
+    downsample_bars,
+    lttb_indices,
+    resample_bars,
+)
+
+
+def _bars(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    out = []
+    price = 100.0
+    for i in range(n):
+        price += rng.uniform(-1, 1)
+        out.append(
+            {
+                "time": 1_700_000_000 + i * 86400,
+                "open": price,
+                "high": price + rng.uniform(0, 2),
+                "low": price - rng.uniform(0, 2),
+                "close": price + rng.uniform(-0.5, 0.5),
+                "volume": float(rng.randint(1, 1000)),
+                "vwap": None if i % 5 == 0 else price,
+                "trade_count": rng.randint(1, 50),
+            }
+        )
+    return out
+
+
+def test_bucket_ohlc_matches_naive_aggregation():
+    bars = _bars(103)
+
+    out = bucket_ohlc(bars, 10)
+
+    assert len(out) == 10
+    for i, bucket in enumerate(out):
+        chunk = bars[i * 11 : (i + 1) * 11]
+        assert bucket["time"] == chunk[0]["time"]
+        assert bucket["open"] == chunk[0]["open"]
+        assert bucket["high"] == max(b["high"] for b in chunk)
+        assert bucket["low"] == min(b["low"] for b in chunk)
+        assert bucket["close"] == chunk[-1]["close"]
+        assert bucket["volume"] == sum(b["volume"] for b in chunk)
+        assert bucket["trade_count"] == sum(b["trade_count"] for b in chunk)
+        priced = [b for b in chunk if b["vwap"] is not None]
+        expected_vwap = sum(b["vwap"] * b["volume"] for b in priced) / sum(
+            b["volume"] for b in priced
+        )
+        assert abs(bucket["vwap"] - expected_vwap) < 1e-9
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    values = [1.0] * 1000
+    values[437] = 50.0
+
+    picked = lttb_indices(np.array(values), 20)
+
+    assert len(picked) == 20
+    assert picked[0] == 0 and picked[-1] == 999
+    assert picked == sorted(picked)
+    assert 437 in picked
+
+
+def test_short_series_and_method_selection():
+    bars = _bars(50)
+
+    assert downsample_bars(bars, 100) is bars
+    lttb = downsample_bars(bars, 10, "lttb")
+    assert len(lttb) == 10
+    assert all(bar in bars for bar in lttb)
+    assert len(downsample_bars(bars, 10)) == 10
+
+
+def test_resample_aligns_to_step_and_skips_empty_buckets():
+    minutes = [
+        {
+            "time": t,
+            "open": t,
+            "high": t + 1,
+            "low": t - 1,
+            "close": t + 0.5,
+            "volume": 10,
+            "vwap": t,
+            "trade_count": 1,
+        }
+        for t in (60, 120, 240, 600, 660)
+    ]
+
+    out = resample_bars(minutes, 300)
+
+    assert [bar["time"] for bar in out] == [0, 600]
+    first, last = out
+    assert (first["open"], first["close"]) == (60, 240.5)
+    assert (first["high"], first["low"]) == (241, 59)
+    assert first["volume"] == 30 and first["trade_count"] == 3
+    assert first["vwap"] == pytest.approx(140.0)
+    assert (last["open"], last["close"], last["volume"]) == (600, 660.5, 20)
+    assert resample_bars([], 300) == []
@@ -1,10 +1,13 @@
 from contextlib import contextmanager
+from datetime import date
 from unittest.mock import AsyncMock, patch
 
 from fastapi.testclient import TestClient
 
 from app.auth import get_current_user
+from app.db import get_db
 from app.main import app
+from app.services.bars import to_columnar
 
 client = TestClient(app)
 
@@ -48,7 +51,7 @@ def test_historical_bars_success(mock_fetch: AsyncMock):
     payload = response.json()
     assert payload["ticker"] == "AAPL"
     assert payload["timeframe"] == "1Min"
-    assert payload["source"] == "alpaca"
+    assert payload["source"] == "intraday_bar"
     assert len(payload["bars"]) == 1
     assert payload["bars"][0]["close"] == 187.8
 
@@ -88,3 +91,165 @@ def test_historical_bars_uses_rate_limiter(mock_fetch: AsyncMock):
 
     assert response.status_code == 200
     mock_fetch.assert_called_once()
+
+
+DAILY_PARAMS = {
+    "ticker": "AAPL",
+    "timeframe": "1Day",
+    "start": "2025-01-01T00:00:00Z",
+    "end": "2025-01-10T00:00:00Z",
+}
+
+
+@contextmanager
+def daily_bars_stubbed(version=(date(2025, 1, 10), 7)):
+    bars = [{"time": 1736467200, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5}]
+    app.dependency_overrides[get_db] = lambda: None
+    try:
+        with (
+            auth_override(),
+            patch(
+                "app.routers.historical_bars.fetch_daily_bars",
+                new_callable=AsyncMock,
+                return_value=bars,
+            ) as fetch,
+            patch(
+                "app.routers.historical_bars.daily_bar_version",
+                return_value=version,
+            ),
+        ):
+            yield fetch
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def test_daily_bars_carry_etag_and_cache_control():
+    with daily_bars_stubbed():
+        response = client.get("/api/historical-bars", params=DAILY_PARAMS)
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    # Range ended long ago, so it can't change any more.
+    assert response.headers["cache-control"] == "private, max-age=86400"
+
+
+def test_matching_if_none_match_returns_304_without_body():
+    with daily_bars_stubbed() as fetch:
+        etag = client.get("/api/historical-bars", params=DAILY_PARAMS).headers["etag"]
+        fetch.reset_mock()
+        response = client.get(
+            "/api/historical-bars",
+            params=DAILY_PARAMS,
+            headers={"If-None-Match": f'"other", W/{etag}'},
+        )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # Answered from the version alone: no backfill, no bar load.
+    fetch.assert_not_awaited()
+
+
+def test_etag_match_still_backfills_when_a_newer_session_is_missing():
+    with daily_bars_stubbed(version=(date(2025, 1, 7), 4)) as fetch:
+        etag = client.get("/api/historical-bars", params=DAILY_PARAMS).headers["etag"]
+        fetch.reset_mock()
+        response = client.get(
+            "/api/historical-bars", params=DAILY_PARAMS, headers={"If-None-Match": etag}
+        )
+
+    # Sessions after the 7th could still arrive, so the backfill runs first.
+    fetch.assert_awaited_once()
+    assert response.status_code == 304
+
+
+def test_new_bar_changes_the_etag():
+    with daily_bars_stubbed():
+        etag = client.get("/api/historical-bars", params=DAILY_PARAMS).headers["etag"]
+    with daily_bars_stubbed(version=(date(2025, 1, 10), 8)):
+        response = client.get(
+            "/api/historical-bars", params=DAILY_PARAMS, headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@patch("app.routers.historical_bars.fetch_intraday_bars", new_callable=AsyncMock)
+def test_max_points_downsamples_and_rejects_unknown_method(mock_fetch: AsyncMock):
+    mock_fetch.return_value = [
+        {
+            "time": 1735826400 + i * 60,
+            "open": 1.0,
+            "high": 2.0 + i,
+            "low": 0.5,
+            "close": 1.5,
+            "volume": 10.0,
+            "vwap": 1.2,
+            "trade_count": 1,
+        }
+        for i in range(100)
+    ]
+    params = {
+        "ticker": "AAPL",
+        "timeframe": "1Min",
+        "start": "2025-01-01T00:00:00Z",
+        "end": "2025-01-10T00:00:00Z",
+        "max_points": 10,
+    }
+
+    with auth_override():
+        response = client.get("/api/historical-bars", params=params)
+        bad = client.get(
+            "/api/historical-bars", params={**params, "downsample": "median"}
+        )
+
+    bars = response.json()["bars"]
+    assert len(bars) == 10
+    assert bars[-1]["high"] == 101.0
+    assert bars[0]["volume"] == 100.0
+    assert bad.status_code == 400
+
+
+def test_columnar_format_returns_parallel_arrays_at_under_half_the_size():
+    many = [
+        {
+            "time": 1735862400 + i * 86400,
+            "open": 187.21 + i,
+            "high": 188.13 + i,
+            "low": 186.92 + i,
+            "close": 187.85 + i,
+            "volume": 51234567.0,
+            "vwap": 187.51 + i,
+            "trade_count": 812345,
+        }
+        for i in range(500)
+    ]
+    with daily_bars_stubbed():
+        with (
+            patch(
+                "app.routers.historical_bars.fetch_daily_bars",
+                new_callable=AsyncMock,
+                return_value=many,
+            ) as fetch_rows,
+            patch(
+                "app.routers.historical_bars.fetch_daily_columns",
+                new_callable=AsyncMock,
+                return_value=to_columnar(many),
+            ) as fetch_columns,
+        ):
+            rows = client.get("/api/historical-bars", params=DAILY_PARAMS)
+            columnar = client.get(
+                "/api/historical-bars", params={**DAILY_PARAMS, "format": "columnar"}
+            )
+
+    # The columnar request reads the arrays directly, never the row dicts.
+    assert (fetch_rows.await_count, fetch_columns.await_count) == (1, 1)
+
+    payload = columnar.json()
+    assert payload["format"] == "columnar"
+    assert payload["bars"]["t"] == [bar["time"] for bar in many]
+    assert payload["bars"]["c"][3] == many[3]["close"]
+    assert set(payload["bars"]) == {"t", "o", "h", "l", "c", "v"}
+    assert columnar.headers["etag"] != rows.headers["etag"]
+    assert len(columnar.content) < len(rows.content) / 2
@@ -0,0 +1,84 @@
+"""Equivalence tests for the vectorized indicators against strategy_signals.
+
+Property-style: every seed draws a random series (random walks with flat
+stretches, so RSI hits its zero-gain/zero-loss branches) and a random
+period, and the vectorized series must match the list implementation
+element for element.
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.services.indicators import donchian, ema, rolling_max, rsi, sma
+from app.services.strategy_signals import _ema_series, _rsi_series, _sma_series
+
+SEEDS = range(100)
+
+
+def _series(rng: random.Random) -> list[float]:
+    values = []
+    price = rng.uniform(1, 500)
+    for _ in range(rng.randint(0, 400)):
+        roll = rng.random()
+        if roll < 0.15:
+            pass  # unchanged close
+        elif roll < 0.2:
+            price += rng.uniform(0, 5)  # run of gains only
+        else:
+            price = max(0.01, price + rng.gauss(0, price * 0.02))
+        values.append(price)
+    return values
+
+
+def _assert_same(actual: np.ndarray, expected: list[float]) -> None:
+    assert actual.shape == (len(expected),)
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sma_matches_list_implementation(seed):
+    rng = random.Random(seed)
+    values, period = _series(rng), rng.randint(1, 80)
+    _assert_same(sma(values, period), _sma_series(values, period))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_ema_matches_list_implementation(seed):
+    rng = random.Random(seed)
+    values, period = _series(rng), rng.randint(1, 80)
+    _assert_same(ema(values, period), _ema_series(values, period))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_rsi_matches_list_implementation(seed):
+    rng = random.Random(seed)
+    values, period = _series(rng), rng.randint(1, 40)
+    _assert_same(rsi(values, period), _rsi_series(values, period))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_donchian_matches_window_max_and_min(seed):
+    rng = random.Random(seed)
+    highs = _series(rng)
+    lows = [value - rng.uniform(0, 3) for value in highs]
+    period = rng.randint(1, 60)
+
+    upper, lower = donchian(highs, lows, period)
+
+    windows = range(len(highs) - period + 1)
+    _assert_same(upper, [max(highs[i : i + period]) for i in windows])
+    _assert_same(lower, [min(lows[i : i + period]) for i in windows])
+
+
+def test_rsi_extremes():
+    assert rsi([5.0] * 10, 3).tolist() == [50.0] * 7
+    assert rsi([1.0, 2.0, 3.0, 4.0, 5.0], 2).tolist() == [100.0] * 3
+    assert rsi([5.0, 4.0, 3.0, 2.0, 1.0], 2).tolist() == [0.0] * 3
+
+
+def test_invalid_period_raises():
+    for fn in (sma, ema, rsi, rolling_max):
+        with pytest.raises(ValueError):
+            fn([1.0, 2.0], 0)
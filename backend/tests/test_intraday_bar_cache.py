@@ -0,0 +1,216 @@
+"""Tests for the intraday_bar cache behind `fetch_intraday_bars`."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.db.models import IntradayBar, IntradayBarCoverage
+from app.services import bars as bars_mod
+from app.services.bars import fetch_intraday_bars, missing_ranges, prune_intraday_bars
+from tests.integration_helpers import make_session_factory, make_test_engine, seed_symbol
+
+NOW = datetime(2025, 1, 2, 15, 0, 30, tzinfo=timezone.utc).timestamp()
+
+
+def _dt(hour: int, minute: int) -> datetime:
+    return datetime(2025, 1, 2, hour, minute, tzinfo=timezone.utc)
+
+
+def _raw_minute_bars(start: str, end: str) -> list[dict]:
+    """Alpaca-shaped 1Min bars for every minute in [start, end] (end inclusive)."""
+    first = int(bars_mod.parse_iso_utc(start).timestamp()) // 60 * 60
+    last = int(bars_mod.parse_iso_utc(end).timestamp())
+    return [
+        {
+            "t": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+            "o": 1.0,
+            "h": 2.0,
+            "l": 0.5,
+            "c": 1.5,
+            "v": 100,
+            "vw": 1.2,
+            "n": 3,
+        }
+        for ts in range(first, last + 1, 60)
+    ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # The cache upserts with the Postgres dialect; SQLite's insert has the
+    # same ON CONFLICT API, so swap it in for the in-memory test database.
+    monkeypatch.setattr(bars_mod, "pg_insert", sqlite_insert)
+    monkeypatch.setattr(bars_mod, "time", SimpleNamespace(time=lambda: NOW))
+    session = make_session_factory(make_test_engine())()
+    seed_symbol(session, "AAPL")
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def alpaca_calls(monkeypatch):
+    calls: list[tuple[str, str]] = []
+
+    async def _fetch(ticker, timeframe, start, end, incomplete=None):
+        calls.append((start, end))
+        return _raw_minute_bars(start, end)
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars", _fetch)
+    return calls
+
+
+def test_missing_ranges_skips_covered_windows():
+    covered = [(_dt(10, 5), _dt(10, 10)), (_dt(10, 8), _dt(10, 20)), (_dt(10, 40), _dt(11, 0))]
+
+    assert missing_ranges(covered, _dt(10, 0), _dt(10, 50)) == [
+        (_dt(10, 0), _dt(10, 5)),
+        (_dt(10, 20), _dt(10, 40)),
+    ]
+    assert missing_ranges(covered, _dt(10, 6), _dt(10, 15)) == []
+    assert missing_ranges([], _dt(10, 0), _dt(10, 1)) == [(_dt(10, 0), _dt(10, 1))]
+
+
+async def test_first_load_caches_closed_bars_and_repeat_only_fetches_tail(
+    db, alpaca_calls
+):
+    start, end = "2025-01-02T14:00:00Z", "2025-01-02T15:00:30Z"
+
+    first = await fetch_intraday_bars("AAPL", "1Min", start, end, db=db)
+
+    # Gap [14:00, 14:59) from cache window + the open tail from 14:59.
+    assert len(alpaca_calls) == 2
+    assert len(first) == 61
+    assert db.query(IntradayBar).count() == 59
+    coverage = db.query(IntradayBarCoverage).one()
+    assert coverage.range_end.replace(tzinfo=timezone.utc) == _dt(14, 59)
+
+    alpaca_calls.clear()
+    second = await fetch_intraday_bars("AAPL", "1Min", start, end, db=db)
+
+    assert alpaca_calls == [("2025-01-02T14:59:00+00:00", end)]
+    assert second == first
+
+
+async def test_only_uncovered_window_is_fetched_and_coverage_merges(db, alpaca_calls):
+    await fetch_intraday_bars(
+        "AAPL", "1Min", "2025-01-02T14:30:00Z", "2025-01-02T14:40:00Z", db=db
+    )
+    alpaca_calls.clear()
+
+    bars = await fetch_intraday_bars(
+        "AAPL", "1Min", "2025-01-02T14:00:00Z", "2025-01-02T14:40:00Z", db=db
+    )
+
+    assert alpaca_calls == [("2025-01-02T14:00:00+00:00", "2025-01-02T14:30:00+00:00")]
+    assert len(bars) == 41
+    coverage = db.query(IntradayBarCoverage).one()
+    assert coverage.range_start.replace(tzinfo=timezone.utc) == _dt(14, 0)
+    assert coverage.range_end.replace(tzinfo=timezone.utc) == _dt(14, 41)
+
+
+async def test_higher_timeframes_are_resampled_from_cached_minutes(db, monkeypatch):
+    timeframes: list[str] = []
+
+    async def _fetch(ticker, timeframe, start, end, incomplete=None):
+        timeframes.append(timeframe)
+        return _raw_minute_bars(start, end)
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars", _fetch)
+
+    # 14:02 falls inside the 14:00 bucket, which is still built from 14:00.
+    five = await fetch_intraday_bars(
+        "AAPL", "5Min", "2025-01-02T14:02:00Z", "2025-01-02T14:30:00Z", db=db
+    )
+    assert set(timeframes) == {"1Min"}
+    assert [bar["time"] for bar in five] == [
+        int(_dt(14, minute).timestamp()) for minute in range(0, 31, 5)
+    ]
+    assert five[0]["volume"] == 500
+    assert five[0]["trade_count"] == 15
+
+    timeframes.clear()
+    fifteen = await fetch_intraday_bars(
+        "AAPL", "15Min", "2025-01-02T14:00:00Z", "2025-01-02T14:20:00Z", db=db
+    )
+    assert timeframes == []
+    assert [bar["volume"] for bar in fifteen] == [1500, 1500]
+    assert db.query(IntradayBar).filter(IntradayBar.timeframe != "1Min").count() == 0
+
+
+async def test_resampled_open_bucket_is_partial(db, alpaca_calls):
+    bars = await fetch_intraday_bars(
+        "AAPL", "30Min", "2025-01-02T14:00:00Z", "2025-01-02T15:00:30Z", db=db
+    )
+
+    # NOW is 15:00:30, so the 15:00 bucket holds a single minute so far.
+    assert [bar["volume"] for bar in bars] == [3000, 3000, 100]
+
+
+async def test_long_ranges_fetch_the_timeframe_directly(db, monkeypatch):
+    timeframes: list[str] = []
+
+    async def _fetch(ticker, timeframe, start, end, incomplete=None):
+        timeframes.append(timeframe)
+        return []
+
+    monkeypatch.setattr(bars_mod, "_fetch_alpaca_bars", _fetch)
+    monkeypatch.setattr(bars_mod, "RESAMPLE_MAX_MINUTES", 60)
+
+    await fetch_intraday_bars(
+        "AAPL", "1Hour", "2024-12-30T14:00:00Z", "2025-01-02T14:00:00Z", db=db
+    )
+    assert set(timeframes) == {"1Hour"}
+
+
+async def test_truncated_pagination_only_covers_bars_received(db, monkeypatch):
+    async def _pages(client, headers, base_path, params):
+        # A repeated page token cut the download off after 14:20.
+        raw = _raw_minute_bars(params["start"], "2025-01-02T14:20:00Z")
+        return {"AAPL": raw}, False
+
+    monkeypatch.setattr(bars_mod, "_fetch_bar_pages", _pages)
+
+    bars = await fetch_intraday_bars(
+        "AAPL", "1Min", "2025-01-02T14:00:00Z", "2025-01-02T14:40:00Z", db=db
+    )
+
+    assert len(bars) == 21
+    coverage = db.query(IntradayBarCoverage).one()
+    assert coverage.range_end.replace(tzinfo=timezone.utc) == _dt(14, 21)
+
+
+def test_prune_drops_expired_bars_and_trims_coverage(db, monkeypatch):
+    monkeypatch.setenv("INTRADAY_BAR_RETENTION_DAYS", "1")
+    now = _dt(15, 0) + timedelta(days=1)
+    for hour, minute in ((14, 0), (14, 30), (15, 30)):
+        db.add(
+            IntradayBar(
+                ticker="AAPL",
+                timeframe="1Min",
+                time=_dt(hour, minute),
+                open=1,
+                high=1,
+                low=1,
+                close=1,
+                volume=1,
+            )
+        )
+    for range_start, range_end in ((_dt(10, 0), _dt(11, 0)), (_dt(14, 0), _dt(16, 0))):
+        db.add(
+            IntradayBarCoverage(
+                ticker="AAPL",
+                timeframe="1Min",
+                range_start=range_start,
+                range_end=range_end,
+            )
+        )
+    db.commit()
+
+    assert prune_intraday_bars(db, now=now) == 2
+
+    assert db.query(IntradayBar).count() == 1
+    coverage = db.query(IntradayBarCoverage).one()
+    assert coverage.range_start.replace(tzinfo=timezone.utc) == _dt(15, 0)
+    assert coverage.range_end.replace(tzinfo=timezone.utc) == _dt(16, 0)
@@ -48,6 +48,8 @@ def _mock_lifespan_externals(monkeypatch):
     monkeypatch.setattr(main_mod, "run_strategy_executor", _async_noop)
     monkeypatch.setattr(main_mod, "run_news_loop", _async_noop)
     monkeypatch.setattr(main_mod, "flush_quotes_loop", _async_noop)
+    monkeypatch.setattr(main_mod, "run_tick_rollover_loop", _async_noop)
+    monkeypatch.setattr(main_mod, "run_bar_warming_loop", _async_noop)
     monkeypatch.setattr(symbols_mod, "run_symbol_sync_loop", _async_noop)
 
 
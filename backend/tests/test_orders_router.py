@@ -58,6 +58,10 @@ def session_factory():
     engine.dispose()
 
 
+async def _zero_atr(_ticker, _db):
+    return Decimal("0")
+
+
 # ---------------------------------------------------------------------------
 # IDOR — cross-tenant access must be rejected (Blocker 3)
 # ---------------------------------------------------------------------------
@@ -375,11 +379,9 @@ class TestPlaceDeferredMarketOrder:
         self, session_factory, monkeypatch
     ):
         # Pin ATR to 0 so the reservation math is deterministic. Without this
-        # the compute_atr fallback hits Alpaca synchronously and the rps
-        # depends on whatever bar data the network returns.
-        monkeypatch.setattr(
-            "app.routers.orders.compute_atr", lambda ticker, db: Decimal("0")
-        )
+        # the compute_atr fallback backfills from Alpaca and the rps depends
+        # on whatever bar data the network returns.
+        monkeypatch.setattr("app.routers.orders.compute_atr", _zero_atr)
         with session_factory() as db:
             seed_user(db, "user-a")
             seed_symbol(db, "AAPL")
@@ -448,16 +450,16 @@ class TestPlaceDeferredMarketOrder:
     ):
         """ATR must be computed before the trading_account FOR UPDATE lock.
 
-        compute_atr can fall through to a 10s synchronous Alpaca call when
-        the local DB has no daily bars cached. If that call ran inside the
-        FOR UPDATE block, every other writer on the same trading account
-        would freeze for the full network timeout. This test pins the call
+        compute_atr can fall through to an Alpaca backfill when the local DB
+        has no daily bars cached. If that fetch ran inside the FOR UPDATE
+        block, every other writer on the same trading account would freeze
+        for the full network round trip. This test pins the call
         order via side-effects on compute_atr and validate_order_request
         (the latter only runs after the lock is acquired).
         """
         call_order: list[str] = []
 
-        def fake_atr(_ticker, _db):
+        async def fake_atr(_ticker, _db):
             call_order.append("compute_atr")
             return Decimal("0")
 
@@ -529,9 +531,7 @@ class TestPlaceDeferredMarketOrder:
                 age_seconds=600,
             )
 
-        monkeypatch.setattr(
-            "app.routers.orders.compute_atr", lambda _t, _db: Decimal("0")
-        )
+        monkeypatch.setattr("app.routers.orders.compute_atr", _zero_atr)
         monkeypatch.setattr("app.routers.orders.resolve_quote_or_400", _stale_quote)
 
         with session_factory() as db:
@@ -1185,9 +1185,7 @@ class TestStockMarketHoursGuard:
             "app.routers.orders.is_stock_market_open", lambda _now_et: False
         )
         # Pin ATR so the reservation math doesn't hit Alpaca.
-        monkeypatch.setattr(
-            "app.routers.orders.compute_atr", lambda _ticker, _db: Decimal("0")
-        )
+        monkeypatch.setattr("app.routers.orders.compute_atr", _zero_atr)
         account_id = self._seed_for_market_buy(session_factory)
 
         payload = {
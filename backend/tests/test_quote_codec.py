@@ -0,0 +1,266 @@
+"""Tests for the packed Redis quote format and the format-agnostic accessors
+in `app/services/quote_cache.py`."""
+
+import asyncio
+import random
+import struct
+
+import pytest
+
+from app.services import quote_cache
+from app.services.quote_codec import (
+    MERGE_QUOTE_LUA,
+    QUOTE_CODEC_VERSION,
+    QUOTE_VALUE_FIELDS,
+    decode_quote,
+    encode_quote,
+    merge_quote_args,
+    parse_quote_hash,
+)
+
+FULL_QUOTE = {
+    "price": 190.25,
+    "bid_price": 190.2,
+    "ask_price": 190.3,
+    "volume": 1_234_567.0,
+    "trade_count": 8123,
+    "previous_close": 188.0,
+    "change": 2.25,
+    "change_percent": 1.1968,
+    "timestamp": 1_760_000_000,
+    "source": "alpaca_ws",
+}
+
+
+class FakeBinaryRedis:
+    """Binary client over a store other clients may share. Registered
+    scripts run `MERGE_QUOTE_LUA`'s merge in one step, as Redis would."""
+
+    def __init__(self, values: dict[str, bytes] | None = None) -> None:
+        self.values: dict[str, bytes] = {} if values is None else values
+        self.round_trips = 0
+
+    async def get(self, name):
+        return self.values.get(name)
+
+    async def set(self, name, value, ex=None):
+        self.values[name] = value
+        return True
+
+    def register_script(self, script):
+        assert script == MERGE_QUOTE_LUA
+        return FakeMergeScript(self)
+
+
+class FakeMergeScript:
+    def __init__(self, client: FakeBinaryRedis) -> None:
+        self.registered_client = client
+
+    async def __call__(self, keys, args):
+        client = self.registered_client
+        client.round_trips += 1
+        update, _version, _numeric, keep_current = args
+        (key,) = keys
+        stored = client.values.get(key)
+        current = (decode_quote(stored) if stored else None) or {}
+        incoming = decode_quote(update)
+        merged = {**incoming, **current} if keep_current else {**current, **incoming}
+        client.values[key] = encode_quote(merged)
+        return 1
+
+
+class FakeRedis:
+    def __init__(self, hashes: dict[str, dict[str, str]] | None = None) -> None:
+        self.hashes = hashes or {}
+
+    async def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.hashes):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+    async def delete(self, *names):
+        for name in names:
+            self.hashes.pop(name, None)
+        return len(names)
+
+
+@pytest.fixture
+def packed(monkeypatch):
+    monkeypatch.setenv("QUOTE_REDIS_FORMAT", "packed")
+    binary = FakeBinaryRedis()
+    redis = FakeRedis()
+
+    async def _binary():
+        return binary
+
+    async def _text():
+        return redis
+
+    monkeypatch.setattr(quote_cache, "get_binary_redis", _binary)
+    monkeypatch.setattr(quote_cache, "get_redis", _text)
+    return binary, redis
+
+
+def test_round_trip_preserves_types():
+    decoded = decode_quote(encode_quote(FULL_QUOTE))
+
+    assert decoded == FULL_QUOTE
+    assert isinstance(decoded["timestamp"], int)
+    assert isinstance(decoded["trade_count"], int)
+
+
+def test_absent_fields_are_omitted_and_cost_nothing():
+    raw = encode_quote({"bid_price": 1.5, "ask_price": None, "timestamp": 7})
+
+    assert decode_quote(raw) == {"bid_price": 1.5, "timestamp": 7}
+    assert len(raw) == 5 + 8 + 8
+
+
+def test_unknown_version_and_truncated_values_decode_to_none():
+    raw = encode_quote(FULL_QUOTE)
+
+    assert decode_quote(bytes([QUOTE_CODEC_VERSION + 1]) + raw[1:]) is None
+    assert decode_quote(raw[:10]) is None
+    assert decode_quote(struct.pack("<B", QUOTE_CODEC_VERSION)) is None
+
+
+def test_packed_value_is_smaller_than_hash_payload():
+    hash_fields = {k: str(v) for k, v in FULL_QUOTE.items()}
+    # Field names and string values alone, before any per-entry overhead.
+    hash_bytes = sum(len(k) + len(v) for k, v in hash_fields.items())
+
+    assert len(encode_quote(FULL_QUOTE)) < hash_bytes * 0.6
+
+
+def test_parse_quote_hash_matches_decoded_shape():
+    hash_fields = {k: str(v) for k, v in FULL_QUOTE.items()}
+    hash_fields["bid_size"] = ""
+
+    assert parse_quote_hash(hash_fields) == FULL_QUOTE
+
+
+async def test_packed_merge_keeps_fields_from_earlier_writes(packed):
+    binary, _ = packed
+
+    await quote_cache.merge_quote_fields("AAPL", {"price": 190.0, "source": "alpaca_ws"})
+    await quote_cache.merge_quote_fields("AAPL", {"bid_price": 189.9, "price": None})
+
+    fields = await quote_cache.read_quote_fields("AAPL")
+    assert fields == {"price": 190.0, "bid_price": 189.9, "source": "alpaca_ws"}
+    assert list(binary.values) == ["quotepk:AAPL"]
+
+
+async def test_concurrent_packed_writers_keep_each_others_fields(packed, monkeypatch):
+    binary, _ = packed
+    # Two clients (say the feed and an API worker) over the same store.
+    other = FakeBinaryRedis(binary.values)
+    clients = iter([binary, other])
+
+    async def _next_client():
+        return next(clients)
+
+    monkeypatch.setattr(quote_cache, "get_binary_redis", _next_client)
+
+    await asyncio.gather(
+        quote_cache.merge_quote_fields("AAPL", {"price": 190.0}),
+        quote_cache.merge_quote_fields("AAPL", {"bid_price": 189.9}),
+    )
+
+    assert decode_quote(binary.values["quotepk:AAPL"]) == {
+        "price": 190.0,
+        "bid_price": 189.9,
+    }
+    # One server-side merge per write, no read-modify-write from here.
+    assert binary.round_trips == other.round_trips == 1
+
+
+def _random_quote(rng: random.Random) -> dict:
+    fields = {}
+    for name in QUOTE_VALUE_FIELDS:
+        if rng.random() < 0.5:
+            continue
+        if name == "source":
+            fields[name] = rng.choice(["alpaca_ws", "alpaca_rest", "é" * 200])
+        elif name in ("trade_count", "timestamp"):
+            fields[name] = rng.randrange(-(2**40), 2**40)
+        else:
+            fields[name] = rng.uniform(-1e6, 1e6)
+    return fields
+
+
+def test_merge_script_matches_the_codec():
+    # Redis embeds Lua 5.1.
+    lupa = pytest.importorskip("lupa.lua51")
+    lua = lupa.LuaRuntime(encoding=None)
+    store: dict[bytes, bytes] = {}
+
+    def _call(command, key, value=None):
+        if command == b"GET":
+            return store.get(key, False)
+        store[key] = value
+        return b"OK"
+
+    run = lua.eval(
+        "function(script, call, keys, argv)"
+        " local env = setmetatable({redis = {call = call}, KEYS = keys, ARGV = argv},"
+        " {__index = _G})"
+        " local chunk = loadstring(script)"
+        " setfenv(chunk, env)"
+        " return chunk() end"
+    )
+    rng = random.Random(7)
+    for _ in range(300):
+        current, update = _random_quote(rng), _random_quote(rng)
+        keep_current = rng.random() < 0.5
+        if current or rng.random() < 0.8:
+            store[b"k"] = encode_quote(current)
+        else:
+            store.pop(b"k", None)
+        args = [
+            str(arg).encode() if not isinstance(arg, bytes) else arg
+            for arg in merge_quote_args(encode_quote(update), keep_current=keep_current)
+        ]
+        run(
+            MERGE_QUOTE_LUA.encode(),
+            _call,
+            lua.table(b"k"),
+            lua.table(*args),
+        )
+        expected = {**update, **current} if keep_current else {**current, **update}
+        assert store[b"k"] == encode_quote(expected)
+
+
+async def test_quote_format_is_resolved_once(packed, monkeypatch):
+    assert quote_cache.packed_quotes_enabled()
+
+    def _unexpected():
+        raise AssertionError("get_config called on the quote path")
+
+    monkeypatch.setattr(quote_cache, "get_config", _unexpected)
+    await quote_cache.merge_quote_fields("AAPL", {"price": 190.0})
+
+    assert await quote_cache.read_quote_field("AAPL", "price") == 190.0
+
+
+async def test_packed_read_falls_back_to_legacy_hash(packed):
+    _, redis = packed
+    redis.hashes["quote:MSFT"] = {"price": "410.5", "timestamp": "100"}
+
+    assert await quote_cache.read_quote_field("MSFT", "price") == 410.5
+
+
+async def test_migrate_hash_quotes_prefers_newer_packed_fields(packed):
+    binary, redis = packed
+    redis.hashes["quote:AAPL"] = {"price": "180.0", "previous_close": "178.0"}
+    await quote_cache.merge_quote_fields("AAPL", {"price": 190.0})
+
+    assert await quote_cache.migrate_hash_quotes() == 1
+
+    assert redis.hashes == {}
+    assert decode_quote(binary.values["quotepk:AAPL"]) == {
+        "price": 190.0,
+        "previous_close": 178.0,
+    }
@@ -0,0 +1,164 @@
+"""Tests for the change-aware quote flusher in `app/ws/flush.py`."""
+
+import pytest
+
+from app.config import Config
+from app.ws import flush as flush_mod
+from app.ws.flush import FlushResult, flush_once, next_flush_interval
+
+
+class FakeRedis:
+    def __init__(self, quotes: dict[str, dict[str, str]]) -> None:
+        self.quotes = quotes
+        self.dirty: set[str] = set()
+
+    def mark_dirty(self, *tickers: str) -> None:
+        self.dirty.update(tickers)
+
+    async def spop(self, name: str) -> str | None:
+        return self.dirty.pop() if self.dirty else None
+
+    async def hgetall(self, name: str) -> dict[str, str]:
+        return dict(self.quotes.get(name.removeprefix("quote:"), {}))
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis(
+        {
+            "AAPL": {"price": "190.5", "timestamp": "1000", "source": "alpaca_ws"},
+            "MSFT": {"price": "410.0", "timestamp": "1000", "source": "alpaca_ws"},
+        }
+    )
+
+    async def _get_redis():
+        return redis
+
+    monkeypatch.setattr(flush_mod, "get_redis", _get_redis)
+    monkeypatch.setattr(flush_mod, "_last_flushed", {})
+    monkeypatch.setattr(flush_mod, "_stats", flush_mod.FlushStats())
+    return redis
+
+
+@pytest.fixture
+def written(monkeypatch):
+    batches: list[list[dict]] = []
+
+    def _write(rows):
+        batches.append(rows)
+        return True
+
+    monkeypatch.setattr(flush_mod, "_write_rows", _write)
+    return batches
+
+
+async def test_first_flush_writes_every_dirty_row(fake_redis, written):
+    fake_redis.mark_dirty("AAPL", "MSFT")
+
+    result = await flush_once()
+
+    assert result.written == 2
+    assert result.skipped == 0
+    assert sorted(row["ticker"] for row in written[0]) == ["AAPL", "MSFT"]
+
+
+async def test_unchanged_rows_are_skipped(fake_redis, written):
+    fake_redis.mark_dirty("AAPL", "MSFT")
+    await flush_once()
+
+    # AAPL only gets a timestamp bump; MSFT actually moves.
+    fake_redis.quotes["AAPL"]["timestamp"] = "1005"
+    fake_redis.quotes["MSFT"]["price"] = "411.0"
+    fake_redis.mark_dirty("AAPL", "MSFT")
+    result = await flush_once()
+
+    assert result.written == 1
+    assert result.skipped == 1
+    assert [row["ticker"] for row in written[1]] == ["MSFT"]
+    stats = flush_mod.get_flush_stats().as_dict()
+    assert stats["rows_written"] == 3
+    assert stats["rows_skipped"] == 1
+
+
+async def test_unchanged_row_is_rewritten_once_persisted_timestamp_ages(
+    fake_redis, written
+):
+    fake_redis.mark_dirty("AAPL")
+    await flush_once()
+
+    fake_redis.quotes["AAPL"]["timestamp"] = "1045"  # staleness 60 -> refresh at 30s
+    fake_redis.mark_dirty("AAPL")
+    result = await flush_once()
+
+    assert result.written == 1
+    assert written[1][0]["timestamp"] == 1045
+
+
+async def test_refresh_age_stretches_with_the_flush_interval(fake_redis, written):
+    fake_redis.mark_dirty("AAPL")
+    await flush_once(interval=20)
+
+    # Past staleness/2, but two 20s intervals fit before the 60s window.
+    fake_redis.quotes["AAPL"]["timestamp"] = "1035"
+    fake_redis.mark_dirty("AAPL")
+    assert (await flush_once(interval=20)).skipped == 1
+
+    fake_redis.quotes["AAPL"]["timestamp"] = "1040"
+    fake_redis.mark_dirty("AAPL")
+    result = await flush_once(interval=20)
+
+    assert result.written == 1
+    assert written[1][0]["timestamp"] == 1040
+
+
+async def test_long_interval_never_leaves_a_row_past_staleness(fake_redis, written):
+    fake_redis.mark_dirty("AAPL")
+    await flush_once(interval=120)
+
+    # The next flush is 120s away, beyond the 60s staleness window.
+    fake_redis.quotes["AAPL"]["timestamp"] = "1010"
+    fake_redis.mark_dirty("AAPL")
+    result = await flush_once(interval=120)
+
+    assert result.written == 1
+
+
+async def test_failed_write_does_not_update_digest(fake_redis, monkeypatch):
+    monkeypatch.setattr(flush_mod, "_write_rows", lambda rows: False)
+    fake_redis.mark_dirty("AAPL")
+    await flush_once()
+
+    assert "AAPL" not in flush_mod._last_flushed
+
+
+def test_interval_backs_off_on_slow_writes():
+    config = Config(quote_flush_interval=30, quote_flush_max_interval=120)
+    result = FlushResult(dirty=500, written=500, write_seconds=2.0)
+    assert next_flush_interval(30, result, config) == 60
+
+
+def test_interval_shortens_for_large_dirty_set_and_respects_floor():
+    config = Config(quote_flush_interval=30, quote_flush_min_interval=5)
+    result = FlushResult(dirty=500, written=500, write_seconds=0.05)
+    assert next_flush_interval(30, result, config) == 15
+    assert next_flush_interval(6, result, config) == 5
+
+
+def test_interval_lengthens_when_idle_and_drifts_back_to_base():
+    config = Config(quote_flush_interval=30, quote_flush_max_interval=120)
+    assert next_flush_interval(30, FlushResult(), config) == 45
+    assert next_flush_interval(100, FlushResult(), config) == 120
+    busy = FlushResult(dirty=10, written=10, write_seconds=0.01)
+    assert next_flush_interval(10, busy, config) == 20
+
+
+def test_interval_stays_inside_the_staleness_window_while_ticking():
+    config = Config(
+        quote_flush_interval=30, quote_flush_max_interval=120, quote_staleness_seconds=60
+    )
+    busy = FlushResult(dirty=10, written=10, write_seconds=0.01)
+    assert next_flush_interval(120, busy, config) == 20
+    # Idle flushes may still stretch out; slow writes still back off.
+    assert next_flush_interval(100, FlushResult(), config) == 120
+    slow = FlushResult(dirty=10, written=10, write_seconds=2.0)
+    assert next_flush_interval(30, slow, config) == 60
@@ -0,0 +1,56 @@
+"""Tests for the set-based warm-cache upsert in `app/services/quote_cache.py`."""
+
+from unittest.mock import MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.quote_record import QuoteRecord
+from app.services.quote_cache import persist_quote, persist_quotes
+
+
+def _compiled(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_persist_quote_issues_single_upsert_without_select():
+    db = MagicMock()
+
+    persist_quote(QuoteRecord(ticker="AAPL", price=190.0), db=db)
+
+    db.query.assert_not_called()
+    db.execute.assert_called_once()
+    db.commit.assert_called_once()
+    sql = _compiled(db.execute.call_args.args[0])
+    assert sql.startswith("INSERT INTO quote")
+    assert "ON CONFLICT (ticker) DO UPDATE SET" in sql
+    assert "previous_close = excluded.previous_close" in sql
+    assert "updated_at = now()" in sql
+
+
+def test_persist_quotes_writes_all_tickers_in_one_statement():
+    db = MagicMock()
+
+    persist_quotes(
+        [
+            QuoteRecord(ticker="AAPL", price=190.0),
+            QuoteRecord(ticker="MSFT", price=410.0),
+            QuoteRecord(ticker="AAPL", price=191.0),
+        ],
+        db=db,
+    )
+
+    db.execute.assert_called_once()
+    params = db.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params
+    tickers = sorted(v for k, v in params.items() if k.startswith("ticker"))
+    prices = sorted(v for k, v in params.items() if k.startswith("price"))
+    assert tickers == ["AAPL", "MSFT"]
+    assert prices == [191.0, 410.0]
+
+
+def test_persist_quotes_with_nothing_to_write_is_a_noop():
+    db = MagicMock()
+
+    persist_quotes([], db=db)
+
+    db.execute.assert_not_called()
+    db.commit.assert_not_called()
@@ -0,0 +1,32 @@
+"""Tests for the internal `QuoteRecord` and its API-boundary conversions."""
+
+from app.schemas import QuoteData, QuoteResponse
+from app.services.quote_record import QUOTE_RECORD_FIELDS, QuoteRecord
+
+
+def test_record_fields_mirror_quote_data():
+    # Drift guard: Redis, Postgres and the API all key off the same names.
+    assert QUOTE_RECORD_FIELDS == tuple(QuoteData.model_fields)
+
+
+def test_from_fields_and_as_dict_round_trip():
+    record = QuoteRecord.from_fields("AAPL", {"price": 190.5, "timestamp": 1700000000})
+
+    assert record.as_dict()["ticker"] == "AAPL"
+    assert record.as_dict(skip_none=True) == {
+        "ticker": "AAPL",
+        "price": 190.5,
+        "timestamp": 1700000000,
+    }
+
+
+def test_boundary_conversion_matches_pydantic_model():
+    record = QuoteRecord("MSFT", price=410.0, bid_price=409.9, source="alpaca_ws")
+
+    assert record.to_quote_data() == QuoteData(
+        ticker="MSFT", price=410.0, bid_price=409.9, source="alpaca_ws"
+    )
+    response = record.to_response(cached=True, cache_layer="redis", age_seconds=3)
+    assert isinstance(response, QuoteResponse)
+    assert response.model_dump()["cache_layer"] == "redis"
+    assert response.price == 410.0
@@ -17,7 +17,7 @@ from fastapi.testclient import TestClient
 
 from app.auth import get_current_user
 from app.main import app
-from app.schemas import QuoteData
+from app.services.quote_record import QuoteRecord
 
 client = TestClient(app)
 
@@ -31,8 +31,8 @@ def auth_override():
         app.dependency_overrides.pop(get_current_user, None)
 
 
-def _full_quote(ticker: str = "AAPL") -> QuoteData:
-    return QuoteData(
+def _full_quote(ticker: str = "AAPL") -> QuoteRecord:
+    return QuoteRecord(
         ticker=ticker,
         price=100.5,
         bid_price=100.4,
@@ -42,9 +42,9 @@ def _full_quote(ticker: str = "AAPL") -> QuoteData:
     )
 
 
-def _quote_only(ticker: str = "AAPL") -> QuoteData:
+def _quote_only(ticker: str = "AAPL") -> QuoteRecord:
     """Mimics what `_handle_quote_tick` leaves in Redis between trades."""
-    return QuoteData(
+    return QuoteRecord(
         ticker=ticker,
         bid_price=100.4,
         ask_price=100.6,
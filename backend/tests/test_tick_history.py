@@ -0,0 +1,214 @@
+"""Tests for the Redis tick streams and their rollover into `tick_minute`."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.tick_history import Tick, aggregate_minutes, parse_tick_entries
+from app.tasks import tick_rollover as rollover_mod
+from app.tasks.tick_rollover import TICK_CURSOR_KEY, rollover_once
+
+MINUTE_MS = 60_000
+T0 = 1_700_000_040_000  # a minute boundary
+
+
+def _id_key(entry_id: str, *, upper: bool) -> tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    if seq:
+        return int(ms), int(seq)
+    return int(ms), (2**63 if upper else 0)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.streams: dict[str, list[tuple[str, dict[str, str]]]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    def add(self, ticker: str, ts_ms: int, price: float, size: float = 1) -> None:
+        entries = self.streams.setdefault(f"ticks:{ticker}", [])
+        seq = sum(1 for entry_id, _ in entries if entry_id.startswith(f"{ts_ms}-"))
+        entries.append((f"{ts_ms}-{seq}", {"p": str(price), "s": str(size)}))
+
+    async def scan_iter(self, match=None, count=None):
+        for key in [*self.streams, *self.hashes]:
+            if match is None or key.startswith(match.rstrip("*")):
+                yield key
+
+    async def xrange(self, name, min="-", max="+", count=None):
+        lower_exclusive = min.startswith("(")
+        lower = None if min == "-" else _id_key(min.lstrip("("), upper=False)
+        upper = None if max == "+" else _id_key(max, upper=True)
+        out = []
+        for entry_id, fields in self.streams.get(name, []):
+            key = _id_key(entry_id, upper=False)
+            if lower is not None and (key < lower or (lower_exclusive and key == lower)):
+                continue
+            if upper is not None and key > upper:
+                continue
+            out.append((entry_id, dict(fields)))
+        return out
+
+    async def xtrim(self, name, maxlen=None, approximate=True, minid=None):
+        entries = self.streams.get(name, [])
+        kept = [e for e in entries if int(e[0].split("-")[0]) >= int(minid)]
+        self.streams[name] = kept
+        return len(entries) - len(kept)
+
+    async def hget(self, name, key):
+        return self.hashes.get(name, {}).get(key)
+
+    async def hset(self, name, key=None, value=None, mapping=None, items=None):
+        self.hashes.setdefault(name, {})[key] = value
+        return 1
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    redis = FakeRedis()
+
+    async def _get_redis():
+        return redis
+
+    monkeypatch.setattr(rollover_mod, "get_redis", _get_redis)
+    return redis
+
+
+@pytest.fixture
+def written(monkeypatch):
+    batches: list[list[dict]] = []
+
+    def _write(rows, now):
+        batches.append(rows)
+        return True
+
+    monkeypatch.setattr(rollover_mod, "_write_minutes", _write)
+    return batches
+
+
+def test_aggregate_minutes_builds_ohlcv_per_minute():
+    ticks = [
+        Tick(T0 + 1_000, 10.0, 5),
+        Tick(T0 + 20_000, 12.0, 1),
+        Tick(T0 + 40_000, 9.5, None),
+        Tick(T0 + 59_999, 11.0, 2),
+        Tick(T0 + MINUTE_MS, 11.5, 3),
+    ]
+
+    rows = aggregate_minutes("AAPL", ticks)
+
+    assert len(rows) == 2
+    first, second = rows
+    assert first["minute"] == datetime.fromtimestamp(T0 / 1000, tz=timezone.utc)
+    assert (first["open"], first["high"], first["low"], first["close"]) == (
+        10.0,
+        12.0,
+        9.5,
+        11.0,
+    )
+    assert first["volume"] == 8.0
+    assert first["tick_count"] == 4
+    assert second["open"] == second["close"] == 11.5
+
+
+def test_parse_tick_entries_skips_malformed_entries():
+    ticks = parse_tick_entries(
+        [("1-0", {"p": "1.5", "s": "10"}), ("2-0", {"s": "3"}), ("3-0", {"p": "x"})]
+    )
+    assert ticks == [Tick(1, 1.5, 10.0)]
+
+
+async def test_rollover_writes_only_closed_minutes_and_advances_cursor(
+    fake_redis, written
+):
+    fake_redis.add("AAPL", T0 + 1_000, 10.0)
+    fake_redis.add("AAPL", T0 + 2_000, 10.5)
+    fake_redis.add("AAPL", T0 + MINUTE_MS + 500, 11.0)  # still-open minute
+    now = (T0 + MINUTE_MS + 10_000) / 1000
+
+    assert await rollover_once(now=now) == 1
+    assert written[0][0]["tick_count"] == 2
+    assert fake_redis.hashes[TICK_CURSOR_KEY]["AAPL"] == f"{T0 + 2_000}-0"
+
+    # Next pass picks up the minute that has since closed, and nothing twice.
+    assert await rollover_once(now=now + 60) == 1
+    assert written[1][0]["close"] == 11.0
+    assert written[1][0]["tick_count"] == 1
+
+
+@pytest.fixture
+def table(monkeypatch):
+    """A stand-in for ``tick_minute`` with the upsert's replace semantics."""
+    rows: dict[tuple[str, datetime], dict] = {}
+
+    def _write(batch, now):
+        for row in batch:
+            rows[(row["ticker"], row["minute"])] = row
+        return True
+
+    monkeypatch.setattr(rollover_mod, "_write_minutes", _write)
+    return rows
+
+
+async def test_replay_after_a_lost_cursor_rewrites_the_same_rows(fake_redis, table):
+    fake_redis.add("AAPL", T0 + 1_000, 10.0, 5)
+    fake_redis.add("AAPL", T0 + 2_000, 10.5, 3)
+    fake_redis.add("AAPL", T0 + MINUTE_MS + 500, 11.0, 2)
+    now = (T0 + 2 * MINUTE_MS + 10_000) / 1000
+
+    assert await rollover_once(now=now) == 2
+    committed = {key: dict(row) for key, row in table.items()}
+    # Crash after the Postgres commit, before the cursor reached Redis.
+    del fake_redis.hashes[TICK_CURSOR_KEY]
+
+    assert await rollover_once(now=now) == 2
+    assert table == committed
+    assert sum(row["volume"] for row in table.values()) == 10.0
+
+
+async def test_replay_from_a_stale_cursor_rebuilds_whole_minutes(fake_redis, table):
+    fake_redis.add("AAPL", T0 + 1_000, 10.0, 5)
+    fake_redis.add("AAPL", T0 + 2_000, 10.5, 3)
+    now = (T0 + MINUTE_MS + 10_000) / 1000
+    await rollover_once(now=now)
+    # The cursor only got as far as the first tick of the minute.
+    fake_redis.hashes[TICK_CURSOR_KEY]["AAPL"] = f"{T0 + 1_000}-0"
+
+    assert await rollover_once(now=now) == 1
+    (row,) = table.values()
+    assert (row["volume"], row["tick_count"]) == (8.0, 2)
+
+
+async def test_tick_straddling_two_passes_joins_its_minute(fake_redis, table):
+    fake_redis.add("AAPL", T0 + 1_000, 10.0, 5)
+    await rollover_once(now=(T0 + MINUTE_MS + 10_000) / 1000)
+    # A tick whose id landed just before the boundary after that pass ran.
+    fake_redis.add("AAPL", T0 + 59_000, 12.0, 1)
+
+    assert await rollover_once(now=(T0 + MINUTE_MS + 20_000) / 1000) == 1
+    (row,) = table.values()
+    assert (row["open"], row["high"], row["close"]) == (10.0, 12.0, 12.0)
+    assert (row["volume"], row["tick_count"]) == (6.0, 2)
+    # Nothing new since: the next pass writes nothing.
+    assert await rollover_once(now=(T0 + MINUTE_MS + 30_000) / 1000) == 0
+
+
+async def test_rollover_trims_to_retention_but_not_past_cursor(
+    fake_redis, written, monkeypatch
+):
+    monkeypatch.setenv("TICK_HISTORY_RETENTION_SECONDS", "60")
+    fake_redis.add("AAPL", T0, 10.0)
+    fake_redis.add("AAPL", T0 + 3 * MINUTE_MS, 11.0)
+
+    await rollover_once(now=(T0 + 4 * MINUTE_MS + 10_000) / 1000)
+
+    remaining = [entry_id for entry_id, _ in fake_redis.streams["ticks:AAPL"]]
+    assert remaining == [f"{T0 + 3 * MINUTE_MS}-0"]
+
+
+async def test_failed_write_keeps_cursor_and_stream(fake_redis, monkeypatch):
+    monkeypatch.setattr(rollover_mod, "_write_minutes", lambda rows, now: False)
+    fake_redis.add("AAPL", T0, 10.0)
+
+    assert await rollover_once(now=(T0 + 2 * MINUTE_MS) / 1000) == 0
+    assert TICK_CURSOR_KEY not in fake_redis.hashes
+    assert len(fake_redis.streams["ticks:AAPL"]) == 1
@@ -0,0 +1,197 @@
+"""Tests for walk-forward optimization and its endpoint."""
+
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import strategies as strategies_router
+from app.routers.strategies import BacktestWalkForwardRequest, walk_forward_strategy
+from app.services import backtest_sweep
+from app.services.backtest_sweep import expand_param_grid, run_param_sweep
+from app.services.bar_store import refresh_bar_store
+from app.services.strategy_engine import run_backtest
+from app.services.walk_forward import (
+    WalkForwardWindow,
+    run_walk_forward,
+    walk_forward_windows,
+)
+from tests.integration_helpers import (
+    make_session_factory,
+    make_test_engine,
+    seed_bar_universe,
+)
+
+SYMBOLS = ["AAA", "BBB"]
+FIRST_DAY = date(2024, 1, 1)
+RISK = {"max_position_quantity": "30", "max_daily_orders": 3}
+COMBINATIONS = expand_param_grid(
+    {"order_quantity": "2"}, {"fast_period": [3, 6], "slow_period": [12, 24]}
+)
+
+
+@pytest.fixture
+def db():
+    engine = make_test_engine()
+    session = make_session_factory(engine)()
+    seed_bar_universe(session, SYMBOLS, first_day=FIRST_DAY, days=400, seed=11)
+    refresh_bar_store(session, SYMBOLS)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _utc(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _walk_forward() -> dict:
+    return run_walk_forward(
+        symbols=SYMBOLS,
+        strategy_type="ema_crossover",
+        combinations=COMBINATIONS,
+        risk_json=RISK,
+        capital_allocation=Decimal("5000"),
+        windows=walk_forward_windows(date(2024, 3, 1), date(2025, 1, 20), 120, 60),
+        metric="total_return",
+    )
+
+
+def test_windows_roll_by_the_out_of_sample_length():
+    windows = walk_forward_windows(date(2024, 1, 1), date(2024, 2, 15), 30, 10)
+
+    assert windows[0] == WalkForwardWindow(
+        in_sample_start=date(2024, 1, 1),
+        in_sample_end=date(2024, 1, 30),
+        out_of_sample_start=date(2024, 1, 31),
+        out_of_sample_end=date(2024, 2, 9),
+    )
+    assert windows[1].out_of_sample_start == date(2024, 2, 10)
+    # The last out-of-sample span is cut at the end of the range.
+    assert windows[-1].out_of_sample_end == date(2024, 2, 15)
+    assert len(windows) == 2
+    assert walk_forward_windows(date(2024, 1, 1), date(2024, 1, 30), 30, 10) == []
+
+
+def test_each_window_trades_the_in_sample_winner_out_of_sample(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+
+    result = _walk_forward()
+
+    segments = result["segments"]
+    assert len(segments) == 4
+    equity = Decimal("5000")
+    trades = []
+    for segment in segments:
+        window = segment.window
+        best = run_param_sweep(
+            symbols=SYMBOLS,
+            strategy_type="ema_crossover",
+            combinations=COMBINATIONS,
+            risk_json=RISK,
+            capital_allocation=Decimal("5000"),
+            start=window.in_sample_start,
+            end=window.in_sample_end,
+            metric="total_return",
+        )[0]
+        assert segment.in_sample == best
+
+        expected = run_backtest(
+            db=db,
+            strategy_type="ema_crossover",
+            symbols=SYMBOLS,
+            timeframe="1Day",
+            params_json=best.params_json,
+            risk_json=RISK,
+            capital_allocation=equity,
+            start=_utc(window.out_of_sample_start),
+            end=_utc(window.out_of_sample_end),
+        )
+        assert segment.out_of_sample.ending_equity == Decimal(expected["ending_equity"])
+        trades.extend(expected["trades"])
+        equity = Decimal(expected["ending_equity"])
+
+    assert result["trades"] == trades
+    assert result["ending_equity"] == str(equity)
+    assert result["equity_curve"][-1]["equity"] == equity
+    times = [point["time"] for point in result["equity_curve"]]
+    assert times == sorted(set(times))
+    assert result["max_drawdown"] <= 0
+
+
+def test_float64_walk_forward_reports_decimal_winners(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    exact = _walk_forward()
+
+    fast = run_walk_forward(
+        symbols=SYMBOLS,
+        strategy_type="ema_crossover",
+        combinations=COMBINATIONS,
+        risk_json=RISK,
+        capital_allocation=Decimal("5000"),
+        windows=walk_forward_windows(date(2024, 3, 1), date(2025, 1, 20), 120, 60),
+        metric="total_return",
+        precision="float64",
+    )
+
+    for segment, expected in zip(fast["segments"], exact["segments"]):
+        assert segment.reconciliation.within_tolerance
+        assert segment.in_sample == expected.in_sample
+        assert segment.reconciliation.exact == expected.in_sample
+    assert fast["trades"] == exact["trades"]
+    assert fast["ending_equity"] == exact["ending_equity"]
+
+
+def test_pooled_walk_forward_matches_in_process(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    in_process = _walk_forward()
+
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "2")
+    try:
+        pooled = _walk_forward()
+    finally:
+        backtest_sweep.shutdown_sweep_pool()
+
+    assert pooled == in_process
+
+
+def _request(**overrides) -> BacktestWalkForwardRequest:
+    fields = dict(
+        ticker="AAA",
+        symbols_json=["BBB"],
+        params_json={"order_quantity": "2"},
+        risk_json=RISK,
+        capital_allocation="5000",
+        param_grid={"fast_period": [3, 6], "slow_period": [12, 24]},
+        in_sample_days=120,
+        out_of_sample_days=60,
+        start="2024-03-01T00:00:00Z",
+        end="2025-01-20T00:00:00Z",
+    )
+    return BacktestWalkForwardRequest(**{**fields, **overrides})
+
+
+async def test_walk_forward_endpoint(db, monkeypatch):
+    monkeypatch.setenv("BACKTEST_SWEEP_WORKERS", "1")
+    monkeypatch.setattr(
+        strategies_router,
+        "_ensure_backtest_symbols_and_history",
+        AsyncMock(return_value=[]),
+    )
+
+    response = await walk_forward_strategy(_request(), user={"sub": "dev"}, db=db)
+
+    assert response.combinations == 4
+    assert len(response.windows) == 4
+    assert response.windows[0].out_of_sample_start == "2024-06-29"
+    assert response.ending_equity == response.equity_curve[-1].equity
+
+
+async def test_walk_forward_endpoint_rejects_range_shorter_than_a_window(db):
+    with pytest.raises(HTTPException) as exc:
+        await walk_forward_strategy(
+            _request(end="2024-05-01T00:00:00Z"), user={"sub": "dev"}, db=db
+        )
+    assert exc.value.status_code == 400
@@ -161,10 +161,10 @@ class TestSnapshotOnSubscribe:
         fake_manager.get_ws_tickers.return_value = accepted
 
     def test_sends_snapshot_after_subscribe_ack(self, fake_manager, monkeypatch):
-        from app.schemas import QuoteData
+        from app.services.quote_record import QuoteRecord
 
         async def fake_read(ticker):
-            return QuoteData(
+            return QuoteRecord(
                 ticker=ticker,
                 price=100.5,
                 bid_price=100.4,
@@ -204,10 +204,10 @@ class TestSnapshotOnSubscribe:
         assert ack["type"] == "subscribed"
 
     def test_snapshot_omits_none_fields(self, fake_manager, monkeypatch):
-        from app.schemas import QuoteData
+        from app.services.quote_record import QuoteRecord
 
         async def fake_read(ticker):
-            return QuoteData(
+            return QuoteRecord(
                 ticker=ticker,
                 bid_price=100.4,
                 ask_price=100.6,
@@ -233,10 +233,10 @@ class TestSnapshotOnSubscribe:
         assert data["ask_price"] == 100.6
 
     def test_snapshot_only_for_accepted_tickers(self, fake_manager, monkeypatch):
-        from app.schemas import QuoteData
+        from app.services.quote_record import QuoteRecord
 
         async def fake_read(ticker):
-            return QuoteData(ticker=ticker, price=1.0, timestamp=1700000000)
+            return QuoteRecord(ticker=ticker, price=1.0, timestamp=1700000000)
 
         monkeypatch.setattr(ws_router, "read_redis", fake_read)
         # Manager accepted AAPL but dropped MSFT (e.g. per-connection cap).
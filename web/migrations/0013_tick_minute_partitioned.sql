@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS "tick_minute" (
+	"ticker" text NOT NULL,
+	"minute" timestamp with time zone NOT NULL,
+	"open" double precision NOT NULL,
+	"high" double precision NOT NULL,
+	"low" double precision NOT NULL,
+	"close" double precision NOT NULL,
+	"volume" double precision DEFAULT 0 NOT NULL,
+	"tick_count" integer DEFAULT 0 NOT NULL,
+	CONSTRAINT "tick_minute_ticker_minute_pk" PRIMARY KEY("ticker","minute")
+) PARTITION BY RANGE ("minute");
@@ -0,0 +1,26 @@
+CREATE TABLE IF NOT EXISTS "intraday_bar" (
+	"ticker" text NOT NULL,
+	"timeframe" text NOT NULL,
+	"time" timestamp with time zone NOT NULL,
+	"open" double precision NOT NULL,
+	"high" double precision NOT NULL,
+	"low" double precision NOT NULL,
+	"close" double precision NOT NULL,
+	"volume" double precision NOT NULL,
+	"trade_count" integer,
+	"vwap" double precision,
+	CONSTRAINT "intraday_bar_ticker_timeframe_time_pk" PRIMARY KEY("ticker","timeframe","time")
+);
+--> statement-breakpoint
+CREATE TABLE IF NOT EXISTS "intraday_bar_coverage" (
+	"id" serial PRIMARY KEY NOT NULL,
+	"ticker" text NOT NULL,
+	"timeframe" text NOT NULL,
+	"range_start" timestamp with time zone NOT NULL,
+	"range_end" timestamp with time zone NOT NULL
+);
+--> statement-breakpoint
+DO $$ BEGIN ALTER TABLE "intraday_bar" ADD CONSTRAINT "intraday_bar_ticker_symbol_ticker_fk" FOREIGN KEY ("ticker") REFERENCES "public"."symbol"("ticker") ON DELETE cascade ON UPDATE no action; EXCEPTION WHEN duplicate_object THEN NULL; END $$;--> statement-breakpoint
+DO $$ BEGIN ALTER TABLE "intraday_bar_coverage" ADD CONSTRAINT "intraday_bar_coverage_ticker_symbol_ticker_fk" FOREIGN KEY ("ticker") REFERENCES "public"."symbol"("ticker") ON DELETE cascade ON UPDATE no action; EXCEPTION WHEN duplicate_object THEN NULL; END $$;--> statement-breakpoint
+CREATE INDEX IF NOT EXISTS "intraday_bar_time_idx" ON "intraday_bar" USING btree ("time");--> statement-breakpoint
+CREATE INDEX IF NOT EXISTS "intraday_bar_coverage_ticker_timeframe_idx" ON "intraday_bar_coverage" USING btree ("ticker","timeframe");
@@ -0,0 +1,41 @@
+CREATE TABLE IF NOT EXISTS "daily_bar_rollup" (
+	"ticker" text NOT NULL,
+	"timeframe" text NOT NULL,
+	"period_start" date NOT NULL,
+	"open" double precision NOT NULL,
+	"high" double precision NOT NULL,
+	"low" double precision NOT NULL,
+	"close" double precision NOT NULL,
+	"volume" double precision NOT NULL,
+	"trade_count" integer,
+	"vwap" double precision,
+	CONSTRAINT "daily_bar_rollup_ticker_timeframe_period_start_pk" PRIMARY KEY("ticker","timeframe","period_start")
+);
+--> statement-breakpoint
+DO $$ BEGIN ALTER TABLE "daily_bar_rollup" ADD CONSTRAINT "daily_bar_rollup_ticker_symbol_ticker_fk" FOREIGN KEY ("ticker") REFERENCES "public"."symbol"("ticker") ON DELETE cascade ON UPDATE no action; EXCEPTION WHEN duplicate_object THEN NULL; END $$;--> statement-breakpoint
+INSERT INTO "daily_bar_rollup" ("ticker", "timeframe", "period_start", "open", "high", "low", "close", "volume", "trade_count", "vwap")
+SELECT
+	"ticker",
+	"timeframe",
+	"period_start",
+	(array_agg("open" ORDER BY "date"))[1],
+	MAX("high"),
+	MIN("low"),
+	(array_agg("close" ORDER BY "date" DESC))[1],
+	SUM("volume"),
+	SUM("trade_count"),
+	SUM("vwap" * "volume") / NULLIF(SUM("volume"), 0)
+FROM (
+	SELECT b.*, p."timeframe", p."period_start"
+	FROM "daily_bar" b
+	CROSS JOIN LATERAL (
+		VALUES
+			('1Week', date_trunc('week', b."date")::date),
+			('1Month', date_trunc('month', b."date")::date),
+			('3Month', date_trunc('quarter', b."date")::date),
+			('6Month', (date_trunc('year', b."date") + INTERVAL '6 months' * FLOOR((EXTRACT(month FROM b."date")::int - 1) / 6))::date),
+			('1Year', date_trunc('year', b."date")::date)
+	) AS p("timeframe", "period_start")
+) AS periods
+GROUP BY "ticker", "timeframe", "period_start"
+ON CONFLICT DO NOTHING;
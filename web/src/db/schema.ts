@@ -11,6 +11,7 @@ import {
   pgEnum,
   pgView,
   pgTable,
+  primaryKey,
   serial,
   text,
   timestamp,
@@ -321,6 +322,91 @@ export const dailyBar = pgTable(
   ],
 );
 
+// Weekly/monthly/... rollups of daily_bar, recomputed by the backend for the
+// periods touched whenever daily bars are inserted.
+export const dailyBarRollup = pgTable(
+  "daily_bar_rollup",
+  {
+    ticker: text("ticker")
+      .notNull()
+      .references(() => symbol.ticker, { onDelete: "cascade" }),
+    timeframe: text("timeframe").notNull(), // "1Week", "1Month", ... "1Year"
+    periodStart: date("period_start", { mode: "string" }).notNull(),
+    open: doublePrecision("open").notNull(),
+    high: doublePrecision("high").notNull(),
+    low: doublePrecision("low").notNull(),
+    close: doublePrecision("close").notNull(),
+    volume: doublePrecision("volume").notNull(),
+    tradeCount: integer("trade_count"),
+    vwap: doublePrecision("vwap"),
+  },
+  (table) => [
+    primaryKey({ columns: [table.ticker, table.timeframe, table.periodStart] }),
+  ],
+);
+
+export const intradayBar = pgTable(
+  "intraday_bar",
+  {
+    ticker: text("ticker")
+      .notNull()
+      .references(() => symbol.ticker, { onDelete: "cascade" }),
+    timeframe: text("timeframe").notNull(), // "1Min", "5Min", ... "1Hour"
+    time: timestamp("time", { withTimezone: true }).notNull(),
+    open: doublePrecision("open").notNull(),
+    high: doublePrecision("high").notNull(),
+    low: doublePrecision("low").notNull(),
+    close: doublePrecision("close").notNull(),
+    volume: doublePrecision("volume").notNull(),
+    tradeCount: integer("trade_count"),
+    vwap: doublePrecision("vwap"),
+  },
+  (table) => [
+    primaryKey({ columns: [table.ticker, table.timeframe, table.time] }),
+    index("intraday_bar_time_idx").on(table.time),
+  ],
+);
+
+// Windows of intraday_bar already fetched from Alpaca, so the backend can tell
+// a never-fetched gap from a minute with no trades.
+export const intradayBarCoverage = pgTable(
+  "intraday_bar_coverage",
+  {
+    id: serial("id").primaryKey(),
+    ticker: text("ticker")
+      .notNull()
+      .references(() => symbol.ticker, { onDelete: "cascade" }),
+    timeframe: text("timeframe").notNull(),
+    rangeStart: timestamp("range_start", { withTimezone: true }).notNull(),
+    rangeEnd: timestamp("range_end", { withTimezone: true }).notNull(),
+  },
+  (table) => [
+    index("intraday_bar_coverage_ticker_timeframe_idx").on(
+      table.ticker,
+      table.timeframe,
+    ),
+  ],
+);
+
+// Minute bars rolled over from the backend's per-ticker Redis tick streams.
+// Range-partitioned by day on "minute" in migration 0013 (drizzle-kit can't
+// express PARTITION BY); the backend rollover task creates and drops the
+// daily partitions. No FK to symbol so partitions stay cheap to attach/drop.
+export const tickMinute = pgTable(
+  "tick_minute",
+  {
+    ticker: text("ticker").notNull(),
+    minute: timestamp("minute", { withTimezone: true }).notNull(),
+    open: doublePrecision("open").notNull(),
+    high: doublePrecision("high").notNull(),
+    low: doublePrecision("low").notNull(),
+    close: doublePrecision("close").notNull(),
+    volume: doublePrecision("volume").notNull().default(0),
+    tickCount: integer("tick_count").notNull().default(0),
+  },
+  (table) => [primaryKey({ columns: [table.ticker, table.minute] })],
+);
+
 export const order = pgTable(
   "order",
   {